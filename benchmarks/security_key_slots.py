@@ -0,0 +1,146 @@
+"""Compare Redis Cluster slot placement of CONTACT_FORM security keys.
+
+Runs without a cluster: an in-process stand-in splits the 16384 hash slots
+across ``--nodes`` masters the same way ``redis-cli --cluster create`` does,
+and routes each key with Redis' CRC16 key-slot algorithm, hash tags included.
+
+    python benchmarks/security_key_slots.py --requests 20000 --nodes 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import random
+import secrets
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+settings.configure(SECRET_KEY="benchmark-secret-key", USE_TZ=True)
+django.setup()
+
+from contact_form.security import SECURITY_KEY_LAYOUT_FLAT  # noqa: E402
+from contact_form.security import SECURITY_KEY_LAYOUT_PAGE_TAGGED  # noqa: E402
+from contact_form.security import SecurityEventKind  # noqa: E402
+from contact_form.security import _security_cache_key  # noqa: E402
+from contact_form.security import privacy_hash  # noqa: E402
+
+CLUSTER_SLOTS = 16384
+
+
+def crc16(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _bit in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else crc << 1
+            crc &= 0xFFFF
+    return crc
+
+
+def key_slot(key: str) -> int:
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            key = key[start + 1 : end]
+    return crc16(key.encode("utf-8")) % CLUSTER_SLOTS
+
+
+def slot_owner(slot: int, nodes: int) -> int:
+    return min(nodes - 1, slot // (CLUSTER_SLOTS // nodes))
+
+
+def request_keys(*, layout: str, scope_hash: str, client_fingerprint: str, bucket: int) -> list[str]:
+    nonce_hash = privacy_hash("contact-form-nonce", secrets.token_urlsafe(24))
+    submission_fingerprint = privacy_hash("contact-form-submission", secrets.token_hex(16))
+    return [
+        _security_cache_key(
+            kind=str(SecurityEventKind.POST_RATE_LIMIT),
+            scope_hash=scope_hash,
+            fingerprint=client_fingerprint,
+            bucket=bucket,
+            layout=layout,
+        ),
+        _security_cache_key(
+            kind=str(SecurityEventKind.SUBMISSION_NONCE),
+            scope_hash=scope_hash,
+            fingerprint=nonce_hash,
+            layout=layout,
+        ),
+        _security_cache_key(
+            kind=str(SecurityEventKind.DUPLICATE_CONTENT),
+            scope_hash=scope_hash,
+            fingerprint=submission_fingerprint,
+            layout=layout,
+        ),
+    ]
+
+
+def run(layout: str, *, requests: int, nodes: int, pages: int, seed: int) -> dict[str, float]:
+    rng = random.Random(seed)
+    page_scopes = [privacy_hash("contact-form-page", uuid.UUID(int=rng.getrandbits(128))) for _ in range(pages)]
+    node_load = [0] * nodes
+    round_trips: list[int] = []
+    cross_slot = 0
+
+    started = time.perf_counter()
+    for _request in range(requests):
+        client_ip = ipaddress.IPv4Address(rng.getrandbits(32))
+        keys = request_keys(
+            layout=layout,
+            scope_hash=rng.choice(page_scopes),
+            client_fingerprint=privacy_hash("contact-form-client", f"{client_ip}/32"),
+            bucket=int(time.time()) // 600,
+        )
+        slots = {key_slot(key) for key in keys}
+        owners = {slot_owner(slot, nodes) for slot in slots}
+        for owner in owners:
+            node_load[owner] += 1
+        cross_slot += len(slots) > 1
+        round_trips.append(len(owners))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "cross_slot_requests": cross_slot / requests,
+        "mean_round_trips": statistics.fmean(round_trips),
+        "max_round_trips": max(round_trips),
+        "node_load_spread": max(node_load) / max(1, min(node_load)),
+        "key_build_us": elapsed / requests * 1_000_000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    arguments = parser.parse_args()
+
+    print(f"{arguments.requests} POSTs, {arguments.pages} pages, {arguments.nodes}-master cluster stand-in")
+    print(f"{'layout':<12} {'cross-slot':>10} {'round trips':>12} {'max':>4} {'node spread':>12} {'us/POST':>8}")
+    for layout in (SECURITY_KEY_LAYOUT_FLAT, SECURITY_KEY_LAYOUT_PAGE_TAGGED):
+        result = run(
+            layout,
+            requests=arguments.requests,
+            nodes=arguments.nodes,
+            pages=arguments.pages,
+            seed=arguments.seed,
+        )
+        print(
+            f"{layout:<12} {result['cross_slot_requests']:>10.1%} {result['mean_round_trips']:>12.2f} "
+            f"{result['max_round_trips']:>4} {result['node_load_spread']:>12.2f} {result['key_build_us']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
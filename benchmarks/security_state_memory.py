@@ -0,0 +1,117 @@
+"""Compare Redis memory used by the per-key and page-hashes security layouts.
+
+With ``REDIS_URL`` set, each layout is written to a scratch database and the
+difference in ``INFO memory`` ``used_memory`` is reported. Without it, the
+script prints the estimate from Redis' documented per-object overheads so the
+trade-off can still be sized for a given traffic profile.
+
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/security_state_memory.py --clients 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import secrets
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+redis_url = os.environ.get("REDIS_URL")
+settings.configure(
+    SECRET_KEY="benchmark-secret-key",
+    USE_TZ=True,
+    CACHES={
+        "default": (
+            {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": redis_url}
+            if redis_url
+            else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        )
+    },
+)
+django.setup()
+
+from contact_form.page_hashes import DEFAULT_PAGE_HASH_SHARDS  # noqa: E402
+from contact_form.page_hashes import PAGE_HASH_FIELD_BYTES  # noqa: E402
+from contact_form.page_hashes import PageHashSecurityState  # noqa: E402
+from contact_form.security import SECURITY_KEY_LAYOUT_PAGE_TAGGED  # noqa: E402
+from contact_form.security import SecurityEventKind  # noqa: E402
+from contact_form.security import _security_cache_key  # noqa: E402
+from contact_form.security import get_redis_client  # noqa: E402
+from contact_form.security import get_security_cache  # noqa: E402
+from contact_form.security import privacy_hash  # noqa: E402
+
+# Approximate jemalloc-rounded sizes for a string key holding a small integer
+# with a TTL, and for a listpack-encoded hash field.
+PER_KEY_BYTES = 72 + 64 + 16 + 40
+HASH_FIELD_BYTES = PAGE_HASH_FIELD_BYTES + 4 + 2
+HASH_OVERHEAD_BYTES = 200 + 24
+
+
+def estimate(clients: int, shards: int) -> tuple[int, int]:
+    per_key = clients * PER_KEY_BYTES
+    used_shards = min(clients, shards)
+    page_hashes = clients * HASH_FIELD_BYTES + used_shards * HASH_OVERHEAD_BYTES
+    return per_key, page_hashes
+
+
+def measure(clients: int, shards: int) -> tuple[int, int]:
+    cache = get_security_cache()
+    client = get_redis_client(cache, cache.make_key("benchmark"))
+    scope_hash = privacy_hash("page", str(uuid.uuid4()))
+    kind = str(SecurityEventKind.POST_RATE_LIMIT)
+    fingerprints = [privacy_hash("client", secrets.token_hex(8)) for _index in range(clients)]
+
+    client.flushdb()
+    baseline = client.info("memory")["used_memory"]
+    pipeline = client.pipeline(transaction=False)
+    for fingerprint in fingerprints:
+        key = _security_cache_key(
+            kind=kind,
+            scope_hash=scope_hash,
+            fingerprint=fingerprint,
+            bucket=1,
+            layout=SECURITY_KEY_LAYOUT_PAGE_TAGGED,
+        )
+        pipeline.set(cache.make_key(key), 1, ex=3600)
+    pipeline.execute()
+    per_key = client.info("memory")["used_memory"] - baseline
+
+    client.flushdb()
+    baseline = client.info("memory")["used_memory"]
+    state = PageHashSecurityState(shards=shards)
+    for fingerprint in fingerprints:
+        state.increment(kind=kind, scope_hash=scope_hash, fingerprint=fingerprint, bucket=1, timeout=3600)
+    page_hashes = client.info("memory")["used_memory"] - baseline
+    client.flushdb()
+    return per_key, page_hashes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--shards", type=int, default=DEFAULT_PAGE_HASH_SHARDS)
+    arguments = parser.parse_args()
+
+    if redis_url:
+        per_key, page_hashes = measure(arguments.clients, arguments.shards)
+        source = f"measured on {redis_url}"
+    else:
+        per_key, page_hashes = estimate(arguments.clients, arguments.shards)
+        source = "estimated (set REDIS_URL to measure)"
+
+    print(f"{arguments.clients} active clients, {arguments.shards} shards, {source}")
+    print(f"  per-key layout     {per_key / 1024 / 1024:8.2f} MiB  {per_key / arguments.clients:6.1f} B/client")
+    print(
+        f"  page-hashes layout {page_hashes / 1024 / 1024:8.2f} MiB  {page_hashes / arguments.clients:6.1f} B/client"
+    )
+    print(f"  reduction          {1 - page_hashes / per_key:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Tune the heuristic spam scoring thresholds against a labelled corpus.
+
+Each line of the corpus is a JSON object with a ``label`` (``ham`` or
+``spam``), the ``completion_seconds`` between rendering and submitting the
+form, and the submitted ``fields``. The script scores every sample, shows how
+many of each label would be challenged or dropped at a range of thresholds and
+suggests values for ``CONTACT_FORM_SPAM_CHALLENGE_SCORE`` and
+``CONTACT_FORM_SPAM_DROP_SCORE``.
+
+    python benchmarks/tune_spam_scoring.py --corpus exported.jsonl --weights '{"links": 2.5}'
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+settings.configure(SECRET_KEY="benchmark-secret-key", USE_TZ=True)
+django.setup()
+
+from contact_form.scoring import DEFAULT_SPAM_CHALLENGE_SCORE  # noqa: E402
+from contact_form.scoring import DEFAULT_SPAM_DROP_SCORE  # noqa: E402
+from contact_form.scoring import DEFAULT_SPAM_WEIGHTS  # noqa: E402
+from contact_form.scoring import score_submission  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[1] / "contact_form" / "tests" / "fixtures" / "spam_corpus.jsonl"
+
+
+def load_corpus(path: Path) -> list[dict]:
+    with path.open(encoding="utf-8") as corpus:
+        return [json.loads(line) for line in corpus if line.strip()]
+
+
+def count_at_or_above(scores: list[float], threshold: float) -> int:
+    return sum(1 for score in scores if score >= threshold)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--weights", type=json.loads, default={})
+    parser.add_argument("--step", type=float, default=0.5)
+    parser.add_argument("--drop-margin", type=float, default=DEFAULT_SPAM_DROP_SCORE - DEFAULT_SPAM_CHALLENGE_SCORE)
+    parser.add_argument("--verbose", action="store_true")
+    arguments = parser.parse_args()
+
+    weights = {**DEFAULT_SPAM_WEIGHTS, **arguments.weights}
+    scores: dict[str, list[float]] = {"ham": [], "spam": []}
+    for sample in load_corpus(arguments.corpus):
+        result = score_submission(
+            fields=sample["fields"],
+            completion_seconds=sample.get("completion_seconds"),
+            weights=weights,
+        )
+        scores[sample["label"]].append(result.score)
+        if arguments.verbose:
+            signals = ", ".join(f"{name}={value:g}" for name, value in result.signals.items() if value)
+            print(f"{sample['label']:>4} {result.score:6.2f}  {sample.get('note', '')}  {signals}")
+
+    ham, spam = scores["ham"], scores["spam"]
+    print(f"{len(ham)} ham and {len(spam)} spam samples from {arguments.corpus}")
+    print(f"weights {json.dumps(weights)}")
+    print("  threshold  ham >=  spam >=")
+    threshold = arguments.step
+    highest = max(ham + spam, default=0.0)
+    while threshold <= highest + arguments.step:
+        print(
+            f"  {threshold:9.2f}  {count_at_or_above(ham, threshold):6d}  {count_at_or_above(spam, threshold):7d}"
+        )
+        threshold += arguments.step
+
+    challenge_score = max(ham, default=0.0) + arguments.step
+    drop_score = challenge_score + arguments.drop_margin
+    print(f"suggested CONTACT_FORM_SPAM_CHALLENGE_SCORE = {challenge_score:g}")
+    print(f"suggested CONTACT_FORM_SPAM_DROP_SCORE = {drop_score:g}")
+    print(
+        f"  spam challenged {count_at_or_above(spam, challenge_score) - count_at_or_above(spam, drop_score)}, "
+        f"dropped {count_at_or_above(spam, drop_score)}, passed {len(spam) - count_at_or_above(spam, challenge_score)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections.abc import Iterable
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.conf import settings
+
+from contact_form.metrics import increment_counter
+from contact_form.security import SECURITY_CACHE_KEY_PREFIX
+from contact_form.security import get_page_scope_hash
+from contact_form.security import get_positive_int_setting
+from contact_form.security import get_security_cache
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+    from contact_form.models import ContactPage
+    from contact_form.pipeline import StageRejection
+
+logger = logging.getLogger(__name__)
+
+ADAPTIVE_SIGNAL_POST = "post"
+ADAPTIVE_SIGNAL_RATE_LIMITED = "rate_limited"
+ADAPTIVE_SIGNAL_TOKEN_FAILURE = "token_failure"
+ADAPTIVE_SIGNAL_CAPTCHA_FAILURE = "captcha_failure"
+ADAPTIVE_SIGNALS = (
+    ADAPTIVE_SIGNAL_POST,
+    ADAPTIVE_SIGNAL_RATE_LIMITED,
+    ADAPTIVE_SIGNAL_TOKEN_FAILURE,
+    ADAPTIVE_SIGNAL_CAPTCHA_FAILURE,
+)
+
+DEFAULT_ADAPTIVE_THRESHOLDS: dict[str, float] = {
+    ADAPTIVE_SIGNAL_POST: 60,
+    ADAPTIVE_SIGNAL_RATE_LIMITED: 10,
+    ADAPTIVE_SIGNAL_TOKEN_FAILURE: 20,
+    ADAPTIVE_SIGNAL_CAPTCHA_FAILURE: 10,
+}
+DEFAULT_ADAPTIVE_HALF_LIFE_SECONDS = 60
+DEFAULT_ADAPTIVE_COOLDOWN_SECONDS = 600
+DEFAULT_ADAPTIVE_RATE_DIVISOR = 2
+DEFAULT_ADAPTIVE_MINIMUM_COMPLETION_SECONDS = 10
+
+ADAPTIVE_STATE_KEY_PREFIX = f"{SECURITY_CACHE_KEY_PREFIX}:adaptive"
+
+_REQUEST_STATE_ATTRIBUTE = "_contact_form_adaptive_state"
+_TOKEN_FAILURE_STAGES = frozenset({"token", "adaptive"})
+
+
+@dataclass(frozen=True, slots=True)
+class AdaptiveState:
+    under_attack: bool = False
+    tripped_at: float = 0.0
+    updated_at: float = 0.0
+    rates: tuple[float, ...] = (0.0,) * len(ADAPTIVE_SIGNALS)
+
+    def get_rate(self, signal: str) -> float:
+        return self.rates[ADAPTIVE_SIGNALS.index(signal)]
+
+
+def is_adaptive_protection_enabled() -> bool:
+    return bool(getattr(settings, "CONTACT_FORM_ADAPTIVE_PROTECTION", False))
+
+
+def get_adaptive_thresholds() -> dict[str, float]:
+    configured = getattr(settings, "CONTACT_FORM_ADAPTIVE_THRESHOLDS", None) or {}
+    try:
+        overrides = {str(signal): float(threshold) for signal, threshold in dict(configured).items()}
+    except (TypeError, ValueError):
+        return dict(DEFAULT_ADAPTIVE_THRESHOLDS)
+    return {
+        signal: overrides[signal] if overrides.get(signal, 0) > 0 else default
+        for signal, default in DEFAULT_ADAPTIVE_THRESHOLDS.items()
+    }
+
+
+def get_attack_post_limit(limit: int) -> int:
+    divisor = get_positive_int_setting("CONTACT_FORM_ADAPTIVE_RATE_DIVISOR", DEFAULT_ADAPTIVE_RATE_DIVISOR)
+    return max(min(limit, 2), limit // divisor)
+
+
+def get_attack_minimum_completion_seconds() -> int:
+    return get_positive_int_setting(
+        "CONTACT_FORM_ADAPTIVE_MINIMUM_COMPLETION_SECONDS",
+        DEFAULT_ADAPTIVE_MINIMUM_COMPLETION_SECONDS,
+    )
+
+
+def _state_key(page: ContactPage) -> str:
+    return f"{ADAPTIVE_STATE_KEY_PREFIX}:{get_page_scope_hash(page)}"
+
+
+def _advance(state: AdaptiveState, now: float, events: Iterable[str] = ()) -> AdaptiveState:
+    half_life = get_positive_int_setting("CONTACT_FORM_ADAPTIVE_HALF_LIFE_SECONDS", DEFAULT_ADAPTIVE_HALF_LIFE_SECONDS)
+    decay = 0.5 ** (max(0.0, now - state.updated_at) / half_life)
+    # Each event adds ln(2) / half-life, so a steady stream of N events per
+    # minute settles at a rate of N.
+    weight = 60 * math.log(2) / half_life
+    rates = [rate * decay for rate in state.rates]
+    for signal in events:
+        rates[ADAPTIVE_SIGNALS.index(signal)] += weight
+
+    thresholds = get_adaptive_thresholds()
+    tripped = any(rate >= thresholds[signal] for signal, rate in zip(ADAPTIVE_SIGNALS, rates))
+    tripped_at = now if tripped else state.tripped_at
+    cooldown = get_positive_int_setting("CONTACT_FORM_ADAPTIVE_COOLDOWN_SECONDS", DEFAULT_ADAPTIVE_COOLDOWN_SECONDS)
+    return AdaptiveState(
+        under_attack=tripped or (state.under_attack and now - tripped_at < cooldown),
+        tripped_at=tripped_at,
+        updated_at=now,
+        rates=tuple(rates),
+    )
+
+
+def _load_state(page: ContactPage) -> AdaptiveState:
+    try:
+        stored = get_security_cache().get(_state_key(page))
+    except Exception as exc:
+        logger.warning("Couldn't load adaptive protection state: exception_type=%s", type(exc).__name__)
+        return AdaptiveState()
+    try:
+        under_attack, tripped_at, updated_at, *rates = stored
+        state = AdaptiveState(
+            under_attack=bool(under_attack),
+            tripped_at=float(tripped_at),
+            updated_at=float(updated_at),
+            rates=tuple(float(rate) for rate in rates),
+        )
+    except (TypeError, ValueError):
+        return AdaptiveState()
+    return state if len(state.rates) == len(ADAPTIVE_SIGNALS) else AdaptiveState()
+
+
+def _remember(request: HttpRequest | None, page: ContactPage, state: AdaptiveState) -> None:
+    if request is None:
+        return
+    states = getattr(request, _REQUEST_STATE_ATTRIBUTE, None)
+    if states is None:
+        states = {}
+        setattr(request, _REQUEST_STATE_ATTRIBUTE, states)
+    states[page.pk] = state
+
+
+def get_adaptive_state(*, page: ContactPage, request: HttpRequest | None = None) -> AdaptiveState:
+    states: Mapping[Any, AdaptiveState] = getattr(request, _REQUEST_STATE_ATTRIBUTE, None) or {}
+    if page.pk in states:
+        return states[page.pk]
+    state = _advance(_load_state(page), time.time())
+    _remember(request, page, state)
+    return state
+
+
+def is_under_attack(*, page: ContactPage | None, request: HttpRequest | None = None) -> bool:
+    if page is None or not is_adaptive_protection_enabled():
+        return False
+    return get_adaptive_state(page=page, request=request).under_attack
+
+
+def record_adaptive_events(
+    *,
+    page: ContactPage,
+    events: Iterable[str],
+    request: HttpRequest | None = None,
+) -> AdaptiveState:
+    stored = _load_state(page)
+    state = _advance(stored, time.time(), events)
+
+    if state.under_attack != stored.under_attack:
+        mode = "attack" if state.under_attack else "normal"
+        rates = ", ".join(f"{signal}={rate:.1f}/min" for signal, rate in zip(ADAPTIVE_SIGNALS, state.rates))
+        logger.warning("Contact form adaptive protection switched to %s mode: page_id=%s %s", mode, page.pk, rates)
+        increment_counter("contact_form.adaptive.transitions", mode=mode)
+
+    timeout = max(
+        get_positive_int_setting("CONTACT_FORM_ADAPTIVE_COOLDOWN_SECONDS", DEFAULT_ADAPTIVE_COOLDOWN_SECONDS),
+        10 * get_positive_int_setting("CONTACT_FORM_ADAPTIVE_HALF_LIFE_SECONDS", DEFAULT_ADAPTIVE_HALF_LIFE_SECONDS),
+    )
+    try:
+        get_security_cache().set(
+            _state_key(page),
+            (state.under_attack, state.tripped_at, state.updated_at, *state.rates),
+            timeout=timeout,
+        )
+    except Exception as exc:
+        logger.warning("Couldn't store adaptive protection state: exception_type=%s", type(exc).__name__)
+    _remember(request, page, state)
+    return state
+
+
+def observe_submission(
+    *,
+    page: ContactPage,
+    request: HttpRequest,
+    rejection: StageRejection | None,
+    rejected_stage: str | None = None,
+) -> None:
+    if not is_adaptive_protection_enabled():
+        return
+    events = [ADAPTIVE_SIGNAL_POST]
+    if rejection is not None and rejection.reason == "rate-limited":
+        events.append(ADAPTIVE_SIGNAL_RATE_LIMITED)
+    elif rejection is not None and rejected_stage in _TOKEN_FAILURE_STAGES:
+        events.append(ADAPTIVE_SIGNAL_TOKEN_FAILURE)
+    record_adaptive_events(page=page, events=events, request=request)
+
+
+def observe_captcha_failure(*, page: ContactPage, request: HttpRequest) -> None:
+    if is_adaptive_protection_enabled():
+        record_adaptive_events(page=page, events=[ADAPTIVE_SIGNAL_CAPTCHA_FAILURE], request=request)
@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import connections
+from django.db import router
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from contact_form.local_cache import LocalTTLCache
+from contact_form.metrics import increment_counter
+from contact_form.metrics import set_gauge
+from contact_form.security import SecurityStateKey
+from contact_form.security import _security_cache_key
+from contact_form.security import get_positive_int_setting
+from contact_form.security import get_redis_client
+from contact_form.security import get_security_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECURITY_STATE_BACKEND = "contact_form.backends.CacheSecurityStateBackend"
+DEFAULT_DATABASE_SWEEP_INTERVAL_SECONDS = 300
+DATABASE_SWEEP_BATCH_SIZE = 1000
+DEFAULT_DEGRADED_RATE_DIVISOR = 2
+DEFAULT_DEGRADED_MAX_ENTRIES = 10_000
+DEFAULT_DEGRADED_PROBE_INTERVAL_SECONDS = 5
+PROBE_STATE_KEY = SecurityStateKey(kind="probe", scope_hash="", fingerprint="")
+
+_INCREMENT_SQL = (
+    "INSERT INTO {table} ({key}, {count}, {expires_at}) VALUES (%s, 1, %s) "
+    "ON CONFLICT ({key}) DO UPDATE SET "
+    "{count} = CASE WHEN {table}.{expires_at} <= %s THEN 1 ELSE {table}.{count} + 1 END, "
+    "{expires_at} = CASE WHEN {table}.{expires_at} <= %s THEN EXCLUDED.{expires_at} ELSE {table}.{expires_at} END "
+    "RETURNING {count}"
+)
+_RESERVE_SQL = (
+    "INSERT INTO {table} ({key}, {count}, {expires_at}) VALUES (%s, 1, %s) "
+    "ON CONFLICT ({key}) DO UPDATE SET {count} = 1, {expires_at} = EXCLUDED.{expires_at} "
+    "WHERE {table}.{expires_at} <= %s "
+    "RETURNING {count}"
+)
+
+
+class SecurityStateBackend:
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        raise NotImplementedError
+
+    def increment_many(self, keys: Sequence[SecurityStateKey], *, timeout: int) -> list[int]:
+        return [self.increment(key, timeout=timeout) for key in keys]
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        raise NotImplementedError
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        raise NotImplementedError
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        raise NotImplementedError
+
+
+class CacheSecurityStateBackend(SecurityStateBackend):
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        from contact_form.page_hashes import get_page_hash_state
+
+        page_hash_state = get_page_hash_state()
+        if page_hash_state is not None:
+            return page_hash_state.increment(
+                kind=key.kind,
+                scope_hash=key.scope_hash,
+                fingerprint=key.fingerprint,
+                bucket=key.bucket or 0,
+                timeout=timeout,
+            )
+
+        cache = get_security_cache()
+        cache_key = self._cache_key(key)
+        if cache.add(cache_key, 1, timeout=timeout):
+            return 1
+        try:
+            return int(cache.incr(cache_key))
+        except ValueError:
+            if cache.add(cache_key, 1, timeout=timeout):
+                return 1
+            return int(cache.incr(cache_key))
+
+    def increment_many(self, keys: Sequence[SecurityStateKey], *, timeout: int) -> list[int]:
+        from contact_form.page_hashes import get_page_hash_state
+
+        page_hash_state = get_page_hash_state()
+        if page_hash_state is not None:
+            return page_hash_state.increment_many(keys, timeout=timeout)
+
+        cache = get_security_cache()
+        cache_keys = [cache.make_key(self._cache_key(key)) for key in keys]
+        client = get_redis_client(cache, cache_keys[0]) if cache_keys else None
+        if client is None:
+            return super().increment_many(keys, timeout=timeout)
+        # SET NX starts each counter with its expiry, as cache.add does, and
+        # INCR keeps it; every window costs one round trip in total.
+        pipeline = client.pipeline(transaction=False)
+        for cache_key in cache_keys:
+            pipeline.set(cache_key, 0, ex=timeout, nx=True)
+            pipeline.incr(cache_key)
+        return [int(count) for count in pipeline.execute()[1::2]]
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        from contact_form.page_hashes import get_page_hash_state
+
+        page_hash_state = get_page_hash_state()
+        if page_hash_state is not None:
+            return page_hash_state.reserve(
+                kind=key.kind,
+                scope_hash=key.scope_hash,
+                fingerprint=key.fingerprint,
+                duration_seconds=timeout,
+            )
+        return bool(get_security_cache().add(self._cache_key(key), True, timeout=timeout))
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        from contact_form.page_hashes import get_page_hash_state
+
+        page_hash_state = get_page_hash_state()
+        if page_hash_state is not None:
+            return page_hash_state.release(
+                kind=key.kind,
+                scope_hash=key.scope_hash,
+                fingerprint=key.fingerprint,
+                duration_seconds=timeout,
+            )
+        return bool(get_security_cache().delete(self._cache_key(key)))
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        from contact_form.page_hashes import get_page_hash_state
+
+        page_hash_state = get_page_hash_state()
+        if page_hash_state is not None:
+            return page_hash_state.exists(
+                kind=key.kind,
+                scope_hash=key.scope_hash,
+                fingerprint=key.fingerprint,
+                duration_seconds=timeout,
+            )
+        return get_security_cache().get(self._cache_key(key)) is not None
+
+    @staticmethod
+    def _cache_key(key: SecurityStateKey) -> str:
+        return _security_cache_key(
+            kind=key.kind,
+            scope_hash=key.scope_hash,
+            fingerprint=key.fingerprint,
+            bucket=key.bucket,
+        )
+
+
+class DatabaseSecurityStateBackend(SecurityStateBackend):
+    def __init__(self) -> None:
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        now = int(time.time())
+        self._sweep_if_due(now)
+        connection = connections[self._database_alias()]
+        if self._supports_upsert(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(self._sql(connection, _INCREMENT_SQL), [key.digest, now + timeout, now, now])
+                return int(cursor.fetchone()[0])
+        return self._locked_upsert(key.digest, now=now, expires_at=now + timeout, increment=True)
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        now = int(time.time())
+        self._sweep_if_due(now)
+        connection = connections[self._database_alias()]
+        if self._supports_upsert(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(self._sql(connection, _RESERVE_SQL), [key.digest, now + timeout, now])
+                return cursor.fetchone() is not None
+        return self._locked_upsert(key.digest, now=now, expires_at=now + timeout, increment=False) == 1
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        deleted, _rows = self._queryset().filter(key=key.digest).delete()
+        return deleted > 0
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        return self._queryset().filter(key=key.digest, expires_at__gt=int(time.time())).exists()
+
+    def purge_expired(self, *, now: int | None = None, max_batches: int | None = None) -> int:
+        cutoff = int(time.time()) if now is None else now
+        purged = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            expired_keys = list(
+                self._queryset()
+                .filter(expires_at__lte=cutoff)
+                .values_list("key", flat=True)[:DATABASE_SWEEP_BATCH_SIZE]
+            )
+            if not expired_keys:
+                break
+            deleted, _rows = self._queryset().filter(key__in=expired_keys, expires_at__lte=cutoff).delete()
+            purged += deleted
+            batches += 1
+        return purged
+
+    def _sweep_if_due(self, now: int) -> None:
+        interval = get_positive_int_setting(
+            "CONTACT_FORM_SECURITY_DB_SWEEP_INTERVAL_SECONDS",
+            DEFAULT_DATABASE_SWEEP_INTERVAL_SECONDS,
+        )
+        if now - self._last_sweep < interval or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = now
+            self.purge_expired(now=now, max_batches=1)
+        finally:
+            self._sweep_lock.release()
+
+    def _locked_upsert(self, digest: str, *, now: int, expires_at: int, increment: bool) -> int:
+        database_alias = self._database_alias()
+        with transaction.atomic(using=database_alias):
+            state = self._queryset().select_for_update().filter(key=digest).first()
+            if state is None:
+                try:
+                    with transaction.atomic(using=database_alias):
+                        self._queryset().create(key=digest, count=1, expires_at=expires_at)
+                    return 1
+                except IntegrityError:
+                    state = self._queryset().select_for_update().get(key=digest)
+            if state.expires_at <= now:
+                state.count = 1
+                state.expires_at = expires_at
+            elif increment:
+                state.count += 1
+            else:
+                return 0
+            state.save(update_fields=["count", "expires_at"])
+            return state.count
+
+    @staticmethod
+    def _supports_upsert(connection: Any) -> bool:
+        return connection.vendor in {"postgresql", "sqlite"} and connection.features.can_return_columns_from_insert
+
+    @staticmethod
+    def _sql(connection: Any, template: str) -> str:
+        from contact_form.models import ContactFormSecurityState
+
+        quote_name = connection.ops.quote_name
+        return template.format(
+            table=quote_name(ContactFormSecurityState._meta.db_table),
+            key=quote_name("key"),
+            count=quote_name("count"),
+            expires_at=quote_name("expires_at"),
+        )
+
+    @staticmethod
+    def _database_alias() -> str:
+        from contact_form.models import ContactFormSecurityState
+
+        return router.db_for_write(ContactFormSecurityState)
+
+    def _queryset(self) -> Any:
+        from contact_form.models import ContactFormSecurityState
+
+        return ContactFormSecurityState.objects.using(self._database_alias())
+
+
+class LocalSecurityStateBackend(SecurityStateBackend):
+    def __init__(self, *, max_entries: int, rate_divisor: int) -> None:
+        self.rate_divisor = rate_divisor
+        self._entries = LocalTTLCache(max_entries)
+        self._lock = threading.Lock()
+
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        with self._lock:
+            count = (self._entries.get(key.digest) or 0) + 1
+            remaining_seconds = self._entries.remaining_seconds(key.digest)
+            self._entries.set(key.digest, count, timeout=remaining_seconds if count > 1 else timeout)
+        # Each worker only sees its own traffic, so the limit is split between them.
+        return 1 + (count - 1) * self.rate_divisor
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        with self._lock:
+            if self._entries.get(key.digest) is not None:
+                return False
+            self._entries.set(key.digest, 1, timeout=timeout)
+            return True
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        return self._entries.delete(key.digest)
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        return self._entries.get(key.digest) is not None
+
+
+class ResilientSecurityStateBackend(SecurityStateBackend):
+    def __init__(
+        self,
+        primary: SecurityStateBackend,
+        *,
+        fallback: SecurityStateBackend,
+        probe_interval_seconds: float,
+    ) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.probe_interval_seconds = probe_interval_seconds
+        self._degraded = threading.Event()
+        self._probe_thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_degraded(self) -> bool:
+        return self._degraded.is_set()
+
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        return self._call("increment", key, timeout=timeout)
+
+    def increment_many(self, keys: Sequence[SecurityStateKey], *, timeout: int) -> list[int]:
+        return self._call("increment_many", keys, timeout=timeout)
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        return self._call("reserve", key, timeout=timeout)
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        return self._call("release", key, timeout=timeout)
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        return self._call("exists", key, timeout=timeout)
+
+    def probe(self) -> bool:
+        try:
+            self.primary.exists(PROBE_STATE_KEY, timeout=1)
+        except Exception:
+            return False
+        if self._degraded.is_set():
+            self._degraded.clear()
+            set_gauge("contact_form.security_state.degraded", 0)
+            logger.info("CONTACT_FORM security state backend recovered; leaving degraded mode.")
+        return True
+
+    def _call(self, operation: str, key: SecurityStateKey | Sequence[SecurityStateKey], *, timeout: int) -> Any:
+        if not self._degraded.is_set():
+            try:
+                return getattr(self.primary, operation)(key, timeout=timeout)
+            except Exception as exc:
+                self._enter_degraded_mode(exc)
+        increment_counter("contact_form.security_state.degraded_operations", operation=operation)
+        return getattr(self.fallback, operation)(key, timeout=timeout)
+
+    def _enter_degraded_mode(self, exc: Exception) -> None:
+        increment_counter("contact_form.security_state.failures", exception_type=type(exc).__name__)
+        with self._lock:
+            if self._degraded.is_set():
+                return
+            self._degraded.set()
+            set_gauge("contact_form.security_state.degraded", 1)
+            logger.warning(
+                "CONTACT_FORM security state backend failed; entering degraded mode: exception_type=%s",
+                type(exc).__name__,
+            )
+            if self._probe_thread is None or not self._probe_thread.is_alive():
+                self._probe_thread = threading.Thread(
+                    target=self._probe_until_recovered,
+                    name="contact-form-security-probe",
+                    daemon=True,
+                )
+                self._probe_thread.start()
+
+    def _probe_until_recovered(self) -> None:
+        while self._degraded.is_set():
+            time.sleep(self.probe_interval_seconds)
+            self.probe()
+
+
+_security_state_backend: tuple[tuple[object, ...], SecurityStateBackend] | None = None
+
+
+def get_security_state_backend() -> SecurityStateBackend:
+    global _security_state_backend
+
+    backend_path = str(getattr(settings, "CONTACT_FORM_SECURITY_BACKEND", DEFAULT_SECURITY_STATE_BACKEND))
+    degraded_mode = bool(getattr(settings, "CONTACT_FORM_SECURITY_DEGRADED_MODE", False))
+    configuration: tuple[object, ...] = (backend_path, degraded_mode)
+    if degraded_mode:
+        configuration += (
+            get_positive_int_setting("CONTACT_FORM_DEGRADED_RATE_DIVISOR", DEFAULT_DEGRADED_RATE_DIVISOR),
+            get_positive_int_setting("CONTACT_FORM_DEGRADED_MAX_ENTRIES", DEFAULT_DEGRADED_MAX_ENTRIES),
+            get_positive_int_setting(
+                "CONTACT_FORM_DEGRADED_PROBE_INTERVAL_SECONDS",
+                DEFAULT_DEGRADED_PROBE_INTERVAL_SECONDS,
+            ),
+        )
+    if _security_state_backend is None or _security_state_backend[0] != configuration:
+        backend: SecurityStateBackend = import_string(backend_path)()
+        if degraded_mode:
+            _path, _enabled, rate_divisor, max_entries, probe_interval_seconds = configuration
+            backend = ResilientSecurityStateBackend(
+                backend,
+                fallback=LocalSecurityStateBackend(max_entries=max_entries, rate_divisor=rate_divisor),
+                probe_interval_seconds=probe_interval_seconds,
+            )
+        _security_state_backend = (configuration, backend)
+    return _security_state_backend[1]
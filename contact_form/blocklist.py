@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import logging
+import os
+import unicodedata
+from collections import deque
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+BLOCKLIST_COMMENT_PREFIX = "#"
+
+
+@dataclass(frozen=True, slots=True)
+class BlocklistMatch:
+    field_name: str
+    pattern: str
+
+
+def normalize_blocklist_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class BlocklistMatcher:
+    __slots__ = ("_fail", "_goto", "_outputs", "patterns")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        normalized = {normalize_blocklist_text(pattern) for pattern in patterns}
+        self.patterns: tuple[str, ...] = tuple(sorted(pattern for pattern in normalized if pattern))
+        self._goto: list[dict[str, int]] = [{}]
+        self._outputs: list[tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for character in pattern:
+                next_state = self._goto[state].get(character)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][character] = next_state
+                    self._goto.append({})
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] += (index,)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(character, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, str]]:
+        text = normalize_blocklist_text(text)
+        goto, fail, outputs, patterns = self._goto, self._fail, self._outputs, self.patterns
+        state = 0
+        for end, character in enumerate(text, start=1):
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            for index in outputs[state]:
+                pattern = patterns[index]
+                start = end - len(pattern)
+                # Terms only match whole words so "cialis" doesn't block "specialist".
+                if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                    yield start, pattern
+
+    def search(self, text: str) -> str | None:
+        return next((pattern for _start, pattern in self.iter_matches(text)), None)
+
+
+def read_blocklist_file(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as blocklist_file:
+        return [
+            line.strip()
+            for line in blocklist_file
+            if line.strip() and not line.lstrip().startswith(BLOCKLIST_COMMENT_PREFIX)
+        ]
+
+
+def get_blocklist_file_path() -> str:
+    return str(getattr(settings, "CONTACT_FORM_BLOCKLIST_FILE", "") or "")
+
+
+def get_blocklist_terms() -> tuple[str, ...]:
+    configured_terms = getattr(settings, "CONTACT_FORM_BLOCKLIST", None) or ()
+    if isinstance(configured_terms, str):
+        configured_terms = (configured_terms,)
+    return tuple(str(term) for term in configured_terms)
+
+
+def _get_file_signature(path: str) -> tuple[int, int] | None:
+    if not path:
+        return None
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+_blocklist_matcher: tuple[tuple[Any, ...], BlocklistMatcher] | None = None
+
+
+def get_blocklist_matcher() -> BlocklistMatcher:
+    global _blocklist_matcher
+
+    terms, path = get_blocklist_terms(), get_blocklist_file_path()
+    key = (terms, path, _get_file_signature(path))
+    if _blocklist_matcher is None or _blocklist_matcher[0] != key:
+        patterns = list(terms)
+        if path:
+            try:
+                patterns.extend(read_blocklist_file(path))
+            except (OSError, UnicodeDecodeError) as exc:
+                logger.warning("Couldn't read the contact form blocklist: exception_type=%s", type(exc).__name__)
+        _blocklist_matcher = (key, BlocklistMatcher(patterns))
+    return _blocklist_matcher[1]
+
+
+def clear_blocklist_matcher() -> None:
+    global _blocklist_matcher
+
+    _blocklist_matcher = None
+
+
+def _iter_string_values(cleaned_data: Mapping[str, Any]) -> Iterator[tuple[str, str]]:
+    for field_name, value in cleaned_data.items():
+        if isinstance(value, str):
+            yield field_name, value
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                if isinstance(item, str):
+                    yield field_name, item
+
+
+def find_blocklisted_value(cleaned_data: Mapping[str, Any]) -> BlocklistMatch | None:
+    matcher = get_blocklist_matcher()
+    if not matcher:
+        return None
+    for field_name, value in _iter_string_values(cleaned_data):
+        pattern = matcher.search(value)
+        if pattern is not None:
+            return BlocklistMatch(field_name=field_name, pattern=pattern)
+    return None
@@ -15,6 +15,37 @@ _POSITIVE_SETTINGS: dict[str, int | float] = {
     "CONTACT_FORM_MINIMUM_COMPLETION_SECONDS": 3,
     "CONTACT_FORM_TOKEN_MAX_AGE_SECONDS": 7200,
     "CONTACT_FORM_DUPLICATE_WINDOW_SECONDS": 600,
+    "CONTACT_FORM_BLOOM_PARTITION_CAPACITY": 50_000,
+    "CONTACT_FORM_NEAR_DUPLICATE_THRESHOLD": 5,
+    "CONTACT_FORM_NEAR_DUPLICATE_WINDOW_SECONDS": 3600,
+    "CONTACT_FORM_NEAR_DUPLICATE_INDEX_SLOTS": 65_536,
+    "CONTACT_FORM_SECURITY_DB_SWEEP_INTERVAL_SECONDS": 300,
+    "CONTACT_FORM_DEGRADED_RATE_DIVISOR": 2,
+    "CONTACT_FORM_DEGRADED_MAX_ENTRIES": 10_000,
+    "CONTACT_FORM_DEGRADED_PROBE_INTERVAL_SECONDS": 5,
+    "CONTACT_FORM_SECURITY_MMAP_SLOTS": 65_536,
+    "CONTACT_FORM_TURNSTILE_PREFETCH_WORKERS": 8,
+    "CONTACT_FORM_TURNSTILE_MAX_ATTEMPTS": 3,
+    "CONTACT_FORM_TURNSTILE_DEADLINE_SECONDS": 10,
+    "CONTACT_FORM_TURNSTILE_RETRY_BACKOFF_SECONDS": 0.25,
+    "CONTACT_FORM_VERIFY_TIMEOUT_SECONDS": 10,
+    "CONTACT_FORM_VERIFY_POOL_SIZE": 8,
+    "CONTACT_FORM_POW_MAX_NUMBER": 50_000,
+    "CONTACT_FORM_POW_MAX_NUMBER_CEILING": 1_000_000,
+    "CONTACT_FORM_POW_RATE_THRESHOLD": 30,
+    "CONTACT_FORM_SPAM_CHALLENGE_SCORE": 4.0,
+    "CONTACT_FORM_SPAM_FAST_COMPLETION_SECONDS": 10,
+    "CONTACT_FORM_ADAPTIVE_HALF_LIFE_SECONDS": 60,
+    "CONTACT_FORM_ADAPTIVE_COOLDOWN_SECONDS": 600,
+    "CONTACT_FORM_ADAPTIVE_RATE_DIVISOR": 2,
+    "CONTACT_FORM_ADAPTIVE_MINIMUM_COMPLETION_SECONDS": 10,
+    "CONTACT_FORM_OVERLOAD_RETRY_AFTER_SECONDS": 5,
+}
+
+_NON_NEGATIVE_SETTINGS: dict[str, int] = {
+    "CONTACT_FORM_LOCAL_VERDICT_CACHE_SIZE": 1024,
+    "CONTACT_FORM_REJECTION_CACHE_SECONDS": 300,
+    "CONTACT_FORM_CAPTCHA_CLEARANCE_SECONDS": 0,
 }
 
 
@@ -119,4 +150,398 @@ def check_contact_form_security_settings(
             )
         )
 
+    replay_store = getattr(settings, "CONTACT_FORM_NONCE_REPLAY_STORE", "cache")
+    if replay_store not in {"cache", "bloom"}:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_NONCE_REPLAY_STORE must be either 'cache' or 'bloom'.",
+                id="contact_form.E008",
+            )
+        )
+
+    raw_false_positive_rate = getattr(settings, "CONTACT_FORM_BLOOM_FALSE_POSITIVE_RATE", 0.0001)
+    try:
+        valid_false_positive_rate = 0 < float(raw_false_positive_rate) < 1
+    except (TypeError, ValueError):
+        valid_false_positive_rate = False
+    if not valid_false_positive_rate:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_BLOOM_FALSE_POSITIVE_RATE must be greater than 0 and less than 1.",
+                id="contact_form.E009",
+            )
+        )
+
+    raw_partitions = getattr(settings, "CONTACT_FORM_BLOOM_PARTITIONS", 4)
+    try:
+        partitions = int(raw_partitions)
+    except (TypeError, ValueError):
+        partitions = 0
+    if partitions < 2:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_BLOOM_PARTITIONS must be at least 2.",
+                id="contact_form.E010",
+            )
+        )
+
+    near_duplicate_action = getattr(settings, "CONTACT_FORM_NEAR_DUPLICATE_ACTION", "reject")
+    if near_duplicate_action not in {"reject", "flag"}:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_NEAR_DUPLICATE_ACTION must be either 'reject' or 'flag'.",
+                id="contact_form.E011",
+            )
+        )
+
+    for setting_name, default in _NON_NEGATIVE_SETTINGS.items():
+        try:
+            is_valid = int(getattr(settings, setting_name, default)) >= 0
+        except (TypeError, ValueError):
+            is_valid = False
+        if not is_valid:
+            messages.append(
+                checks.Error(
+                    f"{setting_name} must be zero or a positive integer.",
+                    id="contact_form.E012",
+                )
+            )
+
+    security_cache_alias = getattr(settings, "CONTACT_FORM_SECURITY_CACHE_ALIAS", "default")
+    if security_cache_alias not in settings.CACHES:
+        messages.append(
+            checks.Error(
+                f"CONTACT_FORM_SECURITY_CACHE_ALIAS {security_cache_alias!r} is not configured in CACHES.",
+                id="contact_form.E014",
+            )
+        )
+
+    backend_path = getattr(settings, "CONTACT_FORM_SECURITY_BACKEND", "contact_form.backends.CacheSecurityStateBackend")
+    try:
+        from django.utils.module_loading import import_string
+
+        from contact_form.backends import SecurityStateBackend
+
+        backend_class = import_string(str(backend_path))
+        valid_backend = isinstance(backend_class, type) and issubclass(backend_class, SecurityStateBackend)
+    except ImportError:
+        valid_backend = False
+    if not valid_backend:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_SECURITY_BACKEND must be the dotted path of a SecurityStateBackend subclass.",
+                id="contact_form.E015",
+            )
+        )
+
+    messages.extend(_check_security_stages())
+    messages.extend(_check_fast_reject_middleware())
+    messages.extend(_check_captcha_providers())
+    messages.extend(_check_spam_scoring())
+    messages.extend(_check_blocklist())
+    messages.extend(_check_disposable_email_domains())
+    messages.extend(_check_ip_blocklist())
+    messages.extend(_check_adaptive_thresholds())
+
+    key_layout = getattr(settings, "CONTACT_FORM_SECURITY_KEY_LAYOUT", "flat")
+    if key_layout not in {"flat", "page-tagged", "page-hashes"}:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_SECURITY_KEY_LAYOUT must be 'flat', 'page-tagged' or 'page-hashes'.",
+                id="contact_form.E013",
+            )
+        )
+    elif key_layout == "page-hashes":
+        from contact_form.security import get_redis_client
+        from contact_form.security import get_security_cache
+
+        redis_client = None
+        if security_cache_alias in settings.CACHES:
+            security_cache = get_security_cache()
+            redis_client = get_redis_client(security_cache, security_cache.make_key("contact-form-security"))
+        if redis_client is None:
+            messages.append(
+                checks.Warning(
+                    "CONTACT_FORM_SECURITY_KEY_LAYOUT 'page-hashes' requires a Redis cache backend; "
+                    "security state will use page-tagged keys instead.",
+                    id="contact_form.W002",
+                )
+            )
+
+    return messages
+
+
+def _check_security_stages() -> list[checks.CheckMessage]:
+    from django.utils.module_loading import import_string
+
+    from contact_form.pipeline import STAGE_COST_CPU
+    from contact_form.pipeline import SecurityStage
+    from contact_form.pipeline import TokenStage
+    from contact_form.pipeline import get_security_stage_paths
+
+    try:
+        stage_classes = [import_string(path) for path in get_security_stage_paths()]
+    except (ImportError, TypeError):
+        stage_classes = []
+    valid_stages = all(
+        isinstance(stage_class, type) and issubclass(stage_class, SecurityStage) for stage_class in stage_classes
+    )
+    if not valid_stages or not any(issubclass(stage_class, TokenStage) for stage_class in stage_classes):
+        return [
+            checks.Error(
+                "CONTACT_FORM_SECURITY_STAGES must list SecurityStage subclasses including "
+                "contact_form.pipeline.TokenStage.",
+                id="contact_form.E016",
+            )
+        ]
+
+    messages: list[checks.CheckMessage] = []
+    first_io_stage = None
+    for stage_class in stage_classes:
+        if stage_class.cost != STAGE_COST_CPU:
+            first_io_stage = first_io_stage or stage_class
+        elif first_io_stage is not None:
+            messages.append(
+                checks.Warning(
+                    f"CPU-only security stage {stage_class.__name__} runs after {first_io_stage.__name__}, "
+                    "so rejected submissions still pay for cache or network I/O.",
+                    hint="List CPU-only stages first in CONTACT_FORM_SECURITY_STAGES.",
+                    id="contact_form.W004",
+                )
+            )
+    return messages
+
+
+def _check_captcha_providers() -> list[checks.CheckMessage]:
+    from django.utils.module_loading import import_string
+
+    from contact_form.providers import CaptchaProviderBackend
+    from contact_form.providers import get_captcha_provider_paths
+
+    messages: list[checks.CheckMessage] = []
+    try:
+        provider_paths = get_captcha_provider_paths()
+    except (TypeError, ValueError):
+        provider_paths = None
+    if provider_paths is None:
+        return [
+            checks.Error(
+                "CONTACT_FORM_CAPTCHA_PROVIDERS must map provider slugs to dotted paths.",
+                id="contact_form.E017",
+            )
+        ]
+
+    for slug, path in provider_paths.items():
+        try:
+            provider_class = import_string(path)
+        except ImportError:
+            provider_class = None
+        if not isinstance(provider_class, type) or not issubclass(provider_class, CaptchaProviderBackend):
+            messages.append(
+                checks.Error(
+                    f"CAPTCHA provider {slug!r} must point to a CaptchaProviderBackend subclass, not {path!r}.",
+                    id="contact_form.E025",
+                )
+            )
+        elif len(slug) > 20:
+            messages.append(
+                checks.Error(
+                    f"CAPTCHA provider slug {slug!r} is longer than 20 characters.",
+                    hint="ContactPage.captcha_provider stores the slug in a 20-character column.",
+                    id="contact_form.E026",
+                )
+            )
+    return messages
+
+
+def _check_spam_scoring() -> list[checks.CheckMessage]:
+    from contact_form.scoring import DEFAULT_SPAM_WEIGHTS
+    from contact_form.scoring import get_spam_challenge_score
+    from contact_form.scoring import get_spam_drop_score
+
+    messages: list[checks.CheckMessage] = []
+    configured_weights = getattr(settings, "CONTACT_FORM_SPAM_WEIGHTS", None) or {}
+    try:
+        weights = {str(name): float(weight) for name, weight in dict(configured_weights).items()}
+    except (TypeError, ValueError):
+        weights = None
+    if weights is None or any(not math.isfinite(weight) or weight < 0 for weight in weights.values()):
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_SPAM_WEIGHTS must map signal names to non-negative numbers.",
+                id="contact_form.E018",
+            )
+        )
+    elif unknown_signals := sorted(set(weights) - set(DEFAULT_SPAM_WEIGHTS)):
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_SPAM_WEIGHTS contains unknown signals: " + ", ".join(unknown_signals),
+                hint="Known signals are " + ", ".join(DEFAULT_SPAM_WEIGHTS) + ".",
+                id="contact_form.E024",
+            )
+        )
+
+    raw_drop_score = getattr(settings, "CONTACT_FORM_SPAM_DROP_SCORE", None)
+    try:
+        invalid_drop_score = raw_drop_score is not None and not (
+            math.isfinite(float(raw_drop_score)) and float(raw_drop_score) > 0
+        )
+    except (TypeError, ValueError):
+        invalid_drop_score = True
+    if invalid_drop_score:
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_SPAM_DROP_SCORE must be a positive number or None.",
+                id="contact_form.E023",
+            )
+        )
+
+    drop_score = get_spam_drop_score()
+    if drop_score is not None and get_spam_challenge_score() >= drop_score:
+        messages.append(
+            checks.Warning(
+                "CONTACT_FORM_SPAM_CHALLENGE_SCORE is not below CONTACT_FORM_SPAM_DROP_SCORE, "
+                "so suspicious submissions are dropped without a CAPTCHA challenge.",
+                id="contact_form.W006",
+            )
+        )
+    return messages
+
+
+def _check_blocklist() -> list[checks.CheckMessage]:
+    from contact_form.blocklist import get_blocklist_file_path
+    from contact_form.blocklist import read_blocklist_file
+
+    messages: list[checks.CheckMessage] = []
+    configured_terms = getattr(settings, "CONTACT_FORM_BLOCKLIST", None) or ()
+    if isinstance(configured_terms, str) or not isinstance(configured_terms, Iterable):
+        messages.append(
+            checks.Error(
+                "CONTACT_FORM_BLOCKLIST must be a list or tuple of blocked terms.",
+                id="contact_form.E019",
+            )
+        )
+
+    path = get_blocklist_file_path()
+    if path:
+        try:
+            read_blocklist_file(path)
+        except (OSError, UnicodeDecodeError) as exc:
+            messages.append(
+                checks.Error(
+                    f"CONTACT_FORM_BLOCKLIST_FILE {path!r} can't be read as UTF-8 text: {exc}",
+                    id="contact_form.E027",
+                )
+            )
     return messages
+
+
+def _check_disposable_email_domains() -> list[checks.CheckMessage]:
+    from contact_form.validators import get_disposable_email_domains_file
+    from contact_form.validators import read_domain_file
+
+    path = get_disposable_email_domains_file()
+    try:
+        read_domain_file(path)
+    except (OSError, UnicodeDecodeError) as exc:
+        return [
+            checks.Error(
+                f"CONTACT_FORM_DISPOSABLE_EMAIL_DOMAINS_FILE {path!r} can't be read as UTF-8 text: {exc}",
+                id="contact_form.E020",
+            )
+        ]
+    return []
+
+
+def _check_ip_blocklist() -> list[checks.CheckMessage]:
+    from contact_form.ip_blocklist import IPBlocklist
+    from contact_form.ip_blocklist import get_ip_blocklist_path
+
+    path = get_ip_blocklist_path()
+    if not path:
+        return []
+    try:
+        IPBlocklist.open(path)
+    except (OSError, ValueError) as exc:
+        return [
+            checks.Error(
+                f"CONTACT_FORM_IP_BLOCKLIST_PATH {path!r} is not a compiled IP blocklist: {exc}",
+                hint="Build it with the compile_contact_form_ip_blocklist management command.",
+                id="contact_form.E021",
+            )
+        ]
+    return []
+
+
+def _check_adaptive_thresholds() -> list[checks.CheckMessage]:
+    from contact_form.adaptive import ADAPTIVE_SIGNALS
+
+    configured = getattr(settings, "CONTACT_FORM_ADAPTIVE_THRESHOLDS", None) or {}
+    try:
+        thresholds = {str(signal): float(threshold) for signal, threshold in dict(configured).items()}
+    except (TypeError, ValueError):
+        thresholds = None
+    if (
+        thresholds is None
+        or set(thresholds) - set(ADAPTIVE_SIGNALS)
+        or any(not math.isfinite(threshold) or threshold <= 0 for threshold in thresholds.values())
+    ):
+        return [
+            checks.Error(
+                "CONTACT_FORM_ADAPTIVE_THRESHOLDS must map signal names to positive events-per-minute rates.",
+                hint="Known signals are " + ", ".join(ADAPTIVE_SIGNALS) + ".",
+                id="contact_form.E022",
+            )
+        ]
+    return []
+
+
+_FAST_REJECT_MIDDLEWARE = "contact_form.middleware.ContactFormFastRejectMiddleware"
+_EXPENSIVE_MIDDLEWARE = (
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+)
+
+
+def _check_fast_reject_middleware() -> list[checks.CheckMessage]:
+    middleware = list(getattr(settings, "MIDDLEWARE", None) or [])
+    if _FAST_REJECT_MIDDLEWARE not in middleware:
+        return []
+    position = middleware.index(_FAST_REJECT_MIDDLEWARE)
+    earlier = [name for name in _EXPENSIVE_MIDDLEWARE if name in middleware[:position]]
+    if not earlier:
+        return []
+    return [
+        checks.Warning(
+            f"{_FAST_REJECT_MIDDLEWARE} runs after {', '.join(earlier)}, so rejected submissions still pay for them.",
+            hint="Move it above session, CSRF and authentication middleware.",
+            id="contact_form.W005",
+        )
+    ]
+
+
+@checks.register(checks.Tags.security, deploy=True)
+def check_contact_form_shared_security_state(
+    app_configs: Any = None,
+    **kwargs: Any,
+) -> list[checks.CheckMessage]:
+    backend_path = getattr(settings, "CONTACT_FORM_SECURITY_BACKEND", "contact_form.backends.CacheSecurityStateBackend")
+    security_cache_alias = getattr(settings, "CONTACT_FORM_SECURITY_CACHE_ALIAS", "default")
+    cache_backend = settings.CACHES.get(security_cache_alias, {}).get("BACKEND", "")
+    if backend_path != "contact_form.backends.CacheSecurityStateBackend":
+        return []
+    if cache_backend not in {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }:
+        return []
+    return [
+        checks.Warning(
+            "Contact form rate limits and nonce reservations are stored in a per-process cache, "
+            "so every worker enforces its own limits.",
+            hint="Use a shared cache for CONTACT_FORM_SECURITY_CACHE_ALIAS or set CONTACT_FORM_SECURITY_BACKEND "
+            "to 'contact_form.backends.DatabaseSecurityStateBackend'.",
+            id="contact_form.W003",
+        )
+    ]
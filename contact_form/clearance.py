@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hmac
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core import signing
+
+from contact_form.security import SECURITY_CACHE_KEY_PREFIX
+from contact_form.security import get_client_fingerprint
+from contact_form.security import get_page_scope_hash
+from contact_form.security import get_security_cache
+from contact_form.security import privacy_hash
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+    from django.http import HttpResponse
+
+    from contact_form.models import ContactPage
+
+logger = logging.getLogger(__name__)
+
+CLEARANCE_SALT = "contact_form.clearance.v1"
+CLEARANCE_GENERATION_KEY = f"{SECURITY_CACHE_KEY_PREFIX}:clearance-generation"
+DEFAULT_CLEARANCE_SECONDS = 0
+DEFAULT_CLEARANCE_COOKIE_NAME = "contact_form_clearance"
+
+_REQUEST_CLEARANCE_ATTRIBUTE = "_contact_form_clearance"
+
+
+def get_clearance_seconds() -> int:
+    raw_value = getattr(settings, "CONTACT_FORM_CAPTCHA_CLEARANCE_SECONDS", DEFAULT_CLEARANCE_SECONDS)
+    try:
+        return max(0, int(raw_value))
+    except (TypeError, ValueError):
+        return DEFAULT_CLEARANCE_SECONDS
+
+
+def get_clearance_cookie_name() -> str:
+    return str(getattr(settings, "CONTACT_FORM_CAPTCHA_CLEARANCE_COOKIE_NAME", DEFAULT_CLEARANCE_COOKIE_NAME))
+
+
+def _clearance_binding(page: ContactPage, request: HttpRequest) -> str:
+    return privacy_hash("contact-form-clearance", get_page_scope_hash(page), get_client_fingerprint(request))
+
+
+def get_clearance_generation() -> int:
+    cache = get_security_cache()
+    generation = cache.get(CLEARANCE_GENERATION_KEY)
+    if generation is None:
+        # Seeding from the clock keeps an evicted counter from bringing
+        # previously revoked clearances back to life.
+        cache.add(CLEARANCE_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(CLEARANCE_GENERATION_KEY)
+    return int(generation)
+
+
+def revoke_captcha_clearances() -> int:
+    cache = get_security_cache()
+    try:
+        return int(cache.incr(CLEARANCE_GENERATION_KEY))
+    except ValueError:
+        cache.add(CLEARANCE_GENERATION_KEY, time.time_ns(), timeout=None)
+        return int(cache.incr(CLEARANCE_GENERATION_KEY))
+
+
+def issue_captcha_clearance(response: HttpResponse, *, page: ContactPage, request: HttpRequest) -> bool:
+    clearance_seconds = get_clearance_seconds()
+    if clearance_seconds <= 0:
+        return False
+
+    try:
+        generation = get_clearance_generation()
+    except Exception as exc:
+        logger.warning("Couldn't issue CAPTCHA clearance: exception_type=%s", type(exc).__name__)
+        return False
+
+    value = signing.dumps(
+        {"binding": _clearance_binding(page, request), "generation": generation},
+        salt=CLEARANCE_SALT,
+        compress=True,
+    )
+    response.set_cookie(
+        get_clearance_cookie_name(),
+        value,
+        max_age=clearance_seconds,
+        path=request.path,
+        secure=request.is_secure(),
+        httponly=True,
+        samesite="Lax",
+    )
+    return True
+
+
+def _verify_clearance(page: ContactPage, request: HttpRequest, clearance_seconds: int) -> bool:
+    value = request.COOKIES.get(get_clearance_cookie_name())
+    if not value:
+        return False
+
+    try:
+        payload = signing.loads(value, salt=CLEARANCE_SALT, max_age=clearance_seconds)
+    except signing.BadSignature:
+        return False
+    if not isinstance(payload, dict):
+        return False
+    if not hmac.compare_digest(str(payload.get("binding", "")), _clearance_binding(page, request)):
+        return False
+
+    try:
+        generation = int(payload.get("generation"))
+    except (TypeError, ValueError):
+        return False
+    try:
+        return generation == get_clearance_generation()
+    except Exception as exc:
+        logger.warning("Couldn't verify CAPTCHA clearance: exception_type=%s", type(exc).__name__)
+        return False
+
+
+def _get_request_verdicts(request: HttpRequest) -> dict[int, bool]:
+    verdicts = getattr(request, _REQUEST_CLEARANCE_ATTRIBUTE, None)
+    if verdicts is None:
+        verdicts = {}
+        setattr(request, _REQUEST_CLEARANCE_ATTRIBUTE, verdicts)
+    return verdicts
+
+
+def deny_captcha_clearance(*, page: ContactPage, request: HttpRequest) -> None:
+    _get_request_verdicts(request)[page.pk] = False
+
+
+def has_captcha_clearance(*, page: ContactPage | None, request: HttpRequest | None) -> bool:
+    from contact_form.adaptive import is_under_attack
+
+    clearance_seconds = get_clearance_seconds()
+    if clearance_seconds <= 0 or page is None or request is None:
+        return False
+
+    verdicts = _get_request_verdicts(request)
+    if page.pk not in verdicts and is_under_attack(page=page, request=request):
+        verdicts[page.pk] = False
+    if page.pk not in verdicts:
+        verdicts[page.pk] = _verify_clearance(page, request, clearance_seconds)
+    return verdicts[page.pk]
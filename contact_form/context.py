@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from typing import Any
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+REQUEST_ENVIRONMENT_ATTRIBUTE = "_contact_form_environment"
+
+_UNSET: Any = object()
+
+
+class RequestEnvironment:
+    __slots__ = (
+        "request",
+        "_host",
+        "_is_localhost",
+        "_client_ip",
+        "_client_fingerprint",
+        "_normalized_hostnames",
+    )
+
+    def __init__(self, request: HttpRequest) -> None:
+        self.request = request
+        self._host: Any = _UNSET
+        self._is_localhost: Any = _UNSET
+        self._client_ip: Any = _UNSET
+        self._client_fingerprint: Any = _UNSET
+        self._normalized_hostnames: dict[str, str] = {}
+
+    @property
+    def host(self) -> str:
+        if self._host is _UNSET:
+            self._host = self.request.get_host()
+        return self._host
+
+    @property
+    def is_localhost(self) -> bool:
+        from contact_form.utils import is_localhost
+
+        if self._is_localhost is _UNSET:
+            self._is_localhost = is_localhost(host=self.host)
+        return self._is_localhost
+
+    @property
+    def client_ip(self) -> str | None:
+        from contact_form.security import resolve_client_ip
+
+        if self._client_ip is _UNSET:
+            self._client_ip = resolve_client_ip(self.request)
+        return self._client_ip
+
+    @property
+    def client_fingerprint(self) -> str:
+        from contact_form.security import get_client_network_fingerprint
+
+        if self._client_fingerprint is _UNSET:
+            self._client_fingerprint = get_client_network_fingerprint(self.client_ip)
+        return self._client_fingerprint
+
+    def normalize_hostname(self, hostname: str) -> str:
+        from contact_form.utils import normalize_hostname
+
+        normalized = self._normalized_hostnames.get(hostname)
+        if normalized is None:
+            normalized = self._normalized_hostnames[hostname] = normalize_hostname(hostname)
+        return normalized
+
+
+def get_request_environment(request: HttpRequest) -> RequestEnvironment:
+    environment = getattr(request, REQUEST_ENVIRONMENT_ATTRIBUTE, None)
+    if not isinstance(environment, RequestEnvironment):
+        environment = RequestEnvironment(request)
+        setattr(request, REQUEST_ENVIRONMENT_ATTRIBUTE, environment)
+    return environment
@@ -5,13 +5,14 @@ from typing import TYPE_CHECKING
 from typing import Any
 
 from django import forms
-from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from wagtail.contrib.forms.forms import BaseForm
 from wagtail.contrib.forms.forms import FormBuilder
 
-from contact_form.utils import get_captcha_keys_for_environment
-from contact_form.utils import is_localhost
+from contact_form.context import get_request_environment
+from contact_form.metrics import increment_counter
+from contact_form.validators import validate_non_disposable_email
 
 if TYPE_CHECKING:
     from django.db.models import QuerySet
@@ -74,10 +75,36 @@ def _get_turnstile_allowed_hostnames(
     if request is None:
         return ()
 
-    hostname = request.get_host()
+    hostname = get_request_environment(request).host
     return (hostname,) if hostname else ()
 
 
+class ContactForm(BaseForm):
+    def _clean_fields(self) -> None:
+        captcha_name = ContactFormBuilder.CAPTCHA_FIELD_NAME
+        captcha_field = self.fields.pop(captcha_name, None)
+        try:
+            super()._clean_fields()
+        finally:
+            if captcha_field is not None:
+                self.fields[captcha_name] = captcha_field
+        if captcha_field is None:
+            return
+
+        # The CAPTCHA is checked last so that a submission which fails any
+        # other field never costs a verification request.
+        if self._errors:
+            cancel_prefetch = getattr(captcha_field, "cancel_prefetch", None)
+            if cancel_prefetch is not None:
+                cancel_prefetch()
+            increment_counter("contact_form.captcha.skipped_verifications")
+            return
+        try:
+            self.cleaned_data[captcha_name] = captcha_field._clean_bound_field(self[captcha_name])
+        except ValidationError as exc:
+            self.add_error(captcha_name, exc)
+
+
 class ContactFormBuilder(FormBuilder):
     CAPTCHA_FIELD_NAME: str = "wagtailcaptcha"
 
@@ -90,137 +117,41 @@ class ContactFormBuilder(FormBuilder):
         super().__init__(fields)
         self.page = page
         self.request = request
-        self._is_localhost = is_localhost(request) if request else False
+        self._is_localhost = get_request_environment(request).is_localhost if request else False
+
+    def get_form_class(self) -> type:
+        return type("WagtailForm", (ContactForm,), self.formfields)
+
+    def create_email_field(self, field: FormField, options: dict[str, Any]) -> forms.Field:
+        email_field = super().create_email_field(field, options)
+        if getattr(self.page, "reject_disposable_emails", False):
+            email_field.validators.append(validate_non_disposable_email)
+        return email_field
 
     @property
     def formfields(self) -> dict[str, forms.Field]:
         fields = super().formfields
+        if self._has_captcha_clearance():
+            return fields
         captcha_field = self._get_captcha_field()
         if captcha_field:
             fields[self.CAPTCHA_FIELD_NAME] = captcha_field
         return fields
 
-    def _get_captcha_field(self) -> forms.Field:
-        captcha_provider = getattr(self.page, "captcha_provider", "recaptcha")
+    def _has_captcha_clearance(self) -> bool:
+        from contact_form.clearance import has_captcha_clearance
 
-        if captcha_provider == "turnstile":
-            return self._get_turnstile_field()
-        else:
-            return self._get_recaptcha_field()
+        return has_captcha_clearance(page=self.page, request=self.request)
 
-    def _get_recaptcha_field(self) -> forms.Field:
-        try:
-            from django_recaptcha.fields import ReCaptchaField
-            from django_recaptcha.widgets import ReCaptchaV3
-
-            captcha_settings = self._get_captcha_settings()
-            configured_keys: dict[str, str] = {"site_key": "", "secret_key": ""}
-
-            if captcha_settings:
-                recaptcha_config = captcha_settings.get_recaptcha_settings()
-                configured_keys = {
-                    "site_key": recaptcha_config.get("public_key", ""),
-                    "secret_key": recaptcha_config.get("private_key", ""),
-                }
-
-            keys = get_captcha_keys_for_environment("recaptcha", self.request, configured_keys)
-            site_key = keys["site_key"]
-            secret_key = keys["secret_key"]
-
-            if not site_key or not secret_key:
-                logger.warning("reCAPTCHA keys not configured. Please configure keys in Settings > CAPTCHA.")
-                return CaptchaConfigurationField(
-                    provider="Google reCAPTCHA",
-                    error_message="reCAPTCHA Not Configured",
-                    page=self.page,
-                    request=self.request,
-                )
-
-            settings.RECAPTCHA_PUBLIC_KEY = site_key
-            settings.RECAPTCHA_PRIVATE_KEY = secret_key
-
-            if captcha_settings:
-                recaptcha_config = captcha_settings.get_recaptcha_settings()
-                if recaptcha_config.get("required_score"):
-                    try:
-                        settings.RECAPTCHA_REQUIRED_SCORE = float(recaptcha_config["required_score"])
-                    except (ValueError, TypeError):
-                        settings.RECAPTCHA_REQUIRED_SCORE = 0.85
-                if recaptcha_config.get("domain"):
-                    settings.RECAPTCHA_DOMAIN = recaptcha_config["domain"]
-
-            return ReCaptchaField(label="", widget=ReCaptchaV3())
-        except ImportError:
-            logger.warning("Package django-recaptcha is Not Installed")
-            return CaptchaConfigurationField(
-                provider="Google reCAPTCHA",
-                error_message="django-recaptcha Package Is Not Installed",
-                page=self.page,
-                request=self.request,
-            )
-
-    def _get_turnstile_field(self) -> forms.Field:
-        try:
-            from contact_form.security import get_client_ip
-            from contact_form.turnstile import TURNSTILE_ACTION
-            from contact_form.turnstile import TurnstileField
-
-            captcha_settings = self._get_captcha_settings()
-            configured_keys: dict[str, str] = {"site_key": "", "secret_key": ""}
-            theme = "auto"
-            size = "normal"
-
-            if captcha_settings:
-                turnstile_config = captcha_settings.get_turnstile_settings()
-                configured_keys = {
-                    "site_key": turnstile_config.get("site_key", ""),
-                    "secret_key": turnstile_config.get("secret_key", ""),
-                }
-                theme = turnstile_config.get("theme", "auto")
-                size = turnstile_config.get("size", "normal")
-
-            if not configured_keys.get("site_key") or not configured_keys.get("secret_key"):
-                configured_keys = {
-                    "site_key": getattr(settings, "TURNSTILE_SITE_KEY", ""),
-                    "secret_key": getattr(settings, "TURNSTILE_SECRET_KEY", ""),
-                }
-                theme = getattr(settings, "TURNSTILE_THEME", theme)
-                size = getattr(settings, "TURNSTILE_SIZE", size)
-
-            keys = get_captcha_keys_for_environment("turnstile", self.request, configured_keys)
-            site_key = keys["site_key"]
-            secret_key = keys["secret_key"]
-
-            if not site_key or not secret_key:
-                logger.warning("Turnstile keys not configured.")
-                return CaptchaConfigurationField(
-                    provider="Cloudflare Turnstile",
-                    error_message="Turnstile Keys Not Configured",
-                    page=self.page,
-                    request=self.request,
-                )
-
-            return TurnstileField(
-                site_key=site_key,
-                secret_key=secret_key,
-                theme=theme,
-                size=size,
-                remote_ip=(get_client_ip(self.request) if self.request is not None else None),
-                request=self.request,
-                page=self.page,
-                expected_hostnames=_get_turnstile_allowed_hostnames(self.request),
-                expected_action=TURNSTILE_ACTION,
-                label="",
-            )
+    def _get_captcha_field(self) -> forms.Field:
+        from contact_form.providers import get_captcha_provider
 
-        except ImportError as e:
-            logger.error("Failed to Import TurnstileField: %s", str(e))
-            return CaptchaConfigurationField(
-                provider="Cloudflare Turnstile",
-                error_message="Turnstile Integration is Not Available",
-                page=self.page,
-                request=self.request,
-            )
+        provider = get_captcha_provider(getattr(self.page, "captcha_provider", None))
+        return provider.get_field(
+            captcha_settings=self._get_captcha_settings(),
+            page=self.page,
+            request=self.request,
+        )
 
     def _get_captcha_settings(self) -> Any | None:
         try:
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import ipaddress
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.conf import settings
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+IP_BLOCKLIST_MAGIC = b"CFIP"
+IP_BLOCKLIST_VERSION = 1
+
+# Node 0 is a null sentinel, so a zero child index means "no child".
+_HEADER = struct.Struct("<4sIIIII")
+_NODE = struct.Struct("<III")
+
+IPNetwork = ipaddress.IPv4Network | ipaddress.IPv6Network
+
+
+class IPBlocklistError(ValueError):
+    pass
+
+
+def parse_networks(lines: Iterable[str]) -> tuple[list[IPNetwork], list[tuple[int, str]]]:
+    networks: list[IPNetwork] = []
+    invalid_lines: list[tuple[int, str]] = []
+    for line_number, line in enumerate(lines, start=1):
+        value = line.split("#", 1)[0].strip()
+        if not value:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(value, strict=False))
+        except ValueError:
+            invalid_lines.append((line_number, value))
+    return networks, invalid_lines
+
+
+def compile_ip_blocklist(networks: Iterable[IPNetwork]) -> bytes:
+    networks = list(networks)
+    children: list[list[int]] = [[0, 0], [0, 0], [0, 0]]
+    blocked = [False, False, False]
+    roots = {4: 1, 6: 2}
+    network_count = 0
+
+    for version in (4, 6):
+        for network in ipaddress.collapse_addresses(network for network in networks if network.version == version):
+            network_count += 1
+            node = roots[version]
+            address = int(network.network_address)
+            for shift in range(network.max_prefixlen - 1, network.max_prefixlen - network.prefixlen - 1, -1):
+                bit = (address >> shift) & 1
+                if not children[node][bit]:
+                    children[node][bit] = len(children)
+                    children.append([0, 0])
+                    blocked.append(False)
+                node = children[node][bit]
+            blocked[node] = True
+
+    output = bytearray(_HEADER.pack(IP_BLOCKLIST_MAGIC, IP_BLOCKLIST_VERSION, len(children), network_count, 1, 2))
+    for (zero, one), is_blocked in zip(children, blocked):
+        output += _NODE.pack(zero, one, int(is_blocked))
+    return bytes(output)
+
+
+def write_ip_blocklist(path: str, networks: Iterable[IPNetwork]) -> int:
+    data = compile_ip_blocklist(networks)
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".ip-blocklist-")
+    try:
+        with os.fdopen(file_descriptor, "wb") as blocklist_file:
+            blocklist_file.write(data)
+            blocklist_file.flush()
+            os.fsync(blocklist_file.fileno())
+        os.chmod(temporary_path, 0o644)
+        # Replacing the file keeps workers that still map the old inode valid.
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.unlink(temporary_path)
+        raise
+    return _HEADER.unpack_from(data)[3]
+
+
+class IPBlocklist:
+    __slots__ = ("_memory", "_node_count", "_roots", "network_count")
+
+    def __init__(self, memory: Any) -> None:
+        if len(memory) < _HEADER.size:
+            raise IPBlocklistError("IP blocklist file is truncated.")
+        magic, version, node_count, network_count, ipv4_root, ipv6_root = _HEADER.unpack_from(memory)
+        if magic != IP_BLOCKLIST_MAGIC or version != IP_BLOCKLIST_VERSION:
+            raise IPBlocklistError("IP blocklist file has an unknown format.")
+        if len(memory) != _HEADER.size + node_count * _NODE.size or max(ipv4_root, ipv6_root) >= node_count:
+            raise IPBlocklistError("IP blocklist file is truncated.")
+        self._memory = memory
+        self._node_count = node_count
+        self._roots = {4: ipv4_root, 6: ipv6_root}
+        self.network_count = network_count
+
+    @classmethod
+    def open(cls, path: str) -> IPBlocklist:
+        with open(path, "rb") as blocklist_file:
+            if os.fstat(blocklist_file.fileno()).st_size == 0:
+                raise IPBlocklistError("IP blocklist file is empty.")
+            memory = mmap.mmap(blocklist_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(memory)
+
+    def __len__(self) -> int:
+        return self.network_count
+
+    def contains(self, address: str) -> bool:
+        try:
+            parsed_address = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        if isinstance(parsed_address, ipaddress.IPv6Address) and parsed_address.ipv4_mapped is not None:
+            parsed_address = parsed_address.ipv4_mapped
+
+        value = int(parsed_address)
+        memory, node = self._memory, self._roots[parsed_address.version]
+        for shift in range(parsed_address.max_prefixlen - 1, -1, -1):
+            zero, one, blocked = _NODE.unpack_from(memory, _HEADER.size + node * _NODE.size)
+            if blocked:
+                return True
+            node = one if (value >> shift) & 1 else zero
+            if not node or node >= self._node_count:
+                return False
+        return bool(_NODE.unpack_from(memory, _HEADER.size + node * _NODE.size)[2])
+
+
+def get_ip_blocklist_path() -> str:
+    return str(getattr(settings, "CONTACT_FORM_IP_BLOCKLIST_PATH", "") or "")
+
+
+_ip_blocklist: tuple[tuple[Any, ...], IPBlocklist | None] | None = None
+_ip_blocklist_lock = threading.Lock()
+
+
+def get_ip_blocklist() -> IPBlocklist | None:
+    global _ip_blocklist
+
+    path = get_ip_blocklist_path()
+    if not path:
+        return None
+    try:
+        stat_result = os.stat(path)
+        key: tuple[Any, ...] = (path, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+    except OSError:
+        key = (path, None, None, None)
+    current = _ip_blocklist
+    if current is not None and current[0] == key:
+        return current[1]
+    with _ip_blocklist_lock:
+        if _ip_blocklist is None or _ip_blocklist[0] != key:
+            try:
+                blocklist: IPBlocklist | None = IPBlocklist.open(path)
+            except (OSError, ValueError) as exc:
+                logger.warning("Couldn't load the contact form IP blocklist: exception_type=%s", type(exc).__name__)
+                blocklist = None
+            # Requests may still be reading the replaced mapping; it is
+            # unmapped once the last reference to it goes away.
+            _ip_blocklist = (key, blocklist)
+        return _ip_blocklist[1]
+
+
+def clear_ip_blocklist() -> None:
+    global _ip_blocklist
+
+    with _ip_blocklist_lock:
+        _ip_blocklist = None
+
+
+def is_ip_blocklisted(request: HttpRequest) -> bool:
+    from contact_form.security import get_client_ip
+
+    blocklist = get_ip_blocklist()
+    if blocklist is None:
+        return False
+    client_ip = get_client_ip(request)
+    return client_ip is not None and blocklist.contains(client_ip)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.utils.translation import gettext_lazy as _
+
+from contact_form.metrics import increment_counter
+from contact_form.security import SecurityEventKind
+from contact_form.security import SecurityStateUnavailable
+from contact_form.security import acquire_security_window
+from contact_form.security import get_page_scope_hash
+from contact_form.security import get_positive_int_setting
+
+if TYPE_CHECKING:
+    from contact_form.models import ContactPage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUBMISSION_BUDGET = 0
+DEFAULT_SUBMISSION_BUDGET_WINDOW_SECONDS = 60
+DEFAULT_MAX_CONCURRENT_SUBMISSIONS = 0
+DEFAULT_OVERLOAD_RETRY_AFTER_SECONDS = 5
+
+SUBMISSION_BUDGET_FINGERPRINT = "page"
+
+
+OVERLOADED_MESSAGE = _("The form is receiving too many submissions. Please try again in a moment.")
+
+
+class SubmissionOverloaded(RuntimeError):
+    def __init__(self, *, reason: str, retry_after_seconds: int) -> None:
+        super().__init__(f"Contact form submissions are overloaded: {reason}")
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+def get_submission_budget(page: ContactPage) -> tuple[int, int]:
+    limit = int(getattr(page, "submission_budget", DEFAULT_SUBMISSION_BUDGET) or 0)
+    window_seconds = int(
+        getattr(page, "submission_budget_window_seconds", DEFAULT_SUBMISSION_BUDGET_WINDOW_SECONDS)
+        or DEFAULT_SUBMISSION_BUDGET_WINDOW_SECONDS
+    )
+    return max(0, limit), max(1, window_seconds)
+
+
+def get_max_concurrent_submissions(page: ContactPage) -> int:
+    return max(0, int(getattr(page, "max_concurrent_submissions", DEFAULT_MAX_CONCURRENT_SUBMISSIONS) or 0))
+
+
+def get_overload_retry_after_seconds() -> int:
+    return get_positive_int_setting("CONTACT_FORM_OVERLOAD_RETRY_AFTER_SECONDS", DEFAULT_OVERLOAD_RETRY_AFTER_SECONDS)
+
+
+def consume_submission_budget(page: ContactPage) -> None:
+    limit, window_seconds = get_submission_budget(page)
+    if not limit:
+        return
+    try:
+        decision = acquire_security_window(
+            kind=str(SecurityEventKind.SUBMISSION_BUDGET),
+            scope_hash=get_page_scope_hash(page),
+            fingerprint=SUBMISSION_BUDGET_FINGERPRINT,
+            duration=timedelta(seconds=window_seconds),
+            limit=limit,
+        )
+    except SecurityStateUnavailable as exc:
+        logger.warning("Couldn't check the contact form submission budget: exception_type=%s", type(exc).__name__)
+        return
+    if not decision.allowed:
+        increment_counter("contact_form.load_shedding.rejections", reason="budget")
+        raise SubmissionOverloaded(reason="budget", retry_after_seconds=decision.retry_after_seconds)
+
+
+_semaphores: dict[object, tuple[int, threading.BoundedSemaphore]] = {}
+_semaphores_lock = threading.Lock()
+
+
+def _get_submission_semaphore(page: ContactPage, capacity: int) -> threading.BoundedSemaphore:
+    with _semaphores_lock:
+        entry = _semaphores.get(page.pk)
+        if entry is None or entry[0] != capacity:
+            entry = (capacity, threading.BoundedSemaphore(capacity))
+            _semaphores[page.pk] = entry
+        return entry[1]
+
+
+def clear_submission_semaphores() -> None:
+    with _semaphores_lock:
+        _semaphores.clear()
+
+
+@contextmanager
+def shed_submission_load(page: ContactPage) -> Iterator[None]:
+    capacity = get_max_concurrent_submissions(page)
+    semaphore = _get_submission_semaphore(page, capacity) if capacity else None
+    if semaphore is not None and not semaphore.acquire(blocking=False):
+        increment_counter("contact_form.load_shedding.rejections", reason="concurrency")
+        raise SubmissionOverloaded(reason="concurrency", retry_after_seconds=get_overload_retry_after_seconds())
+    try:
+        yield
+    finally:
+        if semaphore is not None:
+            semaphore.release()
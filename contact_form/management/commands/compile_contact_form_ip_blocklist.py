@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.management.base import CommandParser
+
+from contact_form.ip_blocklist import get_ip_blocklist_path
+from contact_form.ip_blocklist import parse_networks
+from contact_form.ip_blocklist import write_ip_blocklist
+
+
+class Command(BaseCommand):
+    help = "Compile CIDR list files into the memory-mapped contact form IP blocklist."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("sources", nargs="+", help="Files with one IP address or CIDR network per line.")
+        parser.add_argument(
+            "--output",
+            help="Path of the compiled blocklist. Defaults to CONTACT_FORM_IP_BLOCKLIST_PATH.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        output = options["output"] or get_ip_blocklist_path()
+        if not output:
+            raise CommandError("Pass --output or set CONTACT_FORM_IP_BLOCKLIST_PATH.")
+
+        networks = []
+        for source in options["sources"]:
+            try:
+                with open(source, encoding="utf-8") as source_file:
+                    source_networks, invalid_lines = parse_networks(source_file)
+            except (OSError, UnicodeDecodeError) as exc:
+                raise CommandError(f"Couldn't read {source}: {exc}") from exc
+            networks.extend(source_networks)
+            for line_number, value in invalid_lines:
+                self.stderr.write(f"{source}:{line_number}: skipping invalid network {value!r}")
+
+        network_count = write_ip_blocklist(output, networks)
+        self.stdout.write(
+            self.style.SUCCESS(f"Compiled {len(networks)} entries into {network_count} networks at {output}.")
+        )
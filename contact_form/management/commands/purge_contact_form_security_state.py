@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from contact_form.backends import DatabaseSecurityStateBackend
+
+
+class Command(BaseCommand):
+    help = "Delete expired rows from the database-backed contact form security state."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        purged = DatabaseSecurityStateBackend().purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired security state rows."))
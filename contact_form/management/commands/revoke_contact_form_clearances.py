@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from contact_form.clearance import revoke_captcha_clearances
+
+
+class Command(BaseCommand):
+    help = "Invalidate every issued contact form CAPTCHA clearance cookie."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        generation = revoke_captcha_clearances()
+        self.stdout.write(self.style.SUCCESS(f"Revoked CAPTCHA clearances; generation is now {generation}."))
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+
+from django.dispatch import Signal
+
+METRIC_KIND_COUNTER = "counter"
+METRIC_KIND_GAUGE = "gauge"
+
+security_metric = Signal()
+
+
+def _metric_key(name: str, labels: dict[str, str]) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{label}={value}" for label, value in sorted(labels.items())) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_metric_key(name, labels)] = value
+
+    def get(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_metric_key(name, labels), 0)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+registry = MetricsRegistry()
+
+
+def increment_counter(name: str, value: float = 1, **labels: str) -> None:
+    registry.increment(name, value, **labels)
+    security_metric.send(sender=MetricsRegistry, name=name, kind=METRIC_KIND_COUNTER, value=value, labels=labels)
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    registry.set(name, value, **labels)
+    security_metric.send(sender=MetricsRegistry, name=name, kind=METRIC_KIND_GAUGE, value=value, labels=labels)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from django.core.exceptions import DisallowedHost
+from django.db import DatabaseError
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http.request import split_domain_port
+from django.utils.cache import patch_cache_control
+from django.utils.translation import gettext as _
+from wagtail.signals import page_published
+from wagtail.signals import page_unpublished
+from wagtail.signals import post_page_move
+
+from contact_form.metrics import increment_counter
+from contact_form.pipeline import RATE_DECISION_ATTRIBUTE
+from contact_form.pipeline import PrecomputedRateDecision
+from contact_form.security import PageSecurityConfig
+from contact_form.security import get_positive_int_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAST_REJECT_ROUTES_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True, slots=True)
+class ContactPageRoute:
+    page_id: int
+    translation_key: UUID
+    hostname: str
+    is_default_site: bool
+    max_submission_bytes: int
+    security_config: PageSecurityConfig = PageSecurityConfig()
+
+
+@dataclass(frozen=True, slots=True)
+class ContactPageRoutes:
+    paths: dict[str, tuple[ContactPageRoute, ...]]
+    hostnames: frozenset[str]
+
+
+_routes: tuple[float, ContactPageRoutes] | None = None
+_routes_lock = threading.Lock()
+
+
+def clear_contact_page_routes() -> None:
+    global _routes
+
+    _routes = None
+
+
+def _build_contact_page_routes() -> ContactPageRoutes:
+    from wagtail.models import Site
+
+    from contact_form.models import ContactPage
+
+    sites = list(Site.objects.values_list("pk", "hostname", "is_default_site"))
+    site_hostnames = {site_id: hostname for site_id, hostname, _is_default_site in sites}
+    default_site_ids = {site_id for site_id, _hostname, is_default_site in sites if is_default_site}
+    routes: dict[str, list[ContactPageRoute]] = {}
+    for page in ContactPage.objects.live():
+        url_parts = page.get_url_parts()
+        if url_parts is None:
+            continue
+        site_id, _root_url, page_path = url_parts
+        routes.setdefault(page_path, []).append(
+            ContactPageRoute(
+                page_id=page.pk,
+                translation_key=page.translation_key,
+                hostname=site_hostnames.get(site_id, ""),
+                is_default_site=site_id in default_site_ids,
+                max_submission_bytes=page.max_submission_bytes,
+                security_config=page.security_config,
+            )
+        )
+    return ContactPageRoutes(
+        paths={path: tuple(candidates) for path, candidates in routes.items()},
+        hostnames=frozenset(site_hostnames.values()),
+    )
+
+
+def get_contact_page_routes() -> ContactPageRoutes:
+    global _routes
+
+    ttl_seconds = get_positive_int_setting(
+        "CONTACT_FORM_FAST_REJECT_ROUTES_TTL_SECONDS",
+        DEFAULT_FAST_REJECT_ROUTES_TTL_SECONDS,
+    )
+    cached_routes = _routes
+    if cached_routes is not None and cached_routes[0] > time.monotonic():
+        return cached_routes[1]
+    with _routes_lock:
+        if _routes is None or _routes[0] <= time.monotonic():
+            _routes = (time.monotonic() + ttl_seconds, _build_contact_page_routes())
+        return _routes[1]
+
+
+def find_contact_page_route(request: HttpRequest) -> ContactPageRoute | None:
+    try:
+        routes = get_contact_page_routes()
+    except DatabaseError as exc:
+        logger.warning("Couldn't load contact page routes: exception_type=%s", type(exc).__name__)
+        return None
+    candidates = routes.paths.get(request.path, ())
+    if not candidates:
+        return None
+    try:
+        hostname, _port = split_domain_port(request.get_host())
+    except DisallowedHost:
+        return None
+    if hostname in routes.hostnames:
+        matches = [route for route in candidates if route.hostname == hostname]
+    else:
+        matches = [route for route in candidates if route.is_default_site]
+    return matches[0] if len(matches) == 1 else None
+
+
+def _rejection_response(message: str, *, status: int) -> HttpResponse:
+    response = HttpResponse(message, status=status, content_type="text/plain; charset=utf-8")
+    patch_cache_control(response, private=True, no_cache=True, no_store=True, must_revalidate=True, max_age=0)
+    return response
+
+
+class ContactFormFastRejectMiddleware:
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if request.method == "POST":
+            response = self.reject(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def reject(self, request: HttpRequest) -> HttpResponse | None:
+        from contact_form.security import SecurityStateUnavailable
+        from contact_form.security import consume_post_rate_limit
+
+        route = find_contact_page_route(request)
+        if route is None:
+            return None
+
+        try:
+            content_length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > route.max_submission_bytes:
+            increment_counter("contact_form.fast_reject.rejections", reason="body-too-large")
+            return _rejection_response(_("The submitted form is too large."), status=413)
+
+        try:
+            decision, client_fingerprint = consume_post_rate_limit(page=route, request=request)
+        except SecurityStateUnavailable:
+            return None
+        setattr(
+            request,
+            RATE_DECISION_ATTRIBUTE,
+            PrecomputedRateDecision(page_id=route.page_id, decision=decision, client_fingerprint=client_fingerprint),
+        )
+        if decision.allowed:
+            return None
+
+        increment_counter("contact_form.fast_reject.rejections", reason="rate-limited")
+        response = _rejection_response(
+            _("You submitted the form too frequently. Please wait and try again."),
+            status=429,
+        )
+        response["Retry-After"] = str(decision.retry_after_seconds)
+        return response
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+@receiver(post_page_move)
+def _clear_routes_on_page_change(**kwargs: Any) -> None:
+    clear_contact_page_routes()
+
+
+@receiver(post_save, sender="wagtailcore.Site")
+@receiver(post_delete, sender="wagtailcore.Site")
+def _clear_routes_on_site_change(**kwargs: Any) -> None:
+    clear_contact_page_routes()
+
+
+@receiver(post_delete)
+def _clear_routes_on_contact_page_delete(sender: Any, **kwargs: Any) -> None:
+    from contact_form.models import ContactPage
+
+    if isinstance(sender, type) and issubclass(sender, ContactPage):
+        clear_contact_page_routes()
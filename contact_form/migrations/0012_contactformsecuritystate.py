@@ -0,0 +1,23 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0011_remove_persistent_security_and_delivery_state"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContactFormSecurityState",
+            fields=[
+                ("key", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("expires_at", models.PositiveBigIntegerField(db_index=True)),
+            ],
+            options={
+                "verbose_name": "Security State",
+                "verbose_name_plural": "Security States",
+            },
+        ),
+    ]
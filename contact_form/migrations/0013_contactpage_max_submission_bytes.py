@@ -0,0 +1,23 @@
+import django.core.validators
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0012_contactformsecuritystate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contactpage",
+            name="max_submission_bytes",
+            field=models.PositiveIntegerField(
+                default=65536,
+                help_text="Larger submissions are rejected before the page is loaded when "
+                "ContactFormFastRejectMiddleware is enabled.",
+                validators=[django.core.validators.MinValueValidator(1024)],
+                verbose_name="Maximum Submission Size (in Bytes)",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0013_contactpage_max_submission_bytes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contactpage",
+            name="captcha_provider",
+            field=models.CharField(
+                choices=[
+                    ("recaptcha", "Google reCAPTCHA"),
+                    ("turnstile", "Cloudflare Turnstile"),
+                    ("proof_of_work", "Proof of Work (Self-Hosted)"),
+                ],
+                default="recaptcha",
+                help_text='Please remember to <a href="/backend/settings/contact_form/captchasettings/1/" '
+                'target="_blank">configure the settings</a>.',
+                max_length=20,
+                verbose_name="CAPTCHA Provider",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db import models
+
+import contact_form.providers
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0014_alter_contactpage_captcha_provider"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="contactpage",
+            name="captcha_provider",
+            field=models.CharField(
+                choices=contact_form.providers.get_captcha_provider_choices,
+                default="recaptcha",
+                help_text='Please remember to <a href="/backend/settings/contact_form/captchasettings/1/" '
+                'target="_blank">configure the settings</a>.',
+                max_length=20,
+                verbose_name="CAPTCHA Provider",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0015_captcha_provider_registry_choices"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contactpage",
+            name="reject_disposable_emails",
+            field=models.BooleanField(
+                default=False,
+                help_text="Email fields will not accept addresses from throwaway mail providers.",
+                verbose_name="Reject Disposable Email Addresses",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+import django.core.validators
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0016_contactpage_reject_disposable_emails"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contactpage",
+            name="max_concurrent_submissions",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="The maximum number of submissions each server process saves and emails "
+                "at the same time. Set to 0 to disable the limit.",
+                verbose_name="Maximum Concurrent Submissions",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactpage",
+            name="submission_budget",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="The maximum number of submissions the page processes from all visitors "
+                "per budget window. Set to 0 to disable the limit.",
+                verbose_name="Submission Budget",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactpage",
+            name="submission_budget_window_seconds",
+            field=models.PositiveIntegerField(
+                default=60,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Submission Budget Window (in Seconds)",
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+import django.core.validators
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contact_form", "0017_contactpage_submission_load_limits"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="contactpage",
+            name="duplicate_window_seconds",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Leave blank to use the site-wide CONTACT_FORM_DUPLICATE_WINDOW_SECONDS.",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Duplicate Window (in Seconds)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactpage",
+            name="minimum_completion_seconds",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Leave blank to use the site-wide CONTACT_FORM_MINIMUM_COMPLETION_SECONDS.",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Minimum Completion Time (in Seconds)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactpage",
+            name="post_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Leave blank to use the site-wide CONTACT_FORM_POST_LIMIT.",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Submissions per Visitor",
+            ),
+        ),
+        migrations.AddField(
+            model_name="contactpage",
+            name="post_window_seconds",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Leave blank to use the site-wide CONTACT_FORM_POST_WINDOW_SECONDS.",
+                null=True,
+                validators=[django.core.validators.MinValueValidator(1)],
+                verbose_name="Submission Window (in Seconds)",
+            ),
+        ),
+    ]
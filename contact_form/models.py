@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import ClassVar
 
 import wagtail
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.db import transaction
@@ -13,6 +16,7 @@ from django.http import HttpRequest
 from django.http import HttpResponse
 from django.template.response import TemplateResponse
 from django.utils.cache import patch_cache_control
+from django.utils.functional import cached_property
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from modelcluster.fields import ParentalKey
@@ -27,10 +31,16 @@ from wagtail.contrib.forms.models import validate_to_address
 from wagtail.fields import RichTextField
 from wagtail.models import TranslatableMixin
 
+from contact_form.forms import CaptchaConfigurationField
 from contact_form.forms import ContactFormBuilder
 from contact_form.forms import remove_captcha_field
+from contact_form.providers import get_captcha_provider
+from contact_form.providers import get_captcha_provider_choices
 from contact_form.views import CustomSubmissionsListView
 
+if TYPE_CHECKING:
+    from contact_form.security import PageSecurityConfig
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,6 +51,7 @@ class ContactFormEmailError(RuntimeError):
 class CaptchaProvider(models.TextChoices):
     RECAPTCHA = "recaptcha", "Google reCAPTCHA"
     TURNSTILE = "turnstile", "Cloudflare Turnstile"
+    PROOF_OF_WORK = "proof_of_work", "Proof of Work (Self-Hosted)"
 
 
 FORM_FIELD_CHOICES = (
@@ -149,7 +160,7 @@ class ContactPage(AbstractEmailForm):
 
     captcha_provider: models.CharField = models.CharField(
         max_length=20,
-        choices=CaptchaProvider.choices,
+        choices=get_captcha_provider_choices,
         default=CaptchaProvider.RECAPTCHA,
         verbose_name="CAPTCHA Provider",
         help_text=mark_safe(
@@ -158,6 +169,64 @@ class ContactPage(AbstractEmailForm):
         ),
     )
 
+    max_submission_bytes = models.PositiveIntegerField(
+        verbose_name="Maximum Submission Size (in Bytes)",
+        default=65_536,
+        validators=[MinValueValidator(1024)],
+        help_text="Larger submissions are rejected before the page is loaded when "
+        "ContactFormFastRejectMiddleware is enabled.",
+    )
+    reject_disposable_emails = models.BooleanField(
+        verbose_name="Reject Disposable Email Addresses",
+        default=False,
+        help_text="Email fields will not accept addresses from throwaway mail providers.",
+    )
+    submission_budget = models.PositiveIntegerField(
+        verbose_name="Submission Budget",
+        default=0,
+        help_text="The maximum number of submissions the page processes from all visitors "
+        "per budget window. Set to 0 to disable the limit.",
+    )
+    submission_budget_window_seconds = models.PositiveIntegerField(
+        verbose_name="Submission Budget Window (in Seconds)",
+        default=60,
+        validators=[MinValueValidator(1)],
+    )
+    max_concurrent_submissions = models.PositiveIntegerField(
+        verbose_name="Maximum Concurrent Submissions",
+        default=0,
+        help_text="The maximum number of submissions each server process saves and emails "
+        "at the same time. Set to 0 to disable the limit.",
+    )
+    post_limit = models.PositiveIntegerField(
+        verbose_name="Submissions per Visitor",
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Leave blank to use the site-wide CONTACT_FORM_POST_LIMIT.",
+    )
+    post_window_seconds = models.PositiveIntegerField(
+        verbose_name="Submission Window (in Seconds)",
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Leave blank to use the site-wide CONTACT_FORM_POST_WINDOW_SECONDS.",
+    )
+    duplicate_window_seconds = models.PositiveIntegerField(
+        verbose_name="Duplicate Window (in Seconds)",
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Leave blank to use the site-wide CONTACT_FORM_DUPLICATE_WINDOW_SECONDS.",
+    )
+    minimum_completion_seconds = models.PositiveIntegerField(
+        verbose_name="Minimum Completion Time (in Seconds)",
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Leave blank to use the site-wide CONTACT_FORM_MINIMUM_COMPLETION_SECONDS.",
+    )
+
     content_panels: ClassVar[list] = AbstractEmailForm.content_panels + [
         FieldPanel("intro"),
         InlinePanel("form_fields", label="Form Fields"),
@@ -187,8 +256,67 @@ class ContactPage(AbstractEmailForm):
             ],
             heading="Error Handling",
         ),
+        MultiFieldPanel(
+            [
+                FieldPanel("max_submission_bytes"),
+                FieldPanel("reject_disposable_emails"),
+                FieldRowPanel(
+                    [
+                        FieldPanel("submission_budget", classname="col6"),
+                        FieldPanel("submission_budget_window_seconds", classname="col6"),
+                    ]
+                ),
+                FieldPanel("max_concurrent_submissions"),
+            ],
+            heading="Abuse Protection",
+        ),
+        MultiFieldPanel(
+            [
+                FieldRowPanel(
+                    [
+                        FieldPanel("post_limit", classname="col6"),
+                        FieldPanel("post_window_seconds", classname="col6"),
+                    ]
+                ),
+                FieldRowPanel(
+                    [
+                        FieldPanel("duplicate_window_seconds", classname="col6"),
+                        FieldPanel("minimum_completion_seconds", classname="col6"),
+                    ]
+                ),
+            ],
+            heading="Throttling",
+        ),
     ]
 
+    @cached_property
+    def security_config(self) -> PageSecurityConfig:
+        from contact_form.security import PageSecurityConfig
+        from contact_form.security import get_positive_int_override
+
+        return PageSecurityConfig(
+            post_limit=get_positive_int_override(self.post_limit),
+            post_window_seconds=get_positive_int_override(self.post_window_seconds),
+            duplicate_window_seconds=get_positive_int_override(self.duplicate_window_seconds),
+            minimum_completion_seconds=get_positive_int_override(self.minimum_completion_seconds),
+        )
+
+    def clean(self) -> None:
+        from contact_form.security import DEFAULT_TOKEN_MAX_AGE_SECONDS
+        from contact_form.security import get_positive_int_setting
+
+        super().clean()
+        maximum_age = get_positive_int_setting("CONTACT_FORM_TOKEN_MAX_AGE_SECONDS", DEFAULT_TOKEN_MAX_AGE_SECONDS)
+        if self.minimum_completion_seconds and self.minimum_completion_seconds >= maximum_age:
+            raise ValidationError(
+                {
+                    "minimum_completion_seconds": _(
+                        "The minimum completion time must be shorter than the form lifetime of %(seconds)s seconds."
+                    )
+                    % {"seconds": maximum_age}
+                }
+            )
+
     def get_form_class_for_request(self, request: HttpRequest | None = None) -> type:
         fb = self.form_builder(self.form_fields.all(), page=self, request=request)
         return fb.get_form_class()
@@ -221,111 +349,73 @@ class ContactPage(AbstractEmailForm):
             form = self.get_form(page=self, user=request.user)
             return self._protect_contact_response(self._render_contact_form(request, form, *args, **kwargs))
 
+        from contact_form.adaptive import observe_captcha_failure
+        from contact_form.adaptive import observe_submission
+        from contact_form.clearance import issue_captcha_clearance
+        from contact_form.load_shedding import SubmissionOverloaded
+        from contact_form.load_shedding import shed_submission_load
+        from contact_form.pipeline import SubmissionContext
+        from contact_form.pipeline import get_security_pipeline
         from contact_form.security import DuplicateContactSubmission
-        from contact_form.security import FormSecurityError
-        from contact_form.security import SecurityStateUnavailable
         from contact_form.security import ValidatedSubmissionSecurity
-        from contact_form.security import consume_post_rate_limit
+        from contact_form.security import get_client_fingerprint
         from contact_form.security import get_submission_fingerprint
         from contact_form.security import get_submission_nonce_hash
-        from contact_form.security import is_submission_nonce_used
-        from contact_form.security import is_honeypot_filled
-        from contact_form.security import validate_form_security_token
-
-        try:
-            rate_decision, client_fingerprint = consume_post_rate_limit(
-                page=self,
-                request=request,
-            )
-        except SecurityStateUnavailable:
-            form = self.get_form(page=self, user=request.user)
-            response = self._render_contact_form(
-                request,
-                form,
-                *args,
-                security_error=_("The form is temporarily unavailable. Please try again later."),
-                status=503,
-                **kwargs,
-            )
-            return self._protect_contact_response(response)
-
-        if not rate_decision.allowed:
-            form = self.get_form(page=self, user=request.user)
-            response = self._render_contact_form(
-                request,
-                form,
-                *args,
-                security_error=_("You submitted the form too frequently. Please wait and try again."),
-                status=429,
-                **kwargs,
-            )
-            response["Retry-After"] = str(rate_decision.retry_after_seconds)
-            return self._protect_contact_response(response)
-
-        try:
-            token_payload = validate_form_security_token(
-                page=self,
-                token=str(request.POST.get("_contact_form_token", "")),
-            )
-        except FormSecurityError:
-            form = self.get_form(page=self, user=request.user)
-            response = self._render_contact_form(
-                request,
-                form,
-                *args,
-                security_error=_("We could not verify this form. Please reload the page and try again."),
-                status=400,
-                **kwargs,
-            )
-            return self._protect_contact_response(response)
 
-        if is_honeypot_filled(request, token_payload):
-            return self._protect_contact_response(self.render_landing_page(request, None, *args, **kwargs))
-
-        nonce_hash = get_submission_nonce_hash(
+        submission = SubmissionContext(page=self, request=request)
+        rejection = get_security_pipeline().run(submission)
+        observe_submission(
             page=self,
-            nonce=token_payload.nonce,
+            request=request,
+            rejection=rejection,
+            rejected_stage=submission.extra.get("rejected_stage"),
         )
-        try:
-            nonce_was_used = is_submission_nonce_used(
-                page=self,
-                nonce_hash=nonce_hash,
-            )
-        except SecurityStateUnavailable:
-            form = self.get_form(page=self, user=request.user)
-            response = self._render_contact_form(
-                request,
-                form,
-                *args,
-                security_error=_("The form is temporarily unavailable. Please try again later."),
-                status=503,
-                **kwargs,
-            )
-            return self._protect_contact_response(response)
-
-        if nonce_was_used:
-            return self._protect_contact_response(self.render_landing_page(request, None, *args, **kwargs))
-
-        form = self.get_form(
-            request.POST,
-            request.FILES,
+        if rejection is not None:
+            return self._protect_contact_response(self._render_stage_rejection(request, rejection, *args, **kwargs))
+        if submission.token_payload is None:
+            raise ImproperlyConfigured("CONTACT_FORM_SECURITY_STAGES must include contact_form.pipeline.TokenStage.")
+        nonce_hash = submission.nonce_hash or get_submission_nonce_hash(
             page=self,
-            user=request.user,
-            request=request,
+            nonce=submission.token_payload.nonce,
         )
+        client_fingerprint = submission.client_fingerprint or get_client_fingerprint(request)
+
+        form = submission.form
+        if form is None:
+            form = self.get_form(
+                request.POST,
+                request.FILES,
+                page=self,
+                user=request.user,
+                request=request,
+            )
         if form.is_valid():
             form._contact_form_security = ValidatedSubmissionSecurity(
                 nonce_hash=nonce_hash,
+                issued_at=submission.token_payload.issued_at,
                 submission_fingerprint=get_submission_fingerprint(
                     page=self,
                     form=form,
                     client_fingerprint=client_fingerprint,
                 ),
             )
+            captcha_field = form.fields.get(ContactFormBuilder.CAPTCHA_FIELD_NAME)
+            captcha_verified = captcha_field is not None and not isinstance(captcha_field, CaptchaConfigurationField)
             try:
-                form_submission = self.process_form_submission(form)
+                with shed_submission_load(self):
+                    form_submission = self.process_form_submission(form)
             except DuplicateContactSubmission:
                 form_submission = None
+            except SubmissionOverloaded as exc:
+                logger.warning("Contact form submission shed: page_id=%s reason=%s", self.pk, exc.reason)
+                response = self._render_overloaded(
+                    request,
+                    form,
+                    *args,
+                    retry_after_seconds=exc.retry_after_seconds,
+                    **kwargs,
+                )
+                return self._protect_contact_response(response)
             except ContactFormEmailError as exc:
                 cause = exc.__cause__ or exc
                 logger.error(
@@ -341,15 +431,18 @@ class ContactPage(AbstractEmailForm):
                     **kwargs,
                 )
                 return self._protect_contact_response(response)
-            return self._protect_contact_response(
-                self.render_landing_page(
-                    request,
-                    form_submission,
-                    *args,
-                    **kwargs,
-                )
+            response = self.render_landing_page(
+                request,
+                form_submission,
+                *args,
+                **kwargs,
             )
+            if captcha_verified:
+                issue_captcha_clearance(response, page=self, request=request)
+            return self._protect_contact_response(response)
 
+        if ContactFormBuilder.CAPTCHA_FIELD_NAME in form.errors:
+            observe_captcha_failure(page=self, request=request)
         return self._protect_contact_response(self._render_contact_form(request, form, *args, **kwargs))
 
     def process_form_submission(self, form: Any) -> Any:
@@ -377,6 +470,7 @@ class ContactPage(AbstractEmailForm):
             nonce_decision = reserve_submission_nonce(
                 page=self,
                 nonce_hash=submission_security.nonce_hash,
+                issued_at=submission_security.issued_at,
             )
             if not nonce_decision.allowed:
                 raise DuplicateContactSubmission
@@ -390,6 +484,9 @@ class ContactPage(AbstractEmailForm):
                 raise DuplicateContactSubmission
             duplicate_reserved = True
 
+            self._check_blocklist(form)
+            self._check_near_duplicate_submission(form)
+
             remove_captcha_field(form)
             captcha_removed = True
 
@@ -435,6 +532,44 @@ class ContactPage(AbstractEmailForm):
 
         return submission
 
+    def _check_blocklist(self, form: Any) -> None:
+        from contact_form.blocklist import find_blocklisted_value
+        from contact_form.metrics import increment_counter
+        from contact_form.security import DuplicateContactSubmission
+
+        match = find_blocklisted_value(
+            {
+                name: value
+                for name, value in form.cleaned_data.items()
+                if name != ContactFormBuilder.CAPTCHA_FIELD_NAME
+            }
+        )
+        if match is None:
+            return
+
+        increment_counter("contact_form.blocklist.matches", field=match.field_name)
+        logger.warning("Blocklisted contact submission rejected: page_id=%s field=%s", self.pk, match.field_name)
+        raise DuplicateContactSubmission
+
+    def _check_near_duplicate_submission(self, form: Any) -> None:
+        from contact_form.security import DuplicateContactSubmission
+        from contact_form.similarity import is_near_duplicate_detection_enabled
+        from contact_form.similarity import record_near_duplicate_submission
+
+        if not is_near_duplicate_detection_enabled():
+            return
+
+        decision = record_near_duplicate_submission(page=self, form=form)
+        if decision.flagged:
+            logger.warning(
+                "Near-duplicate contact submission campaign detected: page_id=%s hits=%s action=%s",
+                self.pk,
+                decision.hits,
+                "flag" if decision.allowed else "reject",
+            )
+        if not decision.allowed:
+            raise DuplicateContactSubmission
+
     def _render_contact_form(
         self,
         request: HttpRequest,
@@ -455,6 +590,72 @@ class ContactPage(AbstractEmailForm):
             status=status,
         )
 
+    def _render_rejection(
+        self,
+        request: HttpRequest,
+        *args: Any,
+        security_error: Any,
+        status: int,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        from contact_form.rejections import render_form_rejection
+
+        response = render_form_rejection(self, request, *args, message=security_error, status=status, **kwargs)
+        if response is not None:
+            return response
+        form = self.get_form(page=self, user=request.user)
+        return self._render_contact_form(
+            request,
+            form,
+            *args,
+            security_error=security_error,
+            status=status,
+            **kwargs,
+        )
+
+    def _render_stage_rejection(self, request: HttpRequest, rejection: Any, *args: Any, **kwargs: Any) -> HttpResponse:
+        if rejection.silent:
+            return self._render_silent_landing(request, *args, **kwargs)
+        response = self._render_rejection(
+            request,
+            *args,
+            security_error=rejection.message,
+            status=rejection.status,
+            **kwargs,
+        )
+        if rejection.retry_after_seconds is not None:
+            response["Retry-After"] = str(rejection.retry_after_seconds)
+        return response
+
+    def _render_overloaded(
+        self,
+        request: HttpRequest,
+        form: Any,
+        *args: Any,
+        retry_after_seconds: int,
+        **kwargs: Any,
+    ) -> HttpResponse:
+        from contact_form.load_shedding import OVERLOADED_MESSAGE
+
+        response = self._render_contact_form(
+            request,
+            form,
+            *args,
+            security_error=OVERLOADED_MESSAGE,
+            status=503,
+            **kwargs,
+        )
+        response["Retry-After"] = str(retry_after_seconds)
+        return response
+
+    def _render_silent_landing(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        from contact_form.rejections import render_silent_landing
+
+        response = render_silent_landing(self, request, *args, **kwargs)
+        if response is not None:
+            return response
+        return self.render_landing_page(request, None, *args, **kwargs)
+
     def _protect_contact_response(self, response: HttpResponse) -> HttpResponse:
         request = getattr(self, "_current_request", None)
         if request is not None:
@@ -486,9 +687,22 @@ class ContactPage(AbstractEmailForm):
         security_token, honeypot_name = issue_form_security_token(self)
         context["form_security_token"] = security_token
         context["form_honeypot_name"] = honeypot_name
+        provider = get_captcha_provider(self.captcha_provider)
+        context["captcha_script_template"] = provider.script_template
+        context.update(provider.get_context(page=self, request=request, form_token=security_token))
         return context
 
 
+class ContactFormSecurityState(models.Model):
+    key = models.CharField(max_length=64, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    expires_at = models.PositiveBigIntegerField(db_index=True)
+
+    class Meta:
+        verbose_name = "Security State"
+        verbose_name_plural = "Security States"
+
+
 try:
     from wagtail_localize.fields import SynchronizedField
     from wagtail_localize.fields import TranslatableField
@@ -510,4 +724,8 @@ else:
         SynchronizedField("technical_to_address", overridable=True),
         SynchronizedField("captcha_provider", overridable=True),
         SynchronizedField("error_message_throttling", overridable=True),
+        SynchronizedField("post_limit", overridable=True),
+        SynchronizedField("post_window_seconds", overridable=True),
+        SynchronizedField("duplicate_window_seconds", overridable=True),
+        SynchronizedField("minimum_completion_seconds", overridable=True),
     ]
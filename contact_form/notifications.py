@@ -4,6 +4,7 @@ import ast
 import hashlib
 import logging
 import re
+from collections.abc import Iterable
 from collections.abc import Mapping
 from datetime import timedelta
 from typing import TYPE_CHECKING
@@ -12,17 +13,18 @@ from typing import Any
 from django.conf import settings
 from django.core.mail import send_mail
 
+from contact_form.context import get_request_environment
 from contact_form.security import SecurityEventKind
 from contact_form.security import SecurityStateUnavailable
 from contact_form.security import acquire_security_window
 from contact_form.security import get_page_scope_hash
 from contact_form.security import privacy_hash
-from contact_form.utils import is_localhost
 
 if TYPE_CHECKING:
     from django.http import HttpRequest
 
     from contact_form.models import ContactPage
+    from contact_form.turnstile import VerificationResult
 
 logger = logging.getLogger(__name__)
 
@@ -112,10 +114,33 @@ def _report_to_sentry(
         logger.debug("Failed to report CAPTCHA error to Sentry: %s", type(exc).__name__)
 
 
-def build_captcha_error_key(provider: str, error_message: str) -> str:
+_RESULT_CATEGORY_KEYS = {
+    "transport": "transport.api-request",
+    "response": "response.invalid",
+    "unexpected": "unexpected",
+}
+
+
+def _error_codes_suffix(codes: Iterable[object]) -> str:
+    safe_codes = sorted({str(code).casefold() for code in codes if _SAFE_ERROR_CODE.fullmatch(str(code).casefold())})
+    return "+".join(safe_codes) if safe_codes else "unknown"
+
+
+def build_captcha_error_key(
+    provider: str,
+    error_message: str,
+    *,
+    result: VerificationResult | None = None,
+) -> str:
     provider_key = re.sub(r"[^a-z0-9]+", "-", provider.casefold()).strip("-") or "captcha"
     prefix = "turnstile" if "turnstile" in provider_key else provider_key
 
+    if result is not None:
+        if result.category in {"verification", "configuration"}:
+            return f"{prefix}.{result.category}.{_error_codes_suffix(result.error_codes)}"
+        if result.category in _RESULT_CATEGORY_KEYS:
+            return f"{prefix}.{_RESULT_CATEGORY_KEYS[result.category]}"
+
     if error_message.startswith("Verification Failed:"):
         raw_codes = error_message.partition(":")[2].strip()
         try:
@@ -125,11 +150,7 @@ def build_captcha_error_key(provider: str, error_message: str) -> str:
 
         if not isinstance(parsed_codes, (list, tuple, set)):
             parsed_codes = [parsed_codes]
-        codes = sorted(
-            {str(code).casefold() for code in parsed_codes if _SAFE_ERROR_CODE.fullmatch(str(code).casefold())}
-        )
-        suffix = "+".join(codes) if codes else "unknown"
-        return f"{prefix}.verification.{suffix}"
+        return f"{prefix}.verification.{_error_codes_suffix(parsed_codes)}"
 
     stable_prefixes = {
         "Turnstile Secret Key is Not Configured": "configuration.missing-secret",
@@ -173,12 +194,13 @@ def notify_captcha_error(
     *,
     page: ContactPage | None = None,
     error_key: str | None = None,
+    result: VerificationResult | None = None,
 ) -> bool:
 
-    stable_error_key = error_key or build_captcha_error_key(provider, error_message)
+    stable_error_key = error_key or build_captcha_error_key(provider, error_message, result=result)
     safe_extra_data = _safe_extra_data(extra_data)
 
-    if is_localhost(request):
+    if request is not None and get_request_environment(request).is_localhost:
         logger.warning(
             "CAPTCHA Error on Localhost: provider=%s error_key=%s error=%s extra=%s",
             provider,
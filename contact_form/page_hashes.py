@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from contact_form.security import SECURITY_KEY_HASH_TAG_LENGTH
+from contact_form.security import SECURITY_KEY_LAYOUT_PAGE_HASHES
+from contact_form.security import SecurityStateKey
+from contact_form.security import get_positive_int_setting
+from contact_form.security import get_redis_client
+from contact_form.security import get_security_cache
+from contact_form.security import get_security_key_layout
+
+PAGE_HASH_SECURITY_CACHE_KEY_PREFIX = "contact-form-security:v3"
+PAGE_HASH_FIELD_BYTES = 12
+DEFAULT_PAGE_HASH_SHARDS = 1024
+
+RESERVE_SCRIPT = """
+local now = tonumber(ARGV[2])
+for index = 1, #KEYS do
+    local expires_at = redis.call('HGET', KEYS[index], ARGV[1])
+    if expires_at and tonumber(expires_at) > now then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return 1
+"""
+
+
+class PageHashSecurityState:
+    def __init__(self, *, shards: int, cache_backend: Any = None) -> None:
+        self.shards = shards
+        self._cache_backend = cache_backend
+        self._reserve_script: Any = None
+
+    @property
+    def cache(self) -> Any:
+        return self._cache_backend if self._cache_backend is not None else get_security_cache()
+
+    def increment(
+        self,
+        *,
+        kind: str,
+        scope_hash: str,
+        fingerprint: str,
+        bucket: int,
+        timeout: int,
+    ) -> int:
+        field = self._field(kind, scope_hash, fingerprint)
+        key = self._hash_key(kind=kind, scope_hash=scope_hash, epoch=bucket, field=field)
+        pipeline = self._client(key).pipeline(transaction=False)
+        pipeline.hincrby(key, field, 1)
+        pipeline.expire(key, timeout)
+        count, _expire_result = pipeline.execute()
+        return int(count)
+
+    def increment_many(self, keys: Sequence[SecurityStateKey], *, timeout: int) -> list[int]:
+        if not keys:
+            return []
+        pipeline: Any = None
+        for key in keys:
+            field = self._field(key.kind, key.scope_hash, key.fingerprint)
+            hash_key = self._hash_key(kind=key.kind, scope_hash=key.scope_hash, epoch=key.bucket or 0, field=field)
+            if pipeline is None:
+                pipeline = self._client(hash_key).pipeline(transaction=False)
+            pipeline.hincrby(hash_key, field, 1)
+            pipeline.expire(hash_key, timeout)
+        return [int(count) for count in pipeline.execute()[::2]]
+
+    def reserve(
+        self,
+        *,
+        kind: str,
+        scope_hash: str,
+        fingerprint: str,
+        duration_seconds: int,
+    ) -> bool:
+        now = int(time.time())
+        field = self._field(kind, scope_hash, fingerprint)
+        keys = self._reservation_keys(kind=kind, scope_hash=scope_hash, field=field, duration_seconds=duration_seconds)
+        client = self._client(keys[0])
+        if self._reserve_script is None:
+            self._reserve_script = client.register_script(RESERVE_SCRIPT)
+        return bool(
+            self._reserve_script(
+                keys=keys,
+                args=[field, now, now + duration_seconds, 2 * duration_seconds + 1],
+                client=client,
+            )
+        )
+
+    def exists(
+        self,
+        *,
+        kind: str,
+        scope_hash: str,
+        fingerprint: str,
+        duration_seconds: int,
+    ) -> bool:
+        now = int(time.time())
+        field = self._field(kind, scope_hash, fingerprint)
+        keys = self._reservation_keys(kind=kind, scope_hash=scope_hash, field=field, duration_seconds=duration_seconds)
+        pipeline = self._client(keys[0]).pipeline(transaction=False)
+        for key in keys:
+            pipeline.hget(key, field)
+        return any(expires_at is not None and int(expires_at) > now for expires_at in pipeline.execute())
+
+    def release(
+        self,
+        *,
+        kind: str,
+        scope_hash: str,
+        fingerprint: str,
+        duration_seconds: int,
+    ) -> bool:
+        field = self._field(kind, scope_hash, fingerprint)
+        keys = self._reservation_keys(kind=kind, scope_hash=scope_hash, field=field, duration_seconds=duration_seconds)
+        pipeline = self._client(keys[0]).pipeline(transaction=False)
+        for key in keys:
+            pipeline.hdel(key, field)
+        return any(pipeline.execute())
+
+    @staticmethod
+    def _field(kind: str, scope_hash: str, fingerprint: str) -> bytes:
+        payload = "\x1f".join((str(kind), scope_hash, fingerprint)).encode("utf-8")
+        return hashlib.sha256(payload).digest()[:PAGE_HASH_FIELD_BYTES]
+
+    def _hash_key(self, *, kind: str, scope_hash: str, epoch: int, field: bytes) -> str:
+        shard = int.from_bytes(field[:4], "big") % self.shards
+        hash_tag = scope_hash[:SECURITY_KEY_HASH_TAG_LENGTH]
+        return self.cache.make_key(f"{PAGE_HASH_SECURITY_CACHE_KEY_PREFIX}:{{{hash_tag}}}:{kind}:{epoch}:{shard}")
+
+    def _reservation_keys(
+        self,
+        *,
+        kind: str,
+        scope_hash: str,
+        field: bytes,
+        duration_seconds: int,
+    ) -> list[str]:
+        epoch = int(time.time()) // duration_seconds
+        return [
+            self._hash_key(kind=kind, scope_hash=scope_hash, epoch=epoch, field=field),
+            self._hash_key(kind=kind, scope_hash=scope_hash, epoch=epoch - 1, field=field),
+        ]
+
+    def _client(self, key: str) -> Any:
+        client = get_redis_client(self.cache, key)
+        if client is None:
+            raise RuntimeError("CONTACT_FORM page-hash security state requires a Redis cache backend.")
+        return client
+
+
+_page_hash_state: PageHashSecurityState | None = None
+
+
+def get_page_hash_state() -> PageHashSecurityState | None:
+    global _page_hash_state
+
+    if get_security_key_layout() != SECURITY_KEY_LAYOUT_PAGE_HASHES:
+        return None
+    security_cache = get_security_cache()
+    if get_redis_client(security_cache, security_cache.make_key(PAGE_HASH_SECURITY_CACHE_KEY_PREFIX)) is None:
+        return None
+
+    shards = get_positive_int_setting("CONTACT_FORM_SECURITY_HASH_SHARDS", DEFAULT_PAGE_HASH_SHARDS)
+    if _page_hash_state is None or _page_hash_state.shards != shards:
+        _page_hash_state = PageHashSecurityState(shards=shards)
+    return _page_hash_state
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import ClassVar
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+
+from contact_form.metrics import increment_counter
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+    from contact_form.models import ContactPage
+    from contact_form.security import FormSecurityPayload
+    from contact_form.security import SecurityWindowDecision
+
+STAGE_COST_CPU = "cpu"
+STAGE_COST_CACHE = "cache"
+STAGE_COST_NETWORK = "network"
+
+DEFAULT_SECURITY_STAGES = (
+    "contact_form.pipeline.IPBlocklistStage",
+    "contact_form.pipeline.TokenStage",
+    "contact_form.pipeline.HoneypotStage",
+    "contact_form.pipeline.ScoringStage",
+    "contact_form.pipeline.CaptchaPostStage",
+    "contact_form.pipeline.AdaptiveStage",
+    "contact_form.pipeline.RateLimitStage",
+    "contact_form.pipeline.NonceStage",
+    "contact_form.pipeline.SubmissionBudgetStage",
+    "contact_form.pipeline.TurnstilePrefetchStage",
+)
+
+RATE_DECISION_ATTRIBUTE = "_contact_form_rate_decision"
+
+UNAVAILABLE_MESSAGE = _("The form is temporarily unavailable. Please try again later.")
+
+
+@dataclass(slots=True)
+class SubmissionContext:
+    page: ContactPage
+    request: HttpRequest
+    token_payload: FormSecurityPayload | None = None
+    client_fingerprint: str | None = None
+    nonce_hash: str | None = None
+    form: Any = None
+    on_reject: list[Callable[[], None]] = field(default_factory=list)
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class PrecomputedRateDecision:
+    page_id: int
+    decision: SecurityWindowDecision
+    client_fingerprint: str
+
+
+@dataclass(frozen=True, slots=True)
+class StageRejection:
+    reason: str
+    status: int = 400
+    message: Any = None
+    retry_after_seconds: int | None = None
+    silent: bool = False
+
+
+class SecurityStage:
+    name: ClassVar[str] = ""
+    cost: ClassVar[str] = STAGE_COST_CPU
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        raise NotImplementedError
+
+    @property
+    def label(self) -> str:
+        return self.name or type(self).__name__
+
+
+def _require_token_payload(stage: SecurityStage, submission: SubmissionContext) -> FormSecurityPayload:
+    if submission.token_payload is None:
+        raise ImproperlyConfigured(f"{stage.label} must run after contact_form.pipeline.TokenStage.")
+    return submission.token_payload
+
+
+class IPBlocklistStage(SecurityStage):
+    name = "ip_blocklist"
+    cost = STAGE_COST_CPU
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.ip_blocklist import is_ip_blocklisted
+
+        if is_ip_blocklisted(submission.request):
+            return StageRejection(
+                reason="ip-blocklisted",
+                status=403,
+                message=_("Submissions from your network are not accepted."),
+            )
+        return None
+
+
+class TokenStage(SecurityStage):
+    name = "token"
+    cost = STAGE_COST_CPU
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.security import FORM_TOKEN_FIELD_NAME
+        from contact_form.security import FormSecurityError
+        from contact_form.security import validate_form_security_token
+
+        try:
+            submission.token_payload = validate_form_security_token(
+                page=submission.page,
+                token=str(submission.request.POST.get(FORM_TOKEN_FIELD_NAME, "")),
+            )
+        except FormSecurityError as exc:
+            return StageRejection(
+                reason=exc.code,
+                status=400,
+                message=_("We could not verify this form. Please reload the page and try again."),
+            )
+        return None
+
+
+class HoneypotStage(SecurityStage):
+    name = "honeypot"
+    cost = STAGE_COST_CPU
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.security import is_honeypot_filled
+
+        if is_honeypot_filled(submission.request, _require_token_payload(self, submission)):
+            return StageRejection(reason="honeypot", status=200, silent=True)
+        return None
+
+
+class ScoringStage(SecurityStage):
+    name = "scoring"
+    cost = STAGE_COST_CPU
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.clearance import deny_captcha_clearance
+        from contact_form.scoring import SPAM_VERDICT_CHALLENGE
+        from contact_form.scoring import SPAM_VERDICT_DROP
+        from contact_form.scoring import get_spam_verdict
+        from contact_form.scoring import get_submitted_text_fields
+        from contact_form.scoring import score_submission
+
+        payload = _require_token_payload(self, submission)
+        spam_score = score_submission(
+            fields=get_submitted_text_fields(submission.request.POST, honeypot_name=payload.honeypot_name),
+            completion_seconds=max(0.0, time.time() - payload.issued_at),
+        )
+        verdict = get_spam_verdict(spam_score.score)
+        submission.extra["spam_score"] = spam_score
+        increment_counter("contact_form.scoring.verdicts", verdict=verdict)
+
+        if verdict == SPAM_VERDICT_DROP:
+            return StageRejection(reason="spam-score", status=200, silent=True)
+        if verdict == SPAM_VERDICT_CHALLENGE:
+            deny_captcha_clearance(page=submission.page, request=submission.request)
+        return None
+
+
+class CaptchaPostStage(SecurityStage):
+    name = "captcha_post"
+    cost = STAGE_COST_CACHE
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.providers import get_captcha_provider
+
+        _require_token_payload(self, submission)
+        provider = get_captcha_provider(getattr(submission.page, "captcha_provider", None))
+        provider.observe_post(page=submission.page, request=submission.request)
+        return None
+
+
+class AdaptiveStage(SecurityStage):
+    name = "adaptive"
+    cost = STAGE_COST_CACHE
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.adaptive import get_attack_minimum_completion_seconds
+        from contact_form.adaptive import is_under_attack
+
+        payload = _require_token_payload(self, submission)
+        if not is_under_attack(page=submission.page, request=submission.request):
+            return None
+        if time.time() - payload.issued_at < get_attack_minimum_completion_seconds():
+            return StageRejection(
+                reason="submitted-too-quickly",
+                status=400,
+                message=_("We could not verify this form. Please reload the page and try again."),
+            )
+        return None
+
+
+class RateLimitStage(SecurityStage):
+    name = "rate_limit"
+    cost = STAGE_COST_CACHE
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.adaptive import get_attack_post_limit
+        from contact_form.adaptive import is_under_attack
+        from contact_form.security import SecurityStateUnavailable
+        from contact_form.security import consume_post_rate_limit
+        from contact_form.security import get_page_security_config
+
+        precomputed = getattr(submission.request, RATE_DECISION_ATTRIBUTE, None)
+        if isinstance(precomputed, PrecomputedRateDecision) and precomputed.page_id == submission.page.pk:
+            decision, submission.client_fingerprint = precomputed.decision, precomputed.client_fingerprint
+        else:
+            try:
+                decision, submission.client_fingerprint = consume_post_rate_limit(
+                    page=submission.page,
+                    request=submission.request,
+                )
+            except SecurityStateUnavailable:
+                return StageRejection(reason="state-unavailable", status=503, message=UNAVAILABLE_MESSAGE)
+        if not decision.allowed:
+            return StageRejection(
+                reason="rate-limited",
+                status=429,
+                message=_("You submitted the form too frequently. Please wait and try again."),
+                retry_after_seconds=decision.retry_after_seconds,
+            )
+        if is_under_attack(page=submission.page, request=submission.request):
+            config = get_page_security_config(submission.page)
+            if decision.previous_count >= get_attack_post_limit(config.get_post_limit()):
+                return StageRejection(
+                    reason="rate-limited",
+                    status=429,
+                    message=_("You submitted the form too frequently. Please wait and try again."),
+                    retry_after_seconds=config.get_post_window_seconds(),
+                )
+        return None
+
+
+class SubmissionBudgetStage(SecurityStage):
+    name = "submission_budget"
+    cost = STAGE_COST_CACHE
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.load_shedding import OVERLOADED_MESSAGE
+        from contact_form.load_shedding import SubmissionOverloaded
+        from contact_form.load_shedding import consume_submission_budget
+
+        try:
+            consume_submission_budget(submission.page)
+        except SubmissionOverloaded as exc:
+            return StageRejection(
+                reason="overloaded",
+                status=503,
+                message=OVERLOADED_MESSAGE,
+                retry_after_seconds=exc.retry_after_seconds,
+            )
+        return None
+
+
+class TurnstilePrefetchStage(SecurityStage):
+    name = "turnstile_prefetch"
+    cost = STAGE_COST_NETWORK
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.forms import ContactFormBuilder
+        from contact_form.turnstile import TURNSTILE_RESPONSE_FIELD_NAME
+        from contact_form.turnstile import TurnstileField
+        from contact_form.turnstile import is_turnstile_prefetch_enabled
+
+        if not is_turnstile_prefetch_enabled():
+            return None
+
+        request = submission.request
+        submission.form = submission.page.get_form(
+            request.POST,
+            request.FILES,
+            page=submission.page,
+            user=request.user,
+            request=request,
+        )
+        captcha_field = submission.form.fields.get(ContactFormBuilder.CAPTCHA_FIELD_NAME)
+        if isinstance(captcha_field, TurnstileField):
+            if captcha_field.prefetch(request.POST.get(TURNSTILE_RESPONSE_FIELD_NAME)) is not None:
+                submission.on_reject.append(captcha_field.cancel_prefetch)
+        return None
+
+
+class NonceStage(SecurityStage):
+    name = "nonce"
+    cost = STAGE_COST_CACHE
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        from contact_form.security import SecurityStateUnavailable
+        from contact_form.security import get_submission_nonce_hash
+        from contact_form.security import is_submission_nonce_used
+
+        submission.nonce_hash = get_submission_nonce_hash(
+            page=submission.page,
+            nonce=_require_token_payload(self, submission).nonce,
+        )
+        try:
+            nonce_was_used = is_submission_nonce_used(
+                page=submission.page,
+                nonce_hash=submission.nonce_hash,
+                issued_at=_require_token_payload(self, submission).issued_at,
+            )
+        except SecurityStateUnavailable:
+            return StageRejection(reason="state-unavailable", status=503, message=UNAVAILABLE_MESSAGE)
+        if nonce_was_used:
+            return StageRejection(reason="replayed-nonce", status=200, silent=True)
+        return None
+
+
+class SecurityPipeline:
+    def __init__(self, stages: Sequence[SecurityStage]) -> None:
+        self.stages = tuple(stages)
+
+    def run(self, submission: SubmissionContext) -> StageRejection | None:
+        for stage in self.stages:
+            started = time.perf_counter()
+            try:
+                rejection = stage.check(submission)
+            finally:
+                increment_counter("contact_form.pipeline.stage_calls", stage=stage.label)
+                increment_counter(
+                    "contact_form.pipeline.stage_seconds",
+                    time.perf_counter() - started,
+                    stage=stage.label,
+                )
+            if rejection is not None:
+                submission.extra["rejected_stage"] = stage.label
+                increment_counter("contact_form.pipeline.rejections", stage=stage.label, reason=rejection.reason)
+                for callback in submission.on_reject:
+                    callback()
+                return rejection
+        return None
+
+
+def get_security_stage_paths() -> tuple[str, ...]:
+    return tuple(str(path) for path in getattr(settings, "CONTACT_FORM_SECURITY_STAGES", DEFAULT_SECURITY_STAGES))
+
+
+_security_pipeline: tuple[tuple[str, ...], SecurityPipeline] | None = None
+
+
+def get_security_pipeline() -> SecurityPipeline:
+    global _security_pipeline
+
+    stage_paths = get_security_stage_paths()
+    if _security_pipeline is None or _security_pipeline[0] != stage_paths:
+        _security_pipeline = (stage_paths, SecurityPipeline([import_string(path)() for path in stage_paths]))
+    return _security_pipeline[1]
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import math
+import secrets
+import time
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django import forms
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+from contact_form.local_cache import LocalTTLCache
+from contact_form.metrics import increment_counter
+from contact_form.security import DEFAULT_TOKEN_MAX_AGE_SECONDS
+from contact_form.security import FORM_TOKEN_FIELD_NAME
+from contact_form.security import SecurityEventKind
+from contact_form.security import SecurityStateKey
+from contact_form.security import get_page_scope_hash
+from contact_form.security import get_positive_int_setting
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+    from contact_form.models import ContactPage
+
+logger = logging.getLogger(__name__)
+
+POW_ALGORITHM = "SHA-256"
+POW_CHALLENGE_SALT = "contact_form.proof_of_work.v1"
+POW_RESPONSE_MAX_LENGTH = 1024
+POW_RATE_WINDOW_SECONDS = 60
+DEFAULT_POW_MAX_NUMBER = 50_000
+DEFAULT_POW_MAX_NUMBER_CEILING = 1_000_000
+DEFAULT_POW_RATE_THRESHOLD = 30
+
+_recent_posts = LocalTTLCache(256)
+
+
+def clear_recent_posts() -> None:
+    _recent_posts.clear()
+
+
+def _challenge_salt(form_token: str) -> str:
+    return hashlib.sha256(form_token.encode("utf-8")).hexdigest()[:32]
+
+
+def _solution_hash(salt: str, number: int) -> str:
+    return hashlib.sha256(f"{salt}{number}".encode()).hexdigest()
+
+
+def get_recent_post_rate(page: ContactPage) -> float:
+    recent = _recent_posts.get(get_page_scope_hash(page))
+    if recent is None:
+        return 0.0
+
+    bucket, count, previous_count = recent
+    now = time.time()
+    current_bucket = int(now) // POW_RATE_WINDOW_SECONDS
+    if bucket == current_bucket - 1:
+        count, previous_count = 0, count
+    elif bucket != current_bucket:
+        return 0.0
+    # Sliding-window estimate: the previous minute counts for the share of it
+    # that still overlaps the trailing sixty seconds.
+    elapsed = (now % POW_RATE_WINDOW_SECONDS) / POW_RATE_WINDOW_SECONDS
+    return count + previous_count * (1 - elapsed)
+
+
+def record_post(page: ContactPage) -> None:
+    from contact_form.backends import get_security_state_backend
+
+    scope_hash = get_page_scope_hash(page)
+    bucket = int(time.time()) // POW_RATE_WINDOW_SECONDS
+    try:
+        count = get_security_state_backend().increment(
+            SecurityStateKey(
+                kind=SecurityEventKind.PROOF_OF_WORK_RATE,
+                scope_hash=scope_hash,
+                fingerprint="page",
+                bucket=bucket,
+            ),
+            timeout=POW_RATE_WINDOW_SECONDS * 2,
+        )
+    except Exception as exc:
+        logger.warning("Couldn't record proof-of-work POST rate: exception_type=%s", type(exc).__name__)
+        return
+
+    previous_count = 0
+    recent = _recent_posts.get(scope_hash)
+    if recent is not None:
+        recent_bucket, recent_count, recent_previous_count = recent
+        if recent_bucket == bucket:
+            previous_count = recent_previous_count
+        elif recent_bucket == bucket - 1:
+            previous_count = recent_count
+    _recent_posts.set(scope_hash, (bucket, count, previous_count), timeout=POW_RATE_WINDOW_SECONDS * 2)
+
+
+def get_difficulty(page: ContactPage) -> int:
+    base = get_positive_int_setting("CONTACT_FORM_POW_MAX_NUMBER", DEFAULT_POW_MAX_NUMBER)
+    ceiling = max(base, get_positive_int_setting("CONTACT_FORM_POW_MAX_NUMBER_CEILING", DEFAULT_POW_MAX_NUMBER_CEILING))
+    threshold = get_positive_int_setting("CONTACT_FORM_POW_RATE_THRESHOLD", DEFAULT_POW_RATE_THRESHOLD)
+    rate = get_recent_post_rate(page)
+    if rate <= threshold:
+        return base
+    return min(ceiling, base * 2 ** math.ceil(math.log2(rate / threshold)))
+
+
+def issue_challenge(*, page: ContactPage, form_token: str) -> str:
+    salt = _challenge_salt(form_token)
+    max_number = get_difficulty(page)
+    challenge = _solution_hash(salt, secrets.randbelow(max_number + 1))
+    signature = signing.TimestampSigner(salt=POW_CHALLENGE_SALT).sign(f"{salt}:{challenge}:{max_number}")
+    return json.dumps(
+        {
+            "algorithm": POW_ALGORITHM,
+            "salt": salt,
+            "challenge": challenge,
+            "max_number": max_number,
+            "signature": signature,
+        },
+        separators=(",", ":"),
+    )
+
+
+def verify_solution(*, form_token: str, response: str) -> str | None:
+    if len(response) > POW_RESPONSE_MAX_LENGTH:
+        return "malformed"
+    try:
+        solution = json.loads(response)
+        signature = str(solution["signature"])
+        number = int(solution["number"])
+    except (KeyError, TypeError, ValueError):
+        return "malformed"
+
+    max_age = get_positive_int_setting("CONTACT_FORM_TOKEN_MAX_AGE_SECONDS", DEFAULT_TOKEN_MAX_AGE_SECONDS)
+    try:
+        signed_value = signing.TimestampSigner(salt=POW_CHALLENGE_SALT).unsign(signature, max_age=max_age)
+    except signing.SignatureExpired:
+        return "expired"
+    except signing.BadSignature:
+        return "bad-signature"
+
+    salt, challenge, max_number = signed_value.split(":")
+    if not hmac.compare_digest(salt, _challenge_salt(form_token)):
+        return "foreign-challenge"
+    if not 0 <= number <= int(max_number):
+        return "out-of-range"
+    if not hmac.compare_digest(_solution_hash(salt, number), challenge):
+        return "wrong-solution"
+    return None
+
+
+class ProofOfWorkWidget(forms.HiddenInput):
+    template_name = "contact_form/widgets/proof_of_work.html"
+
+    def format_value(self, value: Any) -> None:
+        return None
+
+
+class ProofOfWorkField(forms.Field):
+    default_error_messages = {
+        "required": _("Please wait for the security check to finish."),
+        "invalid": _("The security check failed. Please try again."),
+    }
+
+    def __init__(
+        self,
+        *,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> None:
+        self.page = page
+        self.request = request
+        super().__init__(label="", required=True, widget=ProofOfWorkWidget())
+
+    def validate(self, value: Any) -> None:
+        super().validate(value)
+
+        form_token = "" if self.request is None else str(self.request.POST.get(FORM_TOKEN_FIELD_NAME, ""))
+        failure = verify_solution(form_token=form_token, response=str(value))
+        increment_counter("contact_form.proof_of_work.verifications", result=failure or "success")
+        if failure is not None:
+            raise ValidationError(self.error_messages["invalid"], code="captcha_invalid")
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass
+from dataclasses import field
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import ClassVar
+
+from django import forms
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from contact_form.forms import CaptchaConfigurationField
+from contact_form.forms import _get_turnstile_allowed_hostnames
+from contact_form.utils import get_captcha_keys_for_environment
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+    from contact_form.models import ContactPage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPTCHA_PROVIDER = "recaptcha"
+DEFAULT_CAPTCHA_PROVIDERS: dict[str, str] = {
+    "recaptcha": "contact_form.providers.ReCaptchaProvider",
+    "turnstile": "contact_form.providers.TurnstileProvider",
+    "proof_of_work": "contact_form.providers.ProofOfWorkProvider",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CaptchaSettingsSnapshot:
+    site_key: str = ""
+    secret_key: str = ""
+    options: Mapping[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.site_key and self.secret_key)
+
+
+class CaptchaProviderBackend:
+    slug: ClassVar[str] = ""
+    label: ClassVar[str] = ""
+    script_template: ClassVar[str | None] = None
+
+    def get_settings_snapshot(
+        self,
+        *,
+        captcha_settings: Any | None,
+        request: HttpRequest | None,
+    ) -> CaptchaSettingsSnapshot:
+        return CaptchaSettingsSnapshot()
+
+    def build_field(
+        self,
+        *,
+        snapshot: CaptchaSettingsSnapshot,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> forms.Field:
+        raise NotImplementedError
+
+    def get_context(self, *, page: ContactPage, request: HttpRequest, form_token: str) -> dict[str, Any]:
+        return {}
+
+    def observe_post(self, *, page: ContactPage, request: HttpRequest) -> None:
+        return None
+
+    def get_field(
+        self,
+        *,
+        captcha_settings: Any | None,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> forms.Field:
+        snapshot = self.get_settings_snapshot(captcha_settings=captcha_settings, request=request)
+        return self.build_field(snapshot=snapshot, page=page, request=request)
+
+    def unavailable(
+        self,
+        *,
+        error_message: str,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> CaptchaConfigurationField:
+        return CaptchaConfigurationField(
+            provider=self.label,
+            error_message=error_message,
+            page=page,
+            request=request,
+        )
+
+
+class ReCaptchaProvider(CaptchaProviderBackend):
+    slug = "recaptcha"
+    label = "Google reCAPTCHA"
+
+    def get_settings_snapshot(
+        self,
+        *,
+        captcha_settings: Any | None,
+        request: HttpRequest | None,
+    ) -> CaptchaSettingsSnapshot:
+        configured_keys: dict[str, str] = {"site_key": "", "secret_key": ""}
+        options: dict[str, Any] = {
+            "required_score": getattr(settings, "RECAPTCHA_REQUIRED_SCORE", None),
+            "domain": getattr(settings, "RECAPTCHA_DOMAIN", "www.google.com"),
+        }
+
+        if captcha_settings:
+            recaptcha_config = captcha_settings.get_recaptcha_settings()
+            configured_keys = {
+                "site_key": recaptcha_config.get("public_key", ""),
+                "secret_key": recaptcha_config.get("private_key", ""),
+            }
+            if recaptcha_config.get("required_score"):
+                try:
+                    options["required_score"] = float(recaptcha_config["required_score"])
+                except (ValueError, TypeError):
+                    options["required_score"] = 0.85
+            if recaptcha_config.get("domain"):
+                options["domain"] = recaptcha_config["domain"]
+
+        keys = get_captcha_keys_for_environment("recaptcha", request, configured_keys)
+        return CaptchaSettingsSnapshot(site_key=keys["site_key"], secret_key=keys["secret_key"], options=options)
+
+    def build_field(
+        self,
+        *,
+        snapshot: CaptchaSettingsSnapshot,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> forms.Field:
+        try:
+            from contact_form.recaptcha import ReCaptchaField
+            from contact_form.recaptcha import ReCaptchaWidget
+        except ImportError:
+            logger.warning("Package django-recaptcha is Not Installed")
+            return self.unavailable(
+                error_message="django-recaptcha Package Is Not Installed",
+                page=page,
+                request=request,
+            )
+
+        if not snapshot.is_configured:
+            logger.warning("reCAPTCHA keys not configured. Please configure keys in Settings > CAPTCHA.")
+            return self.unavailable(error_message="reCAPTCHA Not Configured", page=page, request=request)
+
+        from contact_form.security import get_client_ip
+
+        return ReCaptchaField(
+            public_key=snapshot.site_key,
+            private_key=snapshot.secret_key,
+            domain=snapshot.options["domain"],
+            remote_ip=get_client_ip(request) if request is not None else None,
+            label="",
+            widget=ReCaptchaWidget(
+                domain=snapshot.options["domain"],
+                required_score=snapshot.options["required_score"],
+            ),
+        )
+
+
+class TurnstileProvider(CaptchaProviderBackend):
+    slug = "turnstile"
+    label = "Cloudflare Turnstile"
+    script_template = "contact_form/includes/turnstile_scripts.html"
+
+    def get_settings_snapshot(
+        self,
+        *,
+        captcha_settings: Any | None,
+        request: HttpRequest | None,
+    ) -> CaptchaSettingsSnapshot:
+        configured_keys: dict[str, str] = {"site_key": "", "secret_key": ""}
+        theme = "auto"
+        size = "normal"
+
+        if captcha_settings:
+            turnstile_config = captcha_settings.get_turnstile_settings()
+            configured_keys = {
+                "site_key": turnstile_config.get("site_key", ""),
+                "secret_key": turnstile_config.get("secret_key", ""),
+            }
+            theme = turnstile_config.get("theme", "auto")
+            size = turnstile_config.get("size", "normal")
+
+        if not configured_keys.get("site_key") or not configured_keys.get("secret_key"):
+            configured_keys = {
+                "site_key": getattr(settings, "TURNSTILE_SITE_KEY", ""),
+                "secret_key": getattr(settings, "TURNSTILE_SECRET_KEY", ""),
+            }
+            theme = getattr(settings, "TURNSTILE_THEME", theme)
+            size = getattr(settings, "TURNSTILE_SIZE", size)
+
+        keys = get_captcha_keys_for_environment("turnstile", request, configured_keys)
+        return CaptchaSettingsSnapshot(
+            site_key=keys["site_key"],
+            secret_key=keys["secret_key"],
+            options={"theme": theme, "size": size},
+        )
+
+    def build_field(
+        self,
+        *,
+        snapshot: CaptchaSettingsSnapshot,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> forms.Field:
+        try:
+            from contact_form.security import get_client_ip
+            from contact_form.turnstile import TURNSTILE_ACTION
+            from contact_form.turnstile import TurnstileField
+        except ImportError as e:
+            logger.error("Failed to Import TurnstileField: %s", str(e))
+            return self.unavailable(
+                error_message="Turnstile Integration is Not Available",
+                page=page,
+                request=request,
+            )
+
+        if not snapshot.is_configured:
+            logger.warning("Turnstile keys not configured.")
+            return self.unavailable(error_message="Turnstile Keys Not Configured", page=page, request=request)
+
+        return TurnstileField(
+            site_key=snapshot.site_key,
+            secret_key=snapshot.secret_key,
+            theme=snapshot.options["theme"],
+            size=snapshot.options["size"],
+            remote_ip=(get_client_ip(request) if request is not None else None),
+            request=request,
+            page=page,
+            expected_hostnames=_get_turnstile_allowed_hostnames(request),
+            expected_action=TURNSTILE_ACTION,
+            label="",
+        )
+
+
+class ProofOfWorkProvider(CaptchaProviderBackend):
+    slug = "proof_of_work"
+    label = "Proof of Work (Self-Hosted)"
+    script_template = "contact_form/includes/proof_of_work_scripts.html"
+
+    def build_field(
+        self,
+        *,
+        snapshot: CaptchaSettingsSnapshot,
+        page: ContactPage | None,
+        request: HttpRequest | None,
+    ) -> forms.Field:
+        from contact_form.proof_of_work import ProofOfWorkField
+
+        return ProofOfWorkField(page=page, request=request)
+
+    def get_context(self, *, page: ContactPage, request: HttpRequest, form_token: str) -> dict[str, Any]:
+        from contact_form.proof_of_work import issue_challenge
+
+        return {"proof_of_work_challenge": issue_challenge(page=page, form_token=form_token)}
+
+    def observe_post(self, *, page: ContactPage, request: HttpRequest) -> None:
+        from contact_form.proof_of_work import record_post
+
+        record_post(page)
+
+
+def get_captcha_provider_paths() -> dict[str, str]:
+    configured = getattr(settings, "CONTACT_FORM_CAPTCHA_PROVIDERS", {}) or {}
+    paths = {**DEFAULT_CAPTCHA_PROVIDERS, **{str(slug): path for slug, path in dict(configured).items()}}
+    return {slug: str(path) for slug, path in paths.items() if path}
+
+
+_captcha_providers: tuple[tuple[tuple[str, str], ...], dict[str, CaptchaProviderBackend]] | None = None
+
+
+def get_captcha_providers() -> dict[str, CaptchaProviderBackend]:
+    global _captcha_providers
+
+    provider_paths = tuple(get_captcha_provider_paths().items())
+    if _captcha_providers is None or _captcha_providers[0] != provider_paths:
+        _captcha_providers = (provider_paths, {slug: import_string(path)() for slug, path in provider_paths})
+    return _captcha_providers[1]
+
+
+def get_captcha_provider(slug: str | None) -> CaptchaProviderBackend:
+    providers = get_captcha_providers()
+    provider = providers.get(slug or "")
+    if provider is None:
+        provider = providers.get(DEFAULT_CAPTCHA_PROVIDER) or ReCaptchaProvider()
+    return provider
+
+
+def get_captcha_provider_choices() -> list[tuple[str, str]]:
+    try:
+        providers = get_captcha_providers()
+    except (ImportError, TypeError):
+        providers = {slug: import_string(path)() for slug, path in DEFAULT_CAPTCHA_PROVIDERS.items()}
+    return [(slug, provider.label or slug) for slug, provider in providers.items()]
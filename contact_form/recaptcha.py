@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import http.client
+import json
+import logging
+from typing import Any
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django_recaptcha.fields import ReCaptchaField as BaseReCaptchaField
+from django_recaptcha.widgets import ReCaptchaV3
+
+from contact_form.transport import get_verification_transport
+
+logger = logging.getLogger(__name__)
+
+RECAPTCHA_VERIFY_PATH = "/recaptcha/api/siteverify"
+
+
+class ReCaptchaWidget(ReCaptchaV3):
+    def __init__(self, *, domain: str, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.domain = domain
+
+    def get_context(self, name: str, value: Any, attrs: dict[str, Any] | None) -> dict[str, Any]:
+        context = super().get_context(name, value, attrs)
+        context["recaptcha_domain"] = self.domain
+        return context
+
+
+class ReCaptchaField(BaseReCaptchaField):
+    def __init__(
+        self,
+        *,
+        domain: str,
+        remote_ip: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.domain = domain
+        self.remote_ip = remote_ip
+
+    def validate(self, value: Any) -> None:
+        forms.CharField.validate(self, value)
+
+        verify_data = {"secret": self.private_key, "response": str(value)}
+        if self.remote_ip:
+            verify_data["remoteip"] = self.remote_ip
+        try:
+            response = get_verification_transport().post_form(
+                f"https://{self.domain}{RECAPTCHA_VERIFY_PATH}",
+                verify_data,
+            )
+            result = json.loads(response.body.decode("utf-8"))
+        except (OSError, http.client.HTTPException, ValueError) as exc:
+            logger.warning("reCAPTCHA verification failed: exception_type=%s", type(exc).__name__)
+            raise ValidationError(self.error_messages["captcha_error"], code="captcha_error") from exc
+
+        if not isinstance(result, dict) or result.get("success") is not True:
+            error_codes = result.get("error-codes") if isinstance(result, dict) else None
+            logger.warning("reCAPTCHA validation failed due to: %s", error_codes)
+            raise ValidationError(self.error_messages["captcha_invalid"], code="captcha_invalid")
+        if result.get("action") != self.widget.action:
+            logger.warning("reCAPTCHA validation failed due to: mismatched action")
+            raise ValidationError(self.error_messages["captcha_invalid"], code="captcha_invalid")
+
+        required_score = getattr(self.widget, "required_score", None)
+        if required_score:
+            try:
+                score = float(result.get("score", 0))
+            except (TypeError, ValueError):
+                score = 0.0
+            if float(required_score) > score:
+                logger.warning("reCAPTCHA validation failed due to its score of %s", score)
+                raise ValidationError(self.error_messages["captcha_invalid"], code="captcha_invalid")
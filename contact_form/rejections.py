@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.html import escape
+
+from contact_form.local_cache import LocalTTLCache
+
+if TYPE_CHECKING:
+    from django.http import HttpRequest
+
+    from contact_form.models import ContactPage
+
+DEFAULT_REJECTION_CACHE_SECONDS = 300
+REJECTION_CACHE_SIZE = 256
+
+TOKEN_PLACEHOLDER = "contact-form-token-7f3c2a91"
+HONEYPOT_PLACEHOLDER = "_contact_0000000000placeholder"
+CSRF_PLACEHOLDER = "contact-form-csrf-5b8e0d44"
+PROOF_OF_WORK_PLACEHOLDER = "contact-form-proof-of-work-2d9a6c17"
+
+_rejection_shells = LocalTTLCache(REJECTION_CACHE_SIZE)
+
+
+def get_rejection_cache_seconds() -> int:
+    raw_value = getattr(settings, "CONTACT_FORM_REJECTION_CACHE_SECONDS", DEFAULT_REJECTION_CACHE_SECONDS)
+    try:
+        return max(0, int(raw_value))
+    except (TypeError, ValueError):
+        return DEFAULT_REJECTION_CACHE_SECONDS
+
+
+def clear_rejection_cache() -> None:
+    _rejection_shells.clear()
+
+
+@receiver(post_save)
+def _clear_rejections_on_captcha_settings_change(sender: Any, **kwargs: Any) -> None:
+    try:
+        from contact_form.settings import CaptchaSettings
+    except ImportError:
+        return
+
+    # Shells embed the CAPTCHA keys, theme and provider widget.
+    if isinstance(sender, type) and issubclass(sender, CaptchaSettings):
+        clear_rejection_cache()
+
+
+def _can_use_shell(request: HttpRequest) -> bool:
+    user = getattr(request, "user", None)
+    return (
+        get_rejection_cache_seconds() > 0
+        and not getattr(user, "is_authenticated", False)
+        and not getattr(request, "is_preview", False)
+    )
+
+
+def _shell_key(page: ContactPage, request: HttpRequest, *parts: object) -> str:
+    # Anything a published edit changes moves the key, so stale shells are
+    # never served after a page is republished.
+    identity = "\x1f".join(
+        str(part)
+        for part in (
+            page.pk,
+            getattr(page, "latest_revision_id", None),
+            getattr(page, "last_published_at", None),
+            translation.get_language(),
+            request.get_host(),
+            request.path,
+            *parts,
+        )
+    )
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+def render_form_rejection(
+    page: ContactPage,
+    request: HttpRequest,
+    *args: Any,
+    message: Any,
+    status: int,
+    **kwargs: Any,
+) -> HttpResponse | None:
+    if not _can_use_shell(request):
+        return None
+
+    from contact_form.clearance import has_captcha_clearance
+    from contact_form.security import issue_form_security_token
+
+    key = _shell_key(page, request, "form", status, message, has_captcha_clearance(page=page, request=request))
+    shell = _rejection_shells.get(key)
+    if shell is None:
+        context = page.get_context(request, *args, **kwargs)
+        context.update(
+            form=page.get_form(page=page, user=request.user),
+            security_error=message,
+            form_security_token=TOKEN_PLACEHOLDER,
+            form_honeypot_name=HONEYPOT_PLACEHOLDER,
+            csrf_token=CSRF_PLACEHOLDER,
+        )
+        if "proof_of_work_challenge" in context:
+            context["proof_of_work_challenge"] = PROOF_OF_WORK_PLACEHOLDER
+        shell = render_to_string(page.get_template(request), context, request=request)
+        _rejection_shells.set(key, shell, timeout=get_rejection_cache_seconds())
+
+    security_token, honeypot_name = issue_form_security_token(page)
+    content = (
+        shell.replace(TOKEN_PLACEHOLDER, security_token)
+        .replace(HONEYPOT_PLACEHOLDER, honeypot_name)
+        .replace(CSRF_PLACEHOLDER, get_token(request))
+    )
+    if PROOF_OF_WORK_PLACEHOLDER in content:
+        from contact_form.proof_of_work import issue_challenge
+
+        content = content.replace(
+            PROOF_OF_WORK_PLACEHOLDER,
+            escape(issue_challenge(page=page, form_token=security_token)),
+        )
+    return HttpResponse(content, status=status)
+
+
+def render_silent_landing(
+    page: ContactPage,
+    request: HttpRequest,
+    *args: Any,
+    **kwargs: Any,
+) -> HttpResponse | None:
+    if not _can_use_shell(request):
+        return None
+
+    key = _shell_key(page, request, "landing")
+    content = _rejection_shells.get(key)
+    if content is None:
+        content = page.render_landing_page(request, None, *args, **kwargs).render().content
+        _rejection_shells.set(key, content, timeout=get_rejection_cache_seconds())
+    return HttpResponse(content)
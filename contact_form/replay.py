@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+
+from contact_form.security import DEFAULT_TOKEN_MAX_AGE_SECONDS
+from contact_form.security import SECURITY_CACHE_KEY_PREFIX
+from contact_form.security import get_positive_int_setting
+from contact_form.security import get_redis_client
+from contact_form.security import get_security_cache
+
+NONCE_REPLAY_STORE_CACHE = "cache"
+NONCE_REPLAY_STORE_BLOOM = "bloom"
+NONCE_REPLAY_STORES = (NONCE_REPLAY_STORE_CACHE, NONCE_REPLAY_STORE_BLOOM)
+
+DEFAULT_BLOOM_FALSE_POSITIVE_RATE = 0.0001
+DEFAULT_BLOOM_PARTITION_CAPACITY = 50_000
+DEFAULT_BLOOM_PARTITIONS = 4
+
+BLOOM_BLOCK_BITS = 4096
+BLOOM_BLOCK_BYTES = BLOOM_BLOCK_BITS // 8
+BLOOM_CACHE_KEY_PREFIX = f"{SECURITY_CACHE_KEY_PREFIX}:bloom"
+BLOOM_LOCK_TIMEOUT_SECONDS = 5
+BLOOM_LOCK_ATTEMPTS = 50
+BLOOM_LOCK_RETRY_SECONDS = 0.002
+
+
+class BloomStateUnavailable(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class BloomFilterGeometry:
+    partitions: int
+    partition_seconds: int
+    block_count: int
+    hash_count: int
+
+    @property
+    def bits_per_partition(self) -> int:
+        return self.block_count * BLOOM_BLOCK_BITS
+
+    @property
+    def bytes_total(self) -> int:
+        return self.partitions * self.block_count * BLOOM_BLOCK_BYTES
+
+    @classmethod
+    def for_capacity(
+        cls,
+        *,
+        capacity: int,
+        false_positive_rate: float,
+        partitions: int,
+        window_seconds: int,
+    ) -> BloomFilterGeometry:
+        # Every lookup consults all live partitions, so each one gets an equal
+        # share of the target rate; blocking costs a little accuracy, which the
+        # extra halving absorbs.
+        partition_rate = false_positive_rate / (partitions * 2)
+        bits = math.ceil(-capacity * math.log(partition_rate) / (math.log(2) ** 2))
+        block_count = max(1, math.ceil(bits / BLOOM_BLOCK_BITS))
+        hash_count = max(1, round(block_count * BLOOM_BLOCK_BITS / capacity * math.log(2)))
+        return cls(
+            partitions=partitions,
+            partition_seconds=max(1, math.ceil(window_seconds / (partitions - 1))),
+            block_count=block_count,
+            hash_count=min(hash_count, 32),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class _BloomPositions:
+    block: int
+    bits: tuple[int, ...]
+
+
+def get_bloom_false_positive_rate() -> float:
+    raw_value = getattr(settings, "CONTACT_FORM_BLOOM_FALSE_POSITIVE_RATE", DEFAULT_BLOOM_FALSE_POSITIVE_RATE)
+    try:
+        value = float(raw_value)
+    except (TypeError, ValueError):
+        return DEFAULT_BLOOM_FALSE_POSITIVE_RATE
+    return value if 0 < value < 1 else DEFAULT_BLOOM_FALSE_POSITIVE_RATE
+
+
+class BloomReplayStore:
+    def __init__(self, geometry: BloomFilterGeometry, cache_backend: Any = None) -> None:
+        self.geometry = geometry
+        self._cache_backend = cache_backend
+
+    @property
+    def cache(self) -> Any:
+        return self._cache_backend if self._cache_backend is not None else get_security_cache()
+
+    def contains(self, nonce_hash: str) -> bool:
+        positions = self._positions(nonce_hash)
+        partitions = self._live_partitions()
+        redis_client = self._redis_client(partitions[-1])
+        if redis_client is not None:
+            present = self._redis_contains(redis_client, partitions, positions)
+        else:
+            blocks = self.cache.get_many([self._block_key(partition, positions.block) for partition in partitions])
+            present = any(
+                self._block_contains(blocks.get(self._block_key(partition, positions.block)), positions)
+                for partition in partitions
+            )
+        if not present:
+            return False
+        return self.cache.get(self._release_key(nonce_hash)) is None
+
+    def add(self, nonce_hash: str) -> bool:
+        positions = self._positions(nonce_hash)
+        partitions = self._live_partitions()
+        redis_client = self._redis_client(partitions[-1])
+        if redis_client is not None:
+            present = self._redis_add(redis_client, partitions, positions)
+        else:
+            present = self._cache_add(partitions, positions)
+        if not present:
+            return True
+        # A released nonce keeps its bits, so the release marker is consumed
+        # atomically to let exactly one retry through.
+        return bool(self.cache.delete(self._release_key(nonce_hash)))
+
+    def release(self, nonce_hash: str) -> bool:
+        self.cache.set(
+            self._release_key(nonce_hash),
+            True,
+            timeout=self.geometry.partitions * self.geometry.partition_seconds,
+        )
+        return True
+
+    def _positions(self, nonce_hash: str) -> _BloomPositions:
+        digest = hashlib.blake2b(nonce_hash.encode("utf-8"), digest_size=24).digest()
+        block = int.from_bytes(digest[:8], "big") % self.geometry.block_count
+        first_hash = int.from_bytes(digest[8:16], "big")
+        second_hash = int.from_bytes(digest[16:24], "big") | 1
+        bits = tuple(
+            (first_hash + index * second_hash) % BLOOM_BLOCK_BITS for index in range(self.geometry.hash_count)
+        )
+        return _BloomPositions(block=block, bits=bits)
+
+    def _live_partitions(self) -> list[int]:
+        current = int(time.time()) // self.geometry.partition_seconds
+        return list(range(current - self.geometry.partitions + 1, current + 1))
+
+    def _partition_timeout(self) -> int:
+        return self.geometry.partitions * self.geometry.partition_seconds + 1
+
+    @staticmethod
+    def _partition_key(partition: int) -> str:
+        # The hash tag keeps every partition in one cluster slot, so the
+        # check-and-set transaction below can span them.
+        return f"{BLOOM_CACHE_KEY_PREFIX}:{{bloom}}:{partition}"
+
+    def _block_key(self, partition: int, block: int) -> str:
+        return f"{self._partition_key(partition)}:{block}"
+
+    @staticmethod
+    def _release_key(nonce_hash: str) -> str:
+        return f"{BLOOM_CACHE_KEY_PREFIX}:released:{nonce_hash}"
+
+    def _redis_client(self, partition: int) -> Any | None:
+        return get_redis_client(self.cache, self.cache.make_key(self._partition_key(partition)))
+
+    @staticmethod
+    def _block_contains(block: Any, positions: _BloomPositions) -> bool:
+        if not isinstance(block, (bytes, bytearray)) or len(block) != BLOOM_BLOCK_BYTES:
+            return False
+        return all(block[bit >> 3] & (1 << (bit & 7)) for bit in positions.bits)
+
+    def _redis_offsets(self, positions: _BloomPositions) -> list[int]:
+        return [positions.block * BLOOM_BLOCK_BITS + bit for bit in positions.bits]
+
+    def _redis_contains(self, client: Any, partitions: list[int], positions: _BloomPositions) -> bool:
+        offsets = self._redis_offsets(positions)
+        pipeline = client.pipeline(transaction=False)
+        for partition in partitions:
+            key = self.cache.make_key(self._partition_key(partition))
+            for offset in offsets:
+                pipeline.getbit(key, offset)
+        results = pipeline.execute()
+        return any(
+            all(results[index * len(offsets) : (index + 1) * len(offsets)]) for index in range(len(partitions))
+        )
+
+    def _redis_add(self, client: Any, partitions: list[int], positions: _BloomPositions) -> bool:
+        offsets = self._redis_offsets(positions)
+        # MULTI/EXEC: concurrent adds of one nonce must not interleave bit by
+        # bit, or each would see an unset bit and both would be accepted.
+        pipeline = client.pipeline(transaction=True)
+        for partition in partitions[:-1]:
+            key = self.cache.make_key(self._partition_key(partition))
+            for offset in offsets:
+                pipeline.getbit(key, offset)
+        current_key = self.cache.make_key(self._partition_key(partitions[-1]))
+        for offset in offsets:
+            pipeline.setbit(current_key, offset, 1)
+        pipeline.expire(current_key, self._partition_timeout())
+        results = pipeline.execute()[:-1]
+        return any(
+            all(results[index * len(offsets) : (index + 1) * len(offsets)]) for index in range(len(partitions))
+        )
+
+    def _cache_add(self, partitions: list[int], positions: _BloomPositions) -> bool:
+        previous_keys = [self._block_key(partition, positions.block) for partition in partitions[:-1]]
+        previous_blocks = self.cache.get_many(previous_keys) if previous_keys else {}
+        if any(self._block_contains(previous_blocks.get(key), positions) for key in previous_keys):
+            return True
+
+        current_key = self._block_key(partitions[-1], positions.block)
+        lock_key = f"{current_key}:lock"
+        lock_token = secrets.token_hex(8)
+        for _attempt in range(BLOOM_LOCK_ATTEMPTS):
+            if self.cache.add(lock_key, lock_token, timeout=BLOOM_LOCK_TIMEOUT_SECONDS):
+                break
+            time.sleep(BLOOM_LOCK_RETRY_SECONDS)
+        else:
+            raise BloomStateUnavailable("CONTACT_FORM replay filter block is locked.")
+
+        try:
+            stored_block = self.cache.get(current_key)
+            if self._block_contains(stored_block, positions):
+                return True
+            block = (
+                bytearray(stored_block)
+                if isinstance(stored_block, (bytes, bytearray)) and len(stored_block) == BLOOM_BLOCK_BYTES
+                else bytearray(BLOOM_BLOCK_BYTES)
+            )
+            for bit in positions.bits:
+                block[bit >> 3] |= 1 << (bit & 7)
+            self.cache.set(current_key, bytes(block), timeout=self._partition_timeout())
+            return False
+        finally:
+            if self.cache.get(lock_key) == lock_token:
+                self.cache.delete(lock_key)
+
+
+_bloom_replay_store: tuple[tuple[object, ...], BloomReplayStore] | None = None
+
+
+def get_nonce_replay_store() -> BloomReplayStore | None:
+    global _bloom_replay_store
+
+    configured_store = str(getattr(settings, "CONTACT_FORM_NONCE_REPLAY_STORE", NONCE_REPLAY_STORE_CACHE))
+    if configured_store != NONCE_REPLAY_STORE_BLOOM:
+        return None
+
+    partitions = max(
+        2,
+        get_positive_int_setting("CONTACT_FORM_BLOOM_PARTITIONS", DEFAULT_BLOOM_PARTITIONS),
+    )
+    configuration = (
+        get_positive_int_setting("CONTACT_FORM_BLOOM_PARTITION_CAPACITY", DEFAULT_BLOOM_PARTITION_CAPACITY),
+        get_bloom_false_positive_rate(),
+        partitions,
+        get_positive_int_setting("CONTACT_FORM_TOKEN_MAX_AGE_SECONDS", DEFAULT_TOKEN_MAX_AGE_SECONDS),
+    )
+    if _bloom_replay_store is None or _bloom_replay_store[0] != configuration:
+        capacity, false_positive_rate, partitions, window_seconds = configuration
+        geometry = BloomFilterGeometry.for_capacity(
+            capacity=capacity,
+            false_positive_rate=false_positive_rate,
+            partitions=partitions,
+            window_seconds=window_seconds,
+        )
+        _bloom_replay_store = (configuration, BloomReplayStore(geometry))
+    return _bloom_replay_store[1]
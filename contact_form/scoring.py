@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+
+
+SPAM_VERDICT_PASS = "pass"
+SPAM_VERDICT_CHALLENGE = "challenge"
+SPAM_VERDICT_DROP = "drop"
+
+DEFAULT_SPAM_CHALLENGE_SCORE = 4.0
+DEFAULT_SPAM_DROP_SCORE = 8.0
+DEFAULT_SPAM_FAST_COMPLETION_SECONDS = 10
+DEFAULT_SPAM_WEIGHTS: dict[str, float] = {
+    "links": 2.0,
+    "fast_completion": 4.0,
+    "mixed_scripts": 3.0,
+    "repeated_characters": 1.5,
+    "length_ratio": 2.0,
+}
+
+ALLOWED_LINKS = 1
+REPEATED_CHARACTER_RUN = 6
+LENGTH_RATIO_MINIMUM_CHARACTERS = 60
+
+IGNORED_FIELD_NAMES = frozenset(
+    {
+        "csrfmiddlewaretoken",
+        "cf-turnstile-response",
+        "g-recaptcha-response",
+        "wagtailcaptcha",
+    }
+)
+
+_LINK_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\[url[=\]]", re.IGNORECASE)
+_REPEATED_CHARACTER_PATTERN = re.compile(rf"(\S)\1{{{REPEATED_CHARACTER_RUN - 1},}}")
+
+
+@dataclass(frozen=True, slots=True)
+class SpamScore:
+    score: float
+    signals: Mapping[str, float]
+
+
+def _character_script(character: str) -> str | None:
+    if not character.isalpha():
+        return None
+    codepoint = ord(character)
+    if codepoint < 0x0250:
+        return "latin"
+    if 0x0370 <= codepoint <= 0x03FF:
+        return "greek"
+    if 0x0400 <= codepoint <= 0x052F:
+        return "cyrillic"
+    return "other"
+
+
+def count_mixed_script_words(text: str) -> int:
+    mixed_words = 0
+    for word in text.split():
+        if word.isascii():
+            continue
+        scripts = {_character_script(character) for character in word}
+        scripts.discard(None)
+        if len(scripts) > 1:
+            mixed_words += 1
+    return mixed_words
+
+
+def count_long_secondary_fields(values: list[str]) -> int:
+    lengths = sorted((len(value) for value in values), reverse=True)
+    if len(lengths) < 2:
+        return 0
+    longest = lengths[0]
+    return sum(1 for length in lengths[1:] if length >= LENGTH_RATIO_MINIMUM_CHARACTERS and length * 2 >= longest)
+
+
+def get_spam_weights() -> dict[str, float]:
+    configured = getattr(settings, "CONTACT_FORM_SPAM_WEIGHTS", None) or {}
+    try:
+        overrides = {str(name): float(weight) for name, weight in dict(configured).items()}
+    except (TypeError, ValueError):
+        return dict(DEFAULT_SPAM_WEIGHTS)
+    return {**DEFAULT_SPAM_WEIGHTS, **overrides}
+
+
+def _get_positive_float_setting(name: str, default: float) -> float:
+    raw_value = getattr(settings, name, default)
+    try:
+        value = float(raw_value)
+    except (TypeError, ValueError):
+        return default
+    return value if math.isfinite(value) and value > 0 else default
+
+
+def get_spam_challenge_score() -> float:
+    return _get_positive_float_setting("CONTACT_FORM_SPAM_CHALLENGE_SCORE", DEFAULT_SPAM_CHALLENGE_SCORE)
+
+
+def get_spam_drop_score() -> float | None:
+    if getattr(settings, "CONTACT_FORM_SPAM_DROP_SCORE", None) is None:
+        return None
+    return _get_positive_float_setting("CONTACT_FORM_SPAM_DROP_SCORE", DEFAULT_SPAM_DROP_SCORE)
+
+
+def get_spam_fast_completion_seconds() -> float:
+    return _get_positive_float_setting(
+        "CONTACT_FORM_SPAM_FAST_COMPLETION_SECONDS",
+        DEFAULT_SPAM_FAST_COMPLETION_SECONDS,
+    )
+
+
+def score_submission(
+    *,
+    fields: Mapping[str, str],
+    completion_seconds: float | None,
+    weights: Mapping[str, float] | None = None,
+) -> SpamScore:
+    weights = get_spam_weights() if weights is None else weights
+    values = [value for value in fields.values() if value]
+    text = "\n".join(values)
+    fast_completion_seconds = get_spam_fast_completion_seconds()
+
+    signals = {
+        "links": float(max(0, len(_LINK_PATTERN.findall(text)) - ALLOWED_LINKS)),
+        "fast_completion": (
+            max(0.0, 1 - completion_seconds / fast_completion_seconds) if completion_seconds is not None else 0.0
+        ),
+        "mixed_scripts": float(count_mixed_script_words(text)),
+        "repeated_characters": float(len(_REPEATED_CHARACTER_PATTERN.findall(text))),
+        "length_ratio": float(count_long_secondary_fields(values)),
+    }
+    score = sum(weights.get(name, 0.0) * value for name, value in signals.items())
+    return SpamScore(score=score, signals=signals)
+
+
+def get_spam_verdict(score: float) -> str:
+    drop_score = get_spam_drop_score()
+    if drop_score is not None and score >= drop_score:
+        return SPAM_VERDICT_DROP
+    if score >= get_spam_challenge_score():
+        return SPAM_VERDICT_CHALLENGE
+    return SPAM_VERDICT_PASS
+
+
+def get_submitted_text_fields(data: Any, *, honeypot_name: str = "") -> dict[str, str]:
+    return {
+        name: "\n".join(str(value) for value in data.getlist(name))
+        for name in data
+        if name not in IGNORED_FIELD_NAMES and not name.startswith("_") and name != honeypot_name
+    }
+
@@ -8,6 +8,7 @@ import math
 import re
 import secrets
 import time
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import Enum
@@ -17,9 +18,13 @@ from uuid import UUID
 
 from django.conf import settings
 from django.core import signing
-from django.core.cache import cache
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.cache import caches
 from django.core.serializers.json import DjangoJSONEncoder
 
+from contact_form.context import get_request_environment
+from contact_form.local_cache import LocalTTLCache
+
 if TYPE_CHECKING:
     from django import forms
     from django.http import HttpRequest
@@ -39,8 +44,19 @@ DEFAULT_MINIMUM_COMPLETION_SECONDS = 3
 DEFAULT_TOKEN_MAX_AGE_SECONDS = 7200
 DEFAULT_DUPLICATE_WINDOW_SECONDS = 600
 DEFAULT_IPV6_PREFIX_LENGTH = 64
+DEFAULT_LOCAL_VERDICT_CACHE_SIZE = 1024
 
 SECURITY_CACHE_KEY_PREFIX = "contact-form-security:v1"
+TAGGED_SECURITY_CACHE_KEY_PREFIX = "contact-form-security:v2"
+SECURITY_KEY_LAYOUT_FLAT = "flat"
+SECURITY_KEY_LAYOUT_PAGE_TAGGED = "page-tagged"
+SECURITY_KEY_LAYOUT_PAGE_HASHES = "page-hashes"
+SECURITY_KEY_LAYOUTS = (
+    SECURITY_KEY_LAYOUT_FLAT,
+    SECURITY_KEY_LAYOUT_PAGE_TAGGED,
+    SECURITY_KEY_LAYOUT_PAGE_HASHES,
+)
+SECURITY_KEY_HASH_TAG_LENGTH = 16
 
 
 class SecurityEventKind(str, Enum):
@@ -48,6 +64,9 @@ class SecurityEventKind(str, Enum):
     POST_RATE_LIMIT = "post_rate_limit"
     DUPLICATE_CONTENT = "duplicate_content"
     SUBMISSION_NONCE = "submission_nonce"
+    NEAR_DUPLICATE = "near_duplicate"
+    PROOF_OF_WORK_RATE = "proof_of_work_rate"
+    SUBMISSION_BUDGET = "submission_budget"
 
     def __str__(self) -> str:
         return self.value
@@ -67,6 +86,21 @@ class DuplicateContactSubmission(RuntimeError):
     pass
 
 
+@dataclass(frozen=True, slots=True)
+class SecurityStateKey:
+    kind: str
+    scope_hash: str
+    fingerprint: str
+    bucket: int | None = None
+
+    @property
+    def digest(self) -> str:
+        parts = [str(self.kind), self.scope_hash, self.fingerprint]
+        if self.bucket is not None:
+            parts.append(str(self.bucket))
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
 @dataclass(frozen=True, slots=True)
 class SecurityWindowDecision:
     allowed: bool
@@ -87,6 +121,36 @@ class FormSecurityPayload:
 class ValidatedSubmissionSecurity:
     nonce_hash: str
     submission_fingerprint: str
+    issued_at: int | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PageSecurityConfig:
+    post_limit: int | None = None
+    post_window_seconds: int | None = None
+    duplicate_window_seconds: int | None = None
+    minimum_completion_seconds: int | None = None
+
+    def get_post_limit(self) -> int:
+        return self.post_limit or get_positive_int_setting("CONTACT_FORM_POST_LIMIT", DEFAULT_POST_LIMIT)
+
+    def get_post_window_seconds(self) -> int:
+        return self.post_window_seconds or get_positive_int_setting(
+            "CONTACT_FORM_POST_WINDOW_SECONDS",
+            DEFAULT_POST_WINDOW_SECONDS,
+        )
+
+    def get_duplicate_window_seconds(self) -> int:
+        return self.duplicate_window_seconds or get_positive_int_setting(
+            "CONTACT_FORM_DUPLICATE_WINDOW_SECONDS",
+            DEFAULT_DUPLICATE_WINDOW_SECONDS,
+        )
+
+    def get_minimum_completion_seconds(self) -> int:
+        return self.minimum_completion_seconds or get_positive_int_setting(
+            "CONTACT_FORM_MINIMUM_COMPLETION_SECONDS",
+            DEFAULT_MINIMUM_COMPLETION_SECONDS,
+        )
 
 
 def get_positive_int_setting(name: str, default: int) -> int:
@@ -98,6 +162,52 @@ def get_positive_int_setting(name: str, default: int) -> int:
     return value if value > 0 else default
 
 
+def get_positive_int_override(value: Any) -> int | None:
+    if isinstance(value, bool) or not isinstance(value, int):
+        return None
+    return value if value > 0 else None
+
+
+def get_page_security_config(page: Any) -> PageSecurityConfig:
+    config = getattr(page, "security_config", None)
+    return config if isinstance(config, PageSecurityConfig) else PageSecurityConfig()
+
+
+_local_verdicts = LocalTTLCache(DEFAULT_LOCAL_VERDICT_CACHE_SIZE)
+
+
+def get_local_verdict_cache() -> LocalTTLCache | None:
+    raw_value = getattr(settings, "CONTACT_FORM_LOCAL_VERDICT_CACHE_SIZE", DEFAULT_LOCAL_VERDICT_CACHE_SIZE)
+    try:
+        max_entries = int(raw_value)
+    except (TypeError, ValueError):
+        max_entries = DEFAULT_LOCAL_VERDICT_CACHE_SIZE
+    if max_entries < 1:
+        return None
+    _local_verdicts.max_entries = max_entries
+    return _local_verdicts
+
+
+def get_security_cache() -> Any:
+    return caches[getattr(settings, "CONTACT_FORM_SECURITY_CACHE_ALIAS", DEFAULT_CACHE_ALIAS)]
+
+
+def get_redis_client(cache_backend: Any, key: str) -> Any | None:
+    try:
+        from django.core.cache.backends.redis import RedisCache
+    except ImportError:
+        RedisCache = None
+
+    if RedisCache is not None and isinstance(cache_backend, RedisCache):
+        return cache_backend._cache.get_client(key, write=True)
+
+    django_redis_client = getattr(cache_backend, "client", None)
+    get_client = getattr(django_redis_client, "get_client", None)
+    if callable(get_client):
+        return get_client(write=True)
+    return None
+
+
 def privacy_hash(*parts: object) -> str:
     payload = "\x1f".join(str(part) for part in parts).encode("utf-8")
     secret = settings.SECRET_KEY.encode("utf-8")
@@ -134,10 +244,7 @@ def validate_form_security_token(
 
     minimum_age = minimum_age_seconds
     if minimum_age is None:
-        minimum_age = get_positive_int_setting(
-            "CONTACT_FORM_MINIMUM_COMPLETION_SECONDS",
-            DEFAULT_MINIMUM_COMPLETION_SECONDS,
-        )
+        minimum_age = get_page_security_config(page).get_minimum_completion_seconds()
 
     maximum_age = maximum_age_seconds
     if maximum_age is None:
@@ -223,6 +330,10 @@ def _is_trusted_proxy(address: str) -> bool:
 
 
 def get_client_ip(request: HttpRequest) -> str | None:
+    return get_request_environment(request).client_ip
+
+
+def resolve_client_ip(request: HttpRequest) -> str | None:
     remote_address = str(request.META.get("REMOTE_ADDR", "")).strip()
     configured_header = str(getattr(settings, "CONTACT_FORM_TRUSTED_CLIENT_IP_HEADER", "")).strip()
 
@@ -255,8 +366,12 @@ def _normalized_client_network(client_ip: str | None) -> str:
     return str(network)
 
 
+def get_client_network_fingerprint(client_ip: str | None) -> str:
+    return privacy_hash("contact-form-client", _normalized_client_network(client_ip))
+
+
 def get_client_fingerprint(request: HttpRequest) -> str:
-    return privacy_hash("contact-form-client", _normalized_client_network(get_client_ip(request)))
+    return get_request_environment(request).client_fingerprint
 
 
 def _normalize_submission_value(value: Any) -> Any:
@@ -308,17 +423,23 @@ def get_submission_nonce_hash(*, page: ContactPage, nonce: str) -> str:
     return privacy_hash("contact-form-nonce", page.translation_key, nonce)
 
 
+def get_security_key_layout() -> str:
+    layout = getattr(settings, "CONTACT_FORM_SECURITY_KEY_LAYOUT", SECURITY_KEY_LAYOUT_FLAT)
+    return layout if layout in SECURITY_KEY_LAYOUTS else SECURITY_KEY_LAYOUT_FLAT
+
+
 def _security_cache_key(
     *,
     kind: str,
     scope_hash: str,
     fingerprint: str,
     bucket: int | None = None,
+    layout: str | None = None,
 ) -> str:
-    parts = [str(kind), scope_hash, fingerprint]
-    if bucket is not None:
-        parts.append(str(bucket))
-    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+    digest = SecurityStateKey(kind=kind, scope_hash=scope_hash, fingerprint=fingerprint, bucket=bucket).digest
+    if (layout or get_security_key_layout()) != SECURITY_KEY_LAYOUT_FLAT:
+        hash_tag = scope_hash[:SECURITY_KEY_HASH_TAG_LENGTH]
+        return f"{TAGGED_SECURITY_CACHE_KEY_PREFIX}:{{{hash_tag}}}:{digest}"
     return f"{SECURITY_CACHE_KEY_PREFIX}:{digest}"
 
 
@@ -327,11 +448,13 @@ def _reservation_key(
     kind: str,
     scope_hash: str,
     fingerprint: str,
+    layout: str | None = None,
 ) -> str:
     return _security_cache_key(
         kind=kind,
         scope_hash=scope_hash,
         fingerprint=fingerprint,
+        layout=layout,
     )
 
 
@@ -342,13 +465,13 @@ def _reserve_once(
     fingerprint: str,
     duration_seconds: int,
 ) -> SecurityWindowDecision:
-    key = _reservation_key(
-        kind=kind,
-        scope_hash=scope_hash,
-        fingerprint=fingerprint,
-    )
+    from contact_form.backends import get_security_state_backend
+
     try:
-        allowed = bool(cache.add(key, True, timeout=duration_seconds))
+        allowed = get_security_state_backend().reserve(
+            SecurityStateKey(kind=kind, scope_hash=scope_hash, fingerprint=fingerprint),
+            timeout=duration_seconds,
+        )
     except Exception as exc:
         raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
     return SecurityWindowDecision(
@@ -363,28 +486,91 @@ def _release_reservation(
     kind: str,
     scope_hash: str,
     fingerprint: str,
+    duration_seconds: int,
 ) -> bool:
-    key = _reservation_key(
-        kind=kind,
-        scope_hash=scope_hash,
-        fingerprint=fingerprint,
-    )
+    from contact_form.backends import get_security_state_backend
+
     try:
-        return bool(cache.delete(key))
+        return get_security_state_backend().release(
+            SecurityStateKey(kind=kind, scope_hash=scope_hash, fingerprint=fingerprint),
+            timeout=duration_seconds,
+        )
     except Exception as exc:
         raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
 
 
-def is_submission_nonce_used(*, page: ContactPage, nonce_hash: str) -> bool:
-    key = _reservation_key(
+def _nonce_reservation_key(*, page: ContactPage, nonce_hash: str, layout: str | None = None) -> str:
+    return _reservation_key(
         kind=str(SecurityEventKind.SUBMISSION_NONCE),
         scope_hash=get_page_scope_hash(page),
         fingerprint=nonce_hash,
+        layout=layout,
+    )
+
+
+def _is_legacy_nonce_reserved(*, page: ContactPage, nonce_hash: str) -> bool:
+    if get_security_key_layout() == SECURITY_KEY_LAYOUT_FLAT:
+        return False
+    if not getattr(settings, "CONTACT_FORM_SECURITY_LEGACY_KEY_READS", False):
+        return False
+    legacy_key = _nonce_reservation_key(
+        page=page,
+        nonce_hash=nonce_hash,
+        layout=SECURITY_KEY_LAYOUT_FLAT,
+    )
+    try:
+        return get_security_cache().get(legacy_key) is not None
+    except Exception as exc:
+        raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
+
+
+def _remember_used_nonce(key: str, *, issued_at: int | None) -> None:
+    local_verdicts = get_local_verdict_cache()
+    if local_verdicts is None:
+        return
+    remaining_seconds = get_positive_int_setting(
+        "CONTACT_FORM_TOKEN_MAX_AGE_SECONDS",
+        DEFAULT_TOKEN_MAX_AGE_SECONDS,
     )
+    if issued_at is not None:
+        remaining_seconds = min(remaining_seconds, issued_at + remaining_seconds - int(time.time()))
+    if remaining_seconds > 0:
+        local_verdicts.set(key, True, timeout=remaining_seconds)
+
+
+def is_submission_nonce_used(*, page: ContactPage, nonce_hash: str, issued_at: int | None = None) -> bool:
+    from contact_form.backends import get_security_state_backend
+    from contact_form.replay import get_nonce_replay_store
+
+    key = _nonce_reservation_key(page=page, nonce_hash=nonce_hash)
+    local_verdicts = get_local_verdict_cache()
+    if local_verdicts is not None and local_verdicts.get(key):
+        return True
+
+    replay_store = get_nonce_replay_store()
     try:
-        return cache.get(key) is not None
+        if replay_store is not None:
+            nonce_was_used = replay_store.contains(nonce_hash)
+        else:
+            nonce_was_used = get_security_state_backend().exists(
+                SecurityStateKey(
+                    kind=str(SecurityEventKind.SUBMISSION_NONCE),
+                    scope_hash=get_page_scope_hash(page),
+                    fingerprint=nonce_hash,
+                ),
+                timeout=get_positive_int_setting(
+                    "CONTACT_FORM_TOKEN_MAX_AGE_SECONDS",
+                    DEFAULT_TOKEN_MAX_AGE_SECONDS,
+                ),
+            )
     except Exception as exc:
         raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
+    if not nonce_was_used and replay_store is None:
+        nonce_was_used = _is_legacy_nonce_reserved(page=page, nonce_hash=nonce_hash)
+
+    if nonce_was_used:
+        _remember_used_nonce(key, issued_at=issued_at)
+    return nonce_was_used
 
 
 def acquire_security_window(
@@ -395,7 +581,6 @@ def acquire_security_window(
     duration: timedelta,
     limit: int,
 ) -> SecurityWindowDecision:
-    duration_seconds = max(1, math.ceil(duration.total_seconds()))
     if limit < 1 or duration.total_seconds() <= 0:
         raise ValueError("Security windows require a positive duration and limit.")
 
@@ -404,38 +589,77 @@ def acquire_security_window(
             kind=kind,
             scope_hash=scope_hash,
             fingerprint=fingerprint,
-            duration_seconds=duration_seconds,
+            duration_seconds=max(1, math.ceil(duration.total_seconds())),
         )
+    return acquire_security_windows(
+        kind=kind,
+        scope_hash=scope_hash,
+        fingerprints=[fingerprint],
+        duration=duration,
+        limit=limit,
+    )[0]
+
+
+def acquire_security_windows(
+    *,
+    kind: str,
+    scope_hash: str,
+    fingerprints: Sequence[str],
+    duration: timedelta,
+    limit: int,
+) -> list[SecurityWindowDecision]:
+    duration_seconds = max(1, math.ceil(duration.total_seconds()))
+    if limit < 2 or duration.total_seconds() <= 0:
+        raise ValueError("Batched security windows require a positive duration and a limit above one.")
 
     now = int(time.time())
     bucket = now // duration_seconds
     retry_after_seconds = duration_seconds - (now % duration_seconds)
-    key = _security_cache_key(
-        kind=kind,
-        scope_hash=scope_hash,
-        fingerprint=fingerprint,
-        bucket=bucket,
-    )
+    decisions: dict[int, SecurityWindowDecision] = {}
+    pending: list[tuple[int, str, SecurityStateKey]] = []
 
-    try:
-        if cache.add(key, 1, timeout=duration_seconds + 1):
-            count = 1
+    local_verdicts = get_local_verdict_cache()
+    for index, fingerprint in enumerate(fingerprints):
+        key = _security_cache_key(
+            kind=kind,
+            scope_hash=scope_hash,
+            fingerprint=fingerprint,
+            bucket=bucket,
+        )
+        limited_count = local_verdicts.get(key) if local_verdicts is not None else None
+        if limited_count is not None:
+            remaining_seconds = local_verdicts.remaining_seconds(key)
+            previous_count = limited_count + 1
+            local_verdicts.set(key, previous_count, timeout=remaining_seconds)
+            decisions[index] = SecurityWindowDecision(
+                allowed=False,
+                retry_after_seconds=max(1, math.ceil(remaining_seconds)),
+                previous_count=previous_count,
+            )
         else:
-            try:
-                count = int(cache.incr(key))
-            except ValueError:
-                if not cache.add(key, 1, timeout=duration_seconds + 1):
-                    count = int(cache.incr(key))
-                else:
-                    count = 1
-    except Exception as exc:
-        raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
+            state_key = SecurityStateKey(kind=kind, scope_hash=scope_hash, fingerprint=fingerprint, bucket=bucket)
+            pending.append((index, key, state_key))
 
-    return SecurityWindowDecision(
-        allowed=count <= limit,
-        retry_after_seconds=0 if count <= limit else max(1, retry_after_seconds),
-        previous_count=max(0, count - 1),
-    )
+    if pending:
+        from contact_form.backends import get_security_state_backend
+
+        try:
+            counts = get_security_state_backend().increment_many(
+                [state_key for _index, _key, state_key in pending],
+                timeout=duration_seconds + 1,
+            )
+        except Exception as exc:
+            raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
+
+        for (index, key, _state_key), count in zip(pending, counts):
+            if count > limit and local_verdicts is not None:
+                local_verdicts.set(key, count - 1, timeout=retry_after_seconds)
+            decisions[index] = SecurityWindowDecision(
+                allowed=count <= limit,
+                retry_after_seconds=0 if count <= limit else max(1, retry_after_seconds),
+                previous_count=max(0, count - 1),
+            )
+    return [decisions[index] for index in range(len(fingerprints))]
 
 
 def release_duplicate_submission(
@@ -447,6 +671,7 @@ def release_duplicate_submission(
         kind=str(SecurityEventKind.DUPLICATE_CONTENT),
         scope_hash=get_page_scope_hash(page),
         fingerprint=submission_fingerprint,
+        duration_seconds=get_page_security_config(page).get_duplicate_window_seconds(),
     )
 
 
@@ -455,10 +680,27 @@ def release_submission_nonce(
     page: ContactPage,
     nonce_hash: str,
 ) -> bool:
+    from contact_form.replay import get_nonce_replay_store
+
+    local_verdicts = get_local_verdict_cache()
+    if local_verdicts is not None:
+        local_verdicts.delete(_nonce_reservation_key(page=page, nonce_hash=nonce_hash))
+
+    replay_store = get_nonce_replay_store()
+    if replay_store is not None:
+        try:
+            return replay_store.release(nonce_hash)
+        except Exception as exc:
+            raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
+
     return _release_reservation(
         kind=str(SecurityEventKind.SUBMISSION_NONCE),
         scope_hash=get_page_scope_hash(page),
         fingerprint=nonce_hash,
+        duration_seconds=get_positive_int_setting(
+            "CONTACT_FORM_TOKEN_MAX_AGE_SECONDS",
+            DEFAULT_TOKEN_MAX_AGE_SECONDS,
+        ),
     )
 
 
@@ -468,17 +710,13 @@ def consume_post_rate_limit(
     request: HttpRequest,
 ) -> tuple[SecurityWindowDecision, str]:
     client_fingerprint = get_client_fingerprint(request)
-    limit = get_positive_int_setting("CONTACT_FORM_POST_LIMIT", DEFAULT_POST_LIMIT)
-    window_seconds = get_positive_int_setting(
-        "CONTACT_FORM_POST_WINDOW_SECONDS",
-        DEFAULT_POST_WINDOW_SECONDS,
-    )
+    config = get_page_security_config(page)
     decision = acquire_security_window(
         kind=str(SecurityEventKind.POST_RATE_LIMIT),
         scope_hash=get_page_scope_hash(page),
         fingerprint=client_fingerprint,
-        duration=timedelta(seconds=window_seconds),
-        limit=limit,
+        duration=timedelta(seconds=config.get_post_window_seconds()),
+        limit=config.get_post_limit(),
     )
     return decision, client_fingerprint
 
@@ -488,15 +726,11 @@ def reserve_duplicate_submission(
     page: ContactPage,
     submission_fingerprint: str,
 ) -> SecurityWindowDecision:
-    duration_seconds = get_positive_int_setting(
-        "CONTACT_FORM_DUPLICATE_WINDOW_SECONDS",
-        DEFAULT_DUPLICATE_WINDOW_SECONDS,
-    )
     return _reserve_once(
         kind=str(SecurityEventKind.DUPLICATE_CONTENT),
         scope_hash=get_page_scope_hash(page),
         fingerprint=submission_fingerprint,
-        duration_seconds=duration_seconds,
+        duration_seconds=get_page_security_config(page).get_duplicate_window_seconds(),
     )
 
 
@@ -504,14 +738,48 @@ def reserve_submission_nonce(
     *,
     page: ContactPage,
     nonce_hash: str,
+    issued_at: int | None = None,
 ) -> SecurityWindowDecision:
+    from contact_form.replay import get_nonce_replay_store
+
     maximum_age_seconds = get_positive_int_setting(
         "CONTACT_FORM_TOKEN_MAX_AGE_SECONDS",
         DEFAULT_TOKEN_MAX_AGE_SECONDS,
     )
-    return _reserve_once(
-        kind=str(SecurityEventKind.SUBMISSION_NONCE),
-        scope_hash=get_page_scope_hash(page),
-        fingerprint=nonce_hash,
-        duration_seconds=maximum_age_seconds,
-    )
+    key = _nonce_reservation_key(page=page, nonce_hash=nonce_hash)
+    local_verdicts = get_local_verdict_cache()
+    if local_verdicts is not None and local_verdicts.get(key):
+        return SecurityWindowDecision(
+            allowed=False,
+            retry_after_seconds=maximum_age_seconds,
+            previous_count=1,
+        )
+
+    replay_store = get_nonce_replay_store()
+    if replay_store is not None:
+        try:
+            allowed = replay_store.add(nonce_hash)
+        except Exception as exc:
+            raise SecurityStateUnavailable("CONTACT_FORM security cache is unavailable.") from exc
+        decision = SecurityWindowDecision(
+            allowed=allowed,
+            retry_after_seconds=0 if allowed else maximum_age_seconds,
+            previous_count=0 if allowed else 1,
+        )
+    elif _is_legacy_nonce_reserved(page=page, nonce_hash=nonce_hash):
+        decision = SecurityWindowDecision(
+            allowed=False,
+            retry_after_seconds=maximum_age_seconds,
+            previous_count=1,
+        )
+    else:
+        decision = _reserve_once(
+            kind=str(SecurityEventKind.SUBMISSION_NONCE),
+            scope_hash=get_page_scope_hash(page),
+            fingerprint=nonce_hash,
+            duration_seconds=maximum_age_seconds,
+        )
+
+    if not decision.allowed:
+        _remember_used_nonce(key, issued_at=issued_at)
+    return decision
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from contact_form.backends import SecurityStateBackend
+from contact_form.metrics import increment_counter
+from contact_form.security import SecurityStateKey
+from contact_form.security import get_positive_int_setting
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_SHARED_MEMORY_SLOTS = 65_536
+SHARED_MEMORY_FILE_NAME = "contact-form-security.mmap"
+SHARED_MEMORY_MAGIC = b"CFSM"
+SHARED_MEMORY_VERSION = 1
+SHARED_MEMORY_PROBE_WINDOW = 32
+SHARED_MEMORY_LOCK_STRIPES = 64
+
+_HEADER = struct.Struct("<4sII4x")
+_SLOT = struct.Struct("<16sQI4x")
+_EMPTY_KEY = bytes(16)
+
+
+def get_default_shared_memory_path() -> str:
+    # The temporary directory is world-writable, so the state file lives in a
+    # per-user directory nobody else can plant files or symlinks in.
+    directory = os.path.join(tempfile.gettempdir(), f"contact-form-{os.geteuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    _require_private(os.lstat(directory), directory, is_type=stat.S_ISDIR)
+    return os.path.join(directory, SHARED_MEMORY_FILE_NAME)
+
+
+def _require_private(status: os.stat_result, path: str, *, is_type: Callable[[int], bool]) -> None:
+    if not is_type(status.st_mode) or status.st_uid != os.geteuid() or status.st_mode & 0o077:
+        raise ImproperlyConfigured(
+            f"{path} must be owned by the current user and not accessible to anyone else; remove it or set "
+            "CONTACT_FORM_SECURITY_MMAP_PATH."
+        )
+
+
+class SharedMemorySecurityStateBackend(SecurityStateBackend):
+    def __init__(self, *, path: str | None = None, slots: int | None = None) -> None:
+        if fcntl is None:
+            raise ImproperlyConfigured("SharedMemorySecurityStateBackend requires a POSIX platform.")
+        self.path = path or str(
+            getattr(settings, "CONTACT_FORM_SECURITY_MMAP_PATH", None) or get_default_shared_memory_path()
+        )
+        self.slots = max(
+            SHARED_MEMORY_PROBE_WINDOW,
+            slots or get_positive_int_setting("CONTACT_FORM_SECURITY_MMAP_SLOTS", DEFAULT_SHARED_MEMORY_SLOTS),
+        )
+        self._file_descriptor: int | None = None
+        self._memory: mmap.mmap | None = None
+        self._open_lock = threading.Lock()
+        # POSIX record locks are held per process, so threads of one worker
+        # still need to exclude each other. Each stripe guards every
+        # probe-window-sized block of slots whose index maps to it.
+        self._stripe_locks = tuple(threading.Lock() for _stripe in range(SHARED_MEMORY_LOCK_STRIPES))
+
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        now = int(time.time())
+        slot_key = self._slot_key(key)
+        with self._locked_window(slot_key, exclusive=True) as (memory, first_slot):
+            slot, count, expires_at = self._find(memory, first_slot, slot_key, now)
+            count = count + 1 if expires_at > now else 1
+            if expires_at <= now:
+                expires_at = now + timeout
+            self._write(memory, slot, slot_key, expires_at, count)
+            return count
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        now = int(time.time())
+        slot_key = self._slot_key(key)
+        with self._locked_window(slot_key, exclusive=True) as (memory, first_slot):
+            slot, _count, expires_at = self._find(memory, first_slot, slot_key, now)
+            if expires_at > now:
+                return False
+            self._write(memory, slot, slot_key, now + timeout, 1)
+            return True
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        now = int(time.time())
+        slot_key = self._slot_key(key)
+        with self._locked_window(slot_key, exclusive=True) as (memory, first_slot):
+            slot, _count, expires_at = self._find(memory, first_slot, slot_key, now)
+            if expires_at <= now:
+                return False
+            self._write(memory, slot, _EMPTY_KEY, 0, 0)
+            return True
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        now = int(time.time())
+        slot_key = self._slot_key(key)
+        with self._locked_window(slot_key, exclusive=False) as (memory, first_slot):
+            return self._lookup(memory, first_slot, slot_key, now) is not None
+
+    def close(self) -> None:
+        with self._open_lock:
+            if self._memory is not None:
+                self._memory.close()
+                self._memory = None
+            if self._file_descriptor is not None:
+                os.close(self._file_descriptor)
+                self._file_descriptor = None
+
+    @staticmethod
+    def _slot_key(key: SecurityStateKey) -> bytes:
+        slot_key = bytes.fromhex(key.digest[:32])
+        return slot_key if slot_key != _EMPTY_KEY else b"\x01" + slot_key[1:]
+
+    def _first_slot(self, slot_key: bytes) -> int:
+        # Windows never wrap, so each one maps to a single contiguous byte
+        # range that one record lock can cover.
+        return int.from_bytes(slot_key[:8], "big") % (self.slots - SHARED_MEMORY_PROBE_WINDOW + 1)
+
+    @staticmethod
+    def _offset(slot: int) -> int:
+        return _HEADER.size + slot * _SLOT.size
+
+    def _lookup(self, memory: mmap.mmap, first_slot: int, slot_key: bytes, now: int) -> tuple[int, int, int] | None:
+        for slot in range(first_slot, first_slot + SHARED_MEMORY_PROBE_WINDOW):
+            stored_key, expires_at, count = _SLOT.unpack_from(memory, self._offset(slot))
+            if stored_key == slot_key and expires_at > now:
+                return slot, count, expires_at
+        return None
+
+    def _find(self, memory: mmap.mmap, first_slot: int, slot_key: bytes, now: int) -> tuple[int, int, int]:
+        free_slot: int | None = None
+        evicted_slot, evicted_expires_at = first_slot, None
+        for slot in range(first_slot, first_slot + SHARED_MEMORY_PROBE_WINDOW):
+            stored_key, expires_at, count = _SLOT.unpack_from(memory, self._offset(slot))
+            if stored_key == slot_key:
+                return slot, count, expires_at
+            if free_slot is None and (stored_key == _EMPTY_KEY or expires_at <= now):
+                free_slot = slot
+            if evicted_expires_at is None or expires_at < evicted_expires_at:
+                evicted_slot, evicted_expires_at = slot, expires_at
+        if free_slot is None:
+            increment_counter("contact_form.shared_memory.evictions")
+            return evicted_slot, 0, 0
+        return free_slot, 0, 0
+
+    def _write(self, memory: mmap.mmap, slot: int, slot_key: bytes, expires_at: int, count: int) -> None:
+        _SLOT.pack_into(memory, self._offset(slot), slot_key, expires_at, count)
+
+    @contextmanager
+    def _locked_window(self, slot_key: bytes, *, exclusive: bool) -> Iterator[tuple[mmap.mmap, int]]:
+        memory, file_descriptor = self._open()
+        first_slot = self._first_slot(slot_key)
+        lock_length = SHARED_MEMORY_PROBE_WINDOW * _SLOT.size
+        lock_start = self._offset(first_slot)
+        stripe_locks = self._window_stripe_locks(first_slot)
+        for stripe_lock in stripe_locks:
+            stripe_lock.acquire()
+        try:
+            fcntl.lockf(file_descriptor, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH, lock_length, lock_start)
+            try:
+                yield memory, first_slot
+            finally:
+                fcntl.lockf(file_descriptor, fcntl.LOCK_UN, lock_length, lock_start)
+        finally:
+            for stripe_lock in reversed(stripe_locks):
+                stripe_lock.release()
+
+    def _window_stripe_locks(self, first_slot: int) -> list[threading.Lock]:
+        # A window spans at most two blocks; taking their stripes in index
+        # order keeps threads with overlapping windows from deadlocking.
+        stripes = {
+            (first_slot // SHARED_MEMORY_PROBE_WINDOW) % SHARED_MEMORY_LOCK_STRIPES,
+            ((first_slot + SHARED_MEMORY_PROBE_WINDOW - 1) // SHARED_MEMORY_PROBE_WINDOW) % SHARED_MEMORY_LOCK_STRIPES,
+        }
+        return [self._stripe_locks[stripe] for stripe in sorted(stripes)]
+
+    def _open(self) -> tuple[mmap.mmap, int]:
+        if self._memory is not None and self._file_descriptor is not None:
+            return self._memory, self._file_descriptor
+        with self._open_lock:
+            if self._memory is None or self._file_descriptor is None:
+                self._file_descriptor, self._memory = self._map_file()
+            return self._memory, self._file_descriptor
+
+    def _map_file(self) -> tuple[int, mmap.mmap]:
+        size = _HEADER.size + self.slots * _SLOT.size
+        file_descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            _require_private(os.fstat(file_descriptor), self.path, is_type=stat.S_ISREG)
+            fcntl.lockf(file_descriptor, fcntl.LOCK_EX, _HEADER.size, 0)
+            try:
+                header = os.pread(file_descriptor, _HEADER.size, 0)
+                if len(header) < _HEADER.size or header[:4] != SHARED_MEMORY_MAGIC:
+                    os.ftruncate(file_descriptor, size)
+                    os.pwrite(
+                        file_descriptor,
+                        _HEADER.pack(SHARED_MEMORY_MAGIC, SHARED_MEMORY_VERSION, self.slots),
+                        0,
+                    )
+                else:
+                    self._validate_header(header)
+            finally:
+                fcntl.lockf(file_descriptor, fcntl.LOCK_UN, _HEADER.size, 0)
+            return file_descriptor, mmap.mmap(file_descriptor, size, mmap.MAP_SHARED)
+        except Exception:
+            os.close(file_descriptor)
+            raise
+
+    def _validate_header(self, header: bytes) -> None:
+        _magic, version, slots = _HEADER.unpack(header)
+        if version != SHARED_MEMORY_VERSION or slots != self.slots:
+            raise ImproperlyConfigured(
+                f"{self.path} was created with version {version} and {slots} slots; remove it or set "
+                f"CONTACT_FORM_SECURITY_MMAP_SLOTS to {slots}."
+            )
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING
+from typing import Any
+
+from django import forms
+from django.conf import settings
+
+from contact_form.security import SecurityEventKind
+from contact_form.security import acquire_security_windows
+from contact_form.security import get_page_scope_hash
+from contact_form.security import get_positive_int_setting
+
+if TYPE_CHECKING:
+    from contact_form.models import ContactPage
+
+NEAR_DUPLICATE_ACTION_REJECT = "reject"
+NEAR_DUPLICATE_ACTION_FLAG = "flag"
+NEAR_DUPLICATE_ACTIONS = (NEAR_DUPLICATE_ACTION_REJECT, NEAR_DUPLICATE_ACTION_FLAG)
+
+DEFAULT_NEAR_DUPLICATE_THRESHOLD = 5
+DEFAULT_NEAR_DUPLICATE_WINDOW_SECONDS = 3600
+DEFAULT_NEAR_DUPLICATE_INDEX_SLOTS = 65_536
+
+MINHASH_BANDS = 10
+MINHASH_ROWS = 5
+MINHASH_PERMUTATIONS = MINHASH_BANDS * MINHASH_ROWS
+MINHASH_SHINGLE_WORDS = 3
+MINHASH_MAX_TEXT_LENGTH = 4000
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_NON_WORD_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+_permutation_random = random.Random(0x636F6E74)
+_PERMUTATIONS: tuple[tuple[int, int], ...] = tuple(
+    (_permutation_random.randrange(1, _MERSENNE_PRIME), _permutation_random.randrange(0, _MERSENNE_PRIME))
+    for _index in range(MINHASH_PERMUTATIONS)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class NearDuplicateDecision:
+    allowed: bool
+    flagged: bool
+    hits: int
+
+
+def normalize_message_text(text: str) -> str:
+    normalized = unicodedata.normalize("NFKC", text[:MINHASH_MAX_TEXT_LENGTH]).casefold()
+    return " ".join(_NON_WORD_PATTERN.sub(" ", normalized).split())
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def get_shingles(text: str) -> set[int]:
+    words = normalize_message_text(text).split()
+    if len(words) < MINHASH_SHINGLE_WORDS:
+        return {_shingle_hash(word) for word in words}
+    return {
+        _shingle_hash(" ".join(words[index : index + MINHASH_SHINGLE_WORDS]))
+        for index in range(len(words) - MINHASH_SHINGLE_WORDS + 1)
+    }
+
+
+def minhash_signature(text: str) -> tuple[int, ...]:
+    shingles = get_shingles(text)
+    if not shingles:
+        return ()
+    return tuple(
+        min(((multiplier * shingle + increment) % _MERSENNE_PRIME) & _MAX_HASH for shingle in shingles)
+        for multiplier, increment in _PERMUTATIONS
+    )
+
+
+def estimate_similarity(first: tuple[int, ...], second: tuple[int, ...]) -> float:
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(left == right for left, right in zip(first, second)) / len(first)
+
+
+def get_band_slots(signature: tuple[int, ...], slots: int) -> list[str]:
+    band_slots: list[str] = []
+    for band in range(MINHASH_BANDS):
+        rows = signature[band * MINHASH_ROWS : (band + 1) * MINHASH_ROWS]
+        digest = hashlib.blake2b(
+            b"".join(row.to_bytes(4, "big") for row in rows),
+            digest_size=8,
+            person=band.to_bytes(2, "big"),
+        ).digest()
+        band_slots.append(f"{band}:{int.from_bytes(digest, 'big') % slots}")
+    return band_slots
+
+
+def get_submission_message_text(form: forms.Form) -> str:
+    from contact_form.forms import ContactFormBuilder
+
+    values: list[tuple[str, Any]] = [
+        (name, value)
+        for name, value in sorted(form.cleaned_data.items())
+        if name != ContactFormBuilder.CAPTCHA_FIELD_NAME and isinstance(value, str)
+    ]
+    message_values = [
+        value
+        for name, value in values
+        if isinstance(getattr(form.fields.get(name), "widget", None), forms.Textarea)
+    ]
+    return "\n".join(message_values or [value for _name, value in values])
+
+
+def is_near_duplicate_detection_enabled() -> bool:
+    return bool(getattr(settings, "CONTACT_FORM_NEAR_DUPLICATE_DETECTION", False))
+
+
+def record_near_duplicate_submission(
+    *,
+    page: ContactPage,
+    form: forms.Form,
+) -> NearDuplicateDecision:
+    signature = minhash_signature(get_submission_message_text(form))
+    if not signature:
+        return NearDuplicateDecision(allowed=True, flagged=False, hits=0)
+
+    threshold = get_positive_int_setting(
+        "CONTACT_FORM_NEAR_DUPLICATE_THRESHOLD",
+        DEFAULT_NEAR_DUPLICATE_THRESHOLD,
+    )
+    window_seconds = get_positive_int_setting(
+        "CONTACT_FORM_NEAR_DUPLICATE_WINDOW_SECONDS",
+        DEFAULT_NEAR_DUPLICATE_WINDOW_SECONDS,
+    )
+    slots = get_positive_int_setting(
+        "CONTACT_FORM_NEAR_DUPLICATE_INDEX_SLOTS",
+        DEFAULT_NEAR_DUPLICATE_INDEX_SLOTS,
+    )
+    scope_hash = get_page_scope_hash(page)
+
+    decisions = acquire_security_windows(
+        kind=str(SecurityEventKind.NEAR_DUPLICATE),
+        scope_hash=scope_hash,
+        fingerprints=get_band_slots(signature, slots),
+        duration=timedelta(seconds=window_seconds),
+        limit=max(2, threshold + 1),
+    )
+    hits = max((decision.previous_count for decision in decisions), default=0)
+
+    if hits < threshold:
+        return NearDuplicateDecision(allowed=True, flagged=False, hits=hits)
+
+    action = getattr(settings, "CONTACT_FORM_NEAR_DUPLICATE_ACTION", NEAR_DUPLICATE_ACTION_REJECT)
+    return NearDuplicateDecision(
+        allowed=action == NEAR_DUPLICATE_ACTION_FLAG,
+        flagged=True,
+        hits=hits,
+    )
@@ -0,0 +1,102 @@
+(() => {
+  "use strict";
+
+  const INPUT_SELECTOR = "[data-proof-of-work-input]";
+
+  const showStatus = (inputElement, message) => {
+    const statusElement = inputElement.nextElementSibling;
+    if (
+      !(statusElement instanceof HTMLElement) ||
+      !statusElement.matches("[data-proof-of-work-status]")
+    ) {
+      return;
+    }
+
+    statusElement.textContent = message;
+    statusElement.hidden = !message;
+  };
+
+  const setSubmitDisabled = (form, disabled) => {
+    form.querySelectorAll("[type='submit']").forEach((button) => {
+      button.disabled = disabled;
+    });
+  };
+
+  const solveChallenge = (inputElement) => {
+    const container = inputElement.closest("[data-proof-of-work]");
+    const form = inputElement.closest("form");
+    if (
+      !(container instanceof HTMLElement) ||
+      !(form instanceof HTMLFormElement)
+    ) {
+      return;
+    }
+
+    const showError = () => {
+      showStatus(inputElement, inputElement.dataset.errorMessage || "");
+    };
+
+    let challenge;
+    try {
+      challenge = JSON.parse(container.dataset.proofOfWork || "");
+    } catch {
+      showError();
+      return;
+    }
+
+    inputElement.value = "";
+    setSubmitDisabled(form, true);
+    showStatus(inputElement, inputElement.dataset.pendingMessage || "");
+
+    let worker;
+    try {
+      worker = new Worker(inputElement.dataset.workerUrl);
+    } catch {
+      setSubmitDisabled(form, false);
+      showError();
+      return;
+    }
+
+    worker.addEventListener("message", (event) => {
+      worker.terminate();
+      setSubmitDisabled(form, false);
+      if (event.data.number === null) {
+        showError();
+        return;
+      }
+
+      inputElement.value = JSON.stringify({
+        signature: challenge.signature,
+        number: event.data.number,
+      });
+      showStatus(inputElement, "");
+    });
+    worker.addEventListener("error", () => {
+      worker.terminate();
+      setSubmitDisabled(form, false);
+      showError();
+    });
+    worker.postMessage({
+      algorithm: challenge.algorithm,
+      salt: challenge.salt,
+      challenge: challenge.challenge,
+      maxNumber: challenge.max_number,
+    });
+  };
+
+  const initializeProofOfWork = () => {
+    document.querySelectorAll(INPUT_SELECTOR).forEach((inputElement) => {
+      if (inputElement instanceof HTMLInputElement) {
+        solveChallenge(inputElement);
+      }
+    });
+  };
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", initializeProofOfWork, {
+      once: true,
+    });
+  } else {
+    initializeProofOfWork();
+  }
+})();
@@ -0,0 +1,25 @@
+"use strict";
+
+const encoder = new TextEncoder();
+
+const toHex = (buffer) =>
+  Array.from(new Uint8Array(buffer), (byte) =>
+    byte.toString(16).padStart(2, "0"),
+  ).join("");
+
+self.addEventListener("message", async (event) => {
+  const { algorithm, salt, challenge, maxNumber } = event.data;
+
+  for (let number = 0; number <= maxNumber; number += 1) {
+    const digest = await crypto.subtle.digest(
+      algorithm,
+      encoder.encode(`${salt}${number}`),
+    );
+    if (toHex(digest) === challenge) {
+      self.postMessage({ number });
+      return;
+    }
+  }
+
+  self.postMessage({ number: null });
+});
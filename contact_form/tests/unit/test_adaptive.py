@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.adaptive import ADAPTIVE_SIGNAL_CAPTCHA_FAILURE
+from contact_form.adaptive import ADAPTIVE_SIGNAL_POST
+from contact_form.adaptive import ADAPTIVE_SIGNAL_TOKEN_FAILURE
+from contact_form.adaptive import get_adaptive_state
+from contact_form.adaptive import get_attack_post_limit
+from contact_form.adaptive import is_under_attack
+from contact_form.adaptive import record_adaptive_events
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.metrics import registry
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_clearance import create_turnstile_page
+from contact_form.tests.unit.test_clearance import submit
+from contact_form.tests.unit.test_contact_page import securely_post_form
+from contact_form.turnstile import TurnstileField
+
+
+@pytest.fixture(autouse=True)
+def adaptive_settings(settings: Any) -> None:
+    settings.CONTACT_FORM_ADAPTIVE_PROTECTION = True
+    cache.clear()
+    registry.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    CaptchaSettings.objects.update_or_create(
+        defaults={
+            "turnstile_site_key": "configured-site-key",
+            "turnstile_secret_key": "configured-secret-key",
+        }
+    )
+    return create_turnstile_page("Contact Us")
+
+
+@pytest.fixture
+def verifier() -> Any:
+    with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+        yield verifier
+
+
+def record_at(page: ContactPage, moment: float, *events: str) -> Any:
+    with patch("contact_form.adaptive.time.time", return_value=moment):
+        return record_adaptive_events(page=page, events=events)
+
+
+def state_at(page: ContactPage, moment: float) -> Any:
+    with patch("contact_form.adaptive.time.time", return_value=moment):
+        return get_adaptive_state(page=page)
+
+
+@pytest.mark.django_db
+class TestAdaptiveState:
+    def test_steady_stream_converges_on_its_rate_per_minute(self, settings: Any, contact_page: ContactPage) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_POST: 1000}
+        for second in range(600):
+            state = record_at(contact_page, 1000.0 + second, ADAPTIVE_SIGNAL_POST)
+
+        assert state.get_rate(ADAPTIVE_SIGNAL_POST) == pytest.approx(60, abs=1)
+        assert not state.under_attack
+
+    def test_rates_decay_with_the_half_life(self, contact_page: ContactPage) -> None:
+        rate = record_at(contact_page, 1000.0, ADAPTIVE_SIGNAL_TOKEN_FAILURE).get_rate(ADAPTIVE_SIGNAL_TOKEN_FAILURE)
+
+        assert state_at(contact_page, 1060.0).get_rate(ADAPTIVE_SIGNAL_TOKEN_FAILURE) == pytest.approx(rate / 2)
+
+    def test_attack_mode_trips_and_relaxes_after_the_cooldown(
+        self,
+        settings: Any,
+        contact_page: ContactPage,
+        caplog: Any,
+    ) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_TOKEN_FAILURE: 5}
+        settings.CONTACT_FORM_ADAPTIVE_COOLDOWN_SECONDS = 300
+
+        with caplog.at_level(logging.WARNING, logger="contact_form.adaptive"):
+            for second in range(10):
+                state = record_at(contact_page, 1000.0 + second, ADAPTIVE_SIGNAL_TOKEN_FAILURE)
+            assert state.under_attack
+            assert state_at(contact_page, 1200.0).under_attack
+            assert not state_at(contact_page, 1400.0).under_attack
+
+            relaxed = record_at(contact_page, 1400.0, ADAPTIVE_SIGNAL_POST)
+
+        assert not relaxed.under_attack
+        assert [record.getMessage().split(":")[0] for record in caplog.records] == [
+            "Contact form adaptive protection switched to attack mode",
+            "Contact form adaptive protection switched to normal mode",
+        ]
+        assert registry.get("contact_form.adaptive.transitions", mode="attack") == 1
+        assert registry.get("contact_form.adaptive.transitions", mode="normal") == 1
+
+    def test_state_is_scoped_to_the_page(self, settings: Any, contact_page: ContactPage) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_POST: 0.5}
+        other_page = create_turnstile_page("Other")
+
+        record_adaptive_events(page=contact_page, events=[ADAPTIVE_SIGNAL_POST])
+
+        assert is_under_attack(page=contact_page)
+        assert not is_under_attack(page=other_page)
+
+    def test_disabled_protection_never_reports_an_attack(self, settings: Any, contact_page: ContactPage) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_POST: 0.5}
+        record_adaptive_events(page=contact_page, events=[ADAPTIVE_SIGNAL_POST])
+        settings.CONTACT_FORM_ADAPTIVE_PROTECTION = False
+
+        assert not is_under_attack(page=contact_page)
+
+    @pytest.mark.parametrize(("limit", "attack_limit"), [(1, 1), (2, 2), (3, 2), (5, 2), (10, 5)])
+    def test_attack_post_limit_is_divided(self, limit: int, attack_limit: int) -> None:
+        assert get_attack_post_limit(limit) == attack_limit
+
+
+@pytest.mark.django_db
+class TestAttackMode:
+    @pytest.fixture(autouse=True)
+    def trip_on_first_post(self, settings: Any) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_POST: 0.5}
+
+    def test_minimum_completion_time_is_raised(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Quick"}
+        response, _post_data = securely_post_form(client=client, page=contact_page, data=data)
+        assert b"Thank you for your submission!" in response.content
+
+        data["message"] = "Quick again"
+        response, _post_data = securely_post_form(client=client, page=contact_page, data=data)
+
+        assert response.status_code == 400
+        assert b"Thank you for your submission!" not in response.content
+
+    def test_post_limit_is_tightened(
+        self,
+        settings: Any,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        settings.CONTACT_FORM_POST_LIMIT = 6
+
+        responses = [submit(client, contact_page, f"Message {index}") for index in range(4)]
+
+        assert [response.status_code for response in responses] == [200, 200, 200, 429]
+
+    def test_captcha_clearance_is_ignored(
+        self,
+        settings: Any,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        settings.CONTACT_FORM_CAPTCHA_CLEARANCE_SECONDS = 600
+        submit(client, contact_page, "First")
+        assert is_under_attack(page=contact_page)
+
+        page_response = client.get(contact_page.url)
+
+        assert "wagtailcaptcha" in page_response.context["form"].fields
+
+    def test_captcha_failures_are_counted(self, settings: Any, client: Any, contact_page: ContactPage) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_CAPTCHA_FAILURE: 0.5, ADAPTIVE_SIGNAL_POST: 1000}
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(False, "invalid-input-response")):
+            response = submit(client, contact_page, "Rejected")
+
+        assert "wagtailcaptcha" in response.context["form"].errors
+        assert is_under_attack(page=contact_page)
+
+
+class TestAdaptiveChecks:
+    def test_unknown_signals_are_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {"posts": 10}
+
+        assert "contact_form.E022" in {message.id for message in check_contact_form_security_settings(None)}
+
+    def test_non_positive_thresholds_are_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_POST: 0}
+
+        assert "contact_form.E022" in {message.id for message in check_contact_form_security_settings(None)}
+
+    def test_valid_thresholds_pass(self, settings: Any) -> None:
+        settings.CONTACT_FORM_ADAPTIVE_THRESHOLDS = {ADAPTIVE_SIGNAL_POST: 120}
+
+        assert "contact_form.E022" not in {message.id for message in check_contact_form_security_settings(None)}
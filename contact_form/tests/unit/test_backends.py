@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import uuid
+from datetime import timedelta
+from io import StringIO
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.cache import caches
+from django.core.management import call_command
+
+from contact_form.backends import CacheSecurityStateBackend
+from contact_form.backends import DatabaseSecurityStateBackend
+from contact_form.backends import get_security_state_backend
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.checks import check_contact_form_shared_security_state
+from contact_form.models import ContactFormSecurityState
+from contact_form.security import SecurityEventKind
+from contact_form.security import SecurityStateKey
+from contact_form.security import acquire_security_window
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import is_submission_nonce_used
+from contact_form.security import release_submission_nonce
+from contact_form.security import reserve_submission_nonce
+
+DATABASE_BACKEND = "contact_form.backends.DatabaseSecurityStateBackend"
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+
+
+@pytest.fixture
+def page() -> MagicMock:
+    return MagicMock(translation_key=uuid.uuid4())
+
+
+@pytest.fixture
+def state_key() -> SecurityStateKey:
+    return SecurityStateKey(kind="post_rate_limit", scope_hash="a" * 64, fingerprint="client", bucket=1)
+
+
+@pytest.mark.django_db
+class TestDatabaseSecurityStateBackend:
+    def test_increment_is_an_upsert(self, state_key: SecurityStateKey) -> None:
+        backend = DatabaseSecurityStateBackend()
+
+        counts = [backend.increment(state_key, timeout=60) for _attempt in range(3)]
+
+        assert counts == [1, 2, 3]
+        assert ContactFormSecurityState.objects.count() == 1
+
+    def test_expired_counter_restarts(self, state_key: SecurityStateKey) -> None:
+        backend = DatabaseSecurityStateBackend()
+        with patch("contact_form.backends.time.time", return_value=1_000):
+            backend.increment(state_key, timeout=60)
+            backend.increment(state_key, timeout=60)
+        with patch("contact_form.backends.time.time", return_value=1_060):
+            assert backend.increment(state_key, timeout=60) == 1
+
+    def test_reservation_lifecycle(self, state_key: SecurityStateKey) -> None:
+        backend = DatabaseSecurityStateBackend()
+
+        assert backend.reserve(state_key, timeout=60) is True
+        assert backend.exists(state_key, timeout=60) is True
+        assert backend.reserve(state_key, timeout=60) is False
+        assert backend.release(state_key, timeout=60) is True
+        assert backend.exists(state_key, timeout=60) is False
+        assert backend.reserve(state_key, timeout=60) is True
+
+    def test_expired_reservation_can_be_taken_again(self, state_key: SecurityStateKey) -> None:
+        backend = DatabaseSecurityStateBackend()
+        with patch("contact_form.backends.time.time", return_value=1_000):
+            backend.reserve(state_key, timeout=60)
+        with patch("contact_form.backends.time.time", return_value=1_060):
+            assert backend.exists(state_key, timeout=60) is False
+            assert backend.reserve(state_key, timeout=60) is True
+
+    def test_locked_upsert_matches_native_upsert(self, state_key: SecurityStateKey) -> None:
+        backend = DatabaseSecurityStateBackend()
+        with patch.object(DatabaseSecurityStateBackend, "_supports_upsert", return_value=False):
+            assert [backend.increment(state_key, timeout=60) for _attempt in range(2)] == [1, 2]
+            reservation = SecurityStateKey(kind="submission_nonce", scope_hash="a" * 64, fingerprint="nonce")
+            assert backend.reserve(reservation, timeout=60) is True
+            assert backend.reserve(reservation, timeout=60) is False
+
+    def test_purge_expired_removes_only_expired_rows(self) -> None:
+        ContactFormSecurityState.objects.create(key="a" * 64, count=1, expires_at=100)
+        ContactFormSecurityState.objects.create(key="b" * 64, count=1, expires_at=300)
+
+        assert DatabaseSecurityStateBackend().purge_expired(now=200) == 1
+        assert list(ContactFormSecurityState.objects.values_list("key", flat=True)) == ["b" * 64]
+
+    def test_writes_sweep_expired_rows_periodically(self, state_key: SecurityStateKey) -> None:
+        ContactFormSecurityState.objects.create(key="a" * 64, count=1, expires_at=100)
+        backend = DatabaseSecurityStateBackend()
+
+        with patch("contact_form.backends.time.time", return_value=1_000):
+            backend.increment(state_key, timeout=60)
+        ContactFormSecurityState.objects.create(key="b" * 64, count=1, expires_at=100)
+        with patch("contact_form.backends.time.time", return_value=1_010):
+            backend.increment(state_key, timeout=60)
+
+        assert set(ContactFormSecurityState.objects.values_list("key", flat=True)) == {state_key.digest, "b" * 64}
+
+    def test_purge_command(self) -> None:
+        ContactFormSecurityState.objects.create(key="a" * 64, count=1, expires_at=100)
+        output = StringIO()
+
+        call_command("purge_contact_form_security_state", stdout=output)
+
+        assert "Purged 1 expired" in output.getvalue()
+        assert not ContactFormSecurityState.objects.exists()
+
+
+class _FakeRedisPipeline:
+    def __init__(self, values: dict[str, int]) -> None:
+        self.values = values
+        self.commands: list[tuple[str, str]] = []
+
+    def set(self, key: str, value: int, *, ex: int, nx: bool) -> None:
+        self.commands.append(("set", key))
+
+    def incr(self, key: str) -> None:
+        self.commands.append(("incr", key))
+
+    def execute(self) -> list[Any]:
+        results: list[Any] = []
+        for command, key in self.commands:
+            if command == "set":
+                results.append(self.values.setdefault(key, 0) == 0)
+            else:
+                self.values[key] += 1
+                results.append(self.values[key])
+        return results
+
+
+class TestCacheSecurityStateBackend:
+    def test_batched_increments_use_one_redis_pipeline(self) -> None:
+        values: dict[str, int] = {}
+        client = MagicMock()
+        client.pipeline.side_effect = lambda transaction: _FakeRedisPipeline(values)
+        keys = [
+            SecurityStateKey(kind="near_duplicate", scope_hash="a" * 64, fingerprint=f"band-{index}", bucket=1)
+            for index in range(3)
+        ]
+
+        with patch("contact_form.backends.get_redis_client", return_value=client):
+            first = CacheSecurityStateBackend().increment_many(keys, timeout=60)
+            second = CacheSecurityStateBackend().increment_many(keys[:1], timeout=60)
+
+        assert (first, second) == ([1, 1, 1], [2])
+        assert client.pipeline.call_count == 2
+
+
+@pytest.mark.django_db
+class TestSecurityStateBackendSettings:
+    def test_cache_backend_is_default(self) -> None:
+        assert isinstance(get_security_state_backend(), CacheSecurityStateBackend)
+
+    def test_database_backend_is_shared_across_processes(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_SECURITY_BACKEND = DATABASE_BACKEND
+        settings.CONTACT_FORM_LOCAL_VERDICT_CACHE_SIZE = 0
+
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+        cache.clear()
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is False
+        assert release_submission_nonce(page=page, nonce_hash="nonce") is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is False
+
+        decisions = []
+        for _worker in range(3):
+            cache.clear()
+            decisions.append(
+                acquire_security_window(
+                    kind=str(SecurityEventKind.POST_RATE_LIMIT),
+                    scope_hash="c" * 64,
+                    fingerprint="client",
+                    duration=timedelta(seconds=600),
+                    limit=2,
+                ).allowed
+            )
+        assert decisions == [True, True, False]
+
+    def test_cache_alias_isolates_security_state(self, settings: Any, page: MagicMock) -> None:
+        settings.CACHES = {
+            **settings.CACHES,
+            "contact-form-security": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "contact-form-security-tests",
+            },
+        }
+        settings.CONTACT_FORM_SECURITY_CACHE_ALIAS = "contact-form-security"
+        settings.CONTACT_FORM_LOCAL_VERDICT_CACHE_SIZE = 0
+
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+        cache.clear()
+
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+        caches["contact-form-security"].clear()
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is False
+
+    def test_invalid_backend_and_alias_are_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SECURITY_BACKEND = "contact_form.backends.Missing"
+        settings.CONTACT_FORM_SECURITY_CACHE_ALIAS = "missing"
+
+        message_ids = {message.id for message in check_contact_form_security_settings()}
+
+        assert {"contact_form.E014", "contact_form.E015"} <= message_ids
+
+    def test_per_process_cache_is_flagged_for_deployment(self, settings: Any) -> None:
+        assert [message.id for message in check_contact_form_shared_security_state()] == ["contact_form.W003"]
+
+        settings.CONTACT_FORM_SECURITY_BACKEND = DATABASE_BACKEND
+        assert check_contact_form_shared_security_state() == []
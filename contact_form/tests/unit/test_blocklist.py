@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import random
+import string
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.blocklist import BlocklistMatch
+from contact_form.blocklist import BlocklistMatcher
+from contact_form.blocklist import clear_blocklist_matcher
+from contact_form.blocklist import find_blocklisted_value
+from contact_form.blocklist import get_blocklist_matcher
+from contact_form.blocklist import normalize_blocklist_text
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.metrics import registry
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_clearance import create_turnstile_page
+from contact_form.tests.unit.test_clearance import submit
+from contact_form.turnstile import TurnstileField
+
+
+def naive_matches(patterns: list[str], text: str) -> set[tuple[int, str]]:
+    matches = set()
+    for pattern in patterns:
+        start = text.find(pattern)
+        while start != -1:
+            end = start + len(pattern)
+            if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum()):
+                matches.add((start, pattern))
+            start = text.find(pattern, start + 1)
+    return matches
+
+
+@pytest.fixture(autouse=True)
+def clear_matcher() -> None:
+    clear_blocklist_matcher()
+
+
+class TestBlocklistMatcher:
+    def test_overlapping_patterns_are_all_reported(self) -> None:
+        matcher = BlocklistMatcher(["he", "she", "his", "hers", "she sells"])
+
+        assert sorted(matcher.iter_matches("she sells hers")) == [(0, "she"), (0, "she sells"), (10, "hers")]
+
+    def test_terms_only_match_whole_words(self) -> None:
+        matcher = BlocklistMatcher(["cialis", "spam.example"])
+
+        assert matcher.search("Ask a specialist") is None
+        assert matcher.search("Buy CIALIS now") == "cialis"
+        assert matcher.search("visit https://www.spam.example/offer") == "spam.example"
+        assert matcher.search("visit https://notspam.example") is None
+
+    def test_text_is_normalized_before_matching(self) -> None:
+        matcher = BlocklistMatcher(["  Casino  ", ""])
+
+        assert matcher.patterns == ("casino",)
+        assert matcher.search("ＣＡＳＩＮＯ bonus") == "casino"
+
+    def test_matches_agree_with_a_naive_scan(self) -> None:
+        generator = random.Random(7)
+        alphabet = "ab c"
+        patterns = sorted({"".join(generator.choices(alphabet, k=generator.randint(1, 4))) for _index in range(40)})
+        matcher = BlocklistMatcher(patterns)
+        patterns = list(matcher.patterns)
+
+        for _attempt in range(50):
+            text = normalize_blocklist_text("".join(generator.choices(alphabet + string.digits, k=60)))
+            assert set(matcher.iter_matches(text)) == naive_matches(patterns, text)
+
+
+class TestBlocklistSources:
+    def test_matcher_is_cached_until_settings_change(self, settings: Any) -> None:
+        settings.CONTACT_FORM_BLOCKLIST = ["casino"]
+        matcher = get_blocklist_matcher()
+
+        assert get_blocklist_matcher() is matcher
+
+        settings.CONTACT_FORM_BLOCKLIST = ["casino", "viagra"]
+
+        assert get_blocklist_matcher().patterns == ("casino", "viagra")
+
+    def test_file_changes_rebuild_the_matcher(self, settings: Any, tmp_path: Path) -> None:
+        blocklist_file = tmp_path / "blocklist.txt"
+        blocklist_file.write_text("# spam phrases\ncasino\n", encoding="utf-8")
+        settings.CONTACT_FORM_BLOCKLIST_FILE = str(blocklist_file)
+        assert get_blocklist_matcher().patterns == ("casino",)
+
+        blocklist_file.write_text("casino\nspam.example\n", encoding="utf-8")
+        stat_result = blocklist_file.stat()
+        os.utime(blocklist_file, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000_000))
+
+        assert get_blocklist_matcher().patterns == ("casino", "spam.example")
+
+    def test_every_string_value_is_scanned(self, settings: Any) -> None:
+        settings.CONTACT_FORM_BLOCKLIST = ["casino"]
+
+        match = find_blocklisted_value({"age": 30, "topics": ["Support", "Casino"], "message": "Hello"})
+
+        assert match == BlocklistMatch(field_name="topics", pattern="casino")
+        assert find_blocklisted_value({"message": "Hello"}) is None
+
+    def test_invalid_configuration_is_reported(self, settings: Any, tmp_path: Path) -> None:
+        settings.CONTACT_FORM_BLOCKLIST = "casino"
+        settings.CONTACT_FORM_BLOCKLIST_FILE = str(tmp_path / "missing.txt")
+
+        message_ids = [message.id for message in check_contact_form_security_settings()]
+
+        assert message_ids.count("contact_form.E019") == 1
+        assert message_ids.count("contact_form.E027") == 1
+
+
+@pytest.mark.django_db
+class TestBlocklistedSubmissions:
+    @pytest.fixture
+    def contact_page(self, db: Any) -> ContactPage:
+        cache.clear()
+        registry.clear()
+        get_local_verdict_cache().clear()
+        clear_rejection_cache()
+        CaptchaSettings.objects.update_or_create(
+            defaults={
+                "turnstile_site_key": "configured-site-key",
+                "turnstile_secret_key": "configured-secret-key",
+            }
+        )
+        return create_turnstile_page("Contact Us")
+
+    def test_blocklisted_submissions_are_dropped_silently(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_BLOCKLIST = ["cheap watches"]
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")):
+            blocked = submit(client, contact_page, "Cheap\n  watches, best prices")
+            allowed = submit(client, contact_page, "Where can I buy a watch?")
+
+        assert b"Thank you for your submission!" in blocked.content
+        assert b"Thank you for your submission!" in allowed.content
+        assert contact_page.get_submission_class().objects.count() == 1
+        assert registry.get("contact_form.blocklist.matches", field="message") == 1
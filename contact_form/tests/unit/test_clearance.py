@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import time
+from io import StringIO
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from wagtail.models import Site
+
+from contact_form.clearance import CLEARANCE_GENERATION_KEY
+from contact_form.clearance import DEFAULT_CLEARANCE_COOKIE_NAME
+from contact_form.models import CaptchaProvider
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+from contact_form.tests.unit.test_contact_page import securely_post_form
+from contact_form.turnstile import TurnstileField
+
+
+def create_turnstile_page(title: str) -> ContactPage:
+    page = ContactPage(
+        title=title,
+        thank_you_text="Thank you for your submission!",
+        from_address="forms@example.com",
+        to_address="normal@example.com",
+        subject="Contact Form",
+        captcha_provider=CaptchaProvider.TURNSTILE,
+    )
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    create_standard_fields(page)
+    return page
+
+
+def submit(client: Any, page: ContactPage, message: str, **kwargs: Any) -> Any:
+    now = time.time()
+    data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": message}
+    response, _post_data = securely_post_form(
+        client=client,
+        page=page,
+        data=data,
+        issued_at=now - 10,
+        submitted_at=now,
+        **kwargs,
+    )
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clearance_settings(settings: Any) -> None:
+    settings.CONTACT_FORM_CAPTCHA_CLEARANCE_SECONDS = 600
+    cache.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    CaptchaSettings.objects.update_or_create(
+        defaults={
+            "turnstile_site_key": "configured-site-key",
+            "turnstile_secret_key": "configured-secret-key",
+        }
+    )
+    return create_turnstile_page("Contact Us")
+
+
+@pytest.fixture
+def verifier() -> Any:
+    with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+        yield verifier
+
+
+@pytest.mark.django_db
+class TestCaptchaClearance:
+    def test_verified_client_skips_the_captcha_on_return(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        response = submit(client, contact_page, "First")
+        cookie = response.cookies[DEFAULT_CLEARANCE_COOKIE_NAME]
+        assert cookie["httponly"] and cookie["max-age"] == 600
+
+        page_response = client.get(contact_page.url)
+        assert "wagtailcaptcha" not in page_response.context["form"].fields
+        assert b"challenges.cloudflare.com" not in page_response.content
+
+        second = submit(client, contact_page, "Second", captcha_token=None)
+
+        assert b"Thank you for your submission!" in second.content
+        assert verifier.call_count == 1
+
+    def test_clearance_is_bound_to_the_client(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        submit(client, contact_page, "First")
+
+        response = client.get(contact_page.url, REMOTE_ADDR="198.51.100.7")
+
+        assert "wagtailcaptcha" in response.context["form"].fields
+
+    def test_clearance_is_bound_to_the_page(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        submit(client, contact_page, "First")
+        other_page = create_turnstile_page("Support")
+        client.cookies[DEFAULT_CLEARANCE_COOKIE_NAME]["path"] = "/"
+
+        response = client.get(other_page.url)
+
+        assert "wagtailcaptcha" in response.context["form"].fields
+
+    @pytest.mark.parametrize("revoke", ["command", "eviction"])
+    def test_clearances_can_be_revoked(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+        revoke: str,
+    ) -> None:
+        submit(client, contact_page, "First")
+        assert "wagtailcaptcha" not in client.get(contact_page.url).context["form"].fields
+
+        if revoke == "command":
+            call_command("revoke_contact_form_clearances", stdout=StringIO())
+        else:
+            cache.delete(CLEARANCE_GENERATION_KEY)
+
+        assert "wagtailcaptcha" in client.get(contact_page.url).context["form"].fields
+
+    def test_tampered_cookie_is_ignored(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        submit(client, contact_page, "First")
+        client.cookies[DEFAULT_CLEARANCE_COOKIE_NAME] = client.cookies[DEFAULT_CLEARANCE_COOKIE_NAME].value + "x"
+
+        assert "wagtailcaptcha" in client.get(contact_page.url).context["form"].fields
+
+    def test_clearance_is_disabled_by_default(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_CAPTCHA_CLEARANCE_SECONDS = 0
+
+        response = submit(client, contact_page, "First")
+
+        assert DEFAULT_CLEARANCE_COOKIE_NAME not in response.cookies
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from contact_form.context import REQUEST_ENVIRONMENT_ATTRIBUTE
+from contact_form.context import RequestEnvironment
+from contact_form.context import get_request_environment
+from contact_form.forms import _get_turnstile_allowed_hostnames
+from contact_form.security import get_client_fingerprint
+from contact_form.security import get_client_ip
+from contact_form.security import resolve_client_ip
+from contact_form.turnstile import _normalize_hostname
+from contact_form.utils import TURNSTILE_TEST_SITE_KEY
+from contact_form.utils import clear_captcha_production_forced
+from contact_form.utils import get_captcha_keys_for_environment
+from contact_form.utils import is_localhost
+from contact_form.utils import normalize_hostname
+
+CONFIGURED_KEYS = {"site_key": "configured-site-key", "secret_key": "configured-secret-key"}
+
+
+@pytest.fixture(autouse=True)
+def clear_production_flag(settings: Any) -> None:
+    settings.ALLOWED_HOSTS = ["*"]
+    clear_captcha_production_forced()
+    yield
+    clear_captcha_production_forced()
+
+
+def get_localhost_site_key(rf: Any) -> str:
+    request = rf.get("/", HTTP_HOST="localhost")
+    return get_captcha_keys_for_environment("turnstile", request, CONFIGURED_KEYS)["site_key"]
+
+
+class TestRequestEnvironment:
+    def test_environment_is_slotted(self, rf: Any) -> None:
+        assert not hasattr(RequestEnvironment(rf.get("/")), "__dict__")
+
+    def test_host_is_read_once_per_request(self, rf: Any) -> None:
+        request = rf.post("/contact/", HTTP_HOST="localhost:8000")
+        with patch.object(request, "get_host", wraps=request.get_host) as get_host:
+            assert is_localhost(request)
+            assert _get_turnstile_allowed_hostnames(request) == ("localhost:8000",)
+            keys = get_captcha_keys_for_environment("turnstile", request, CONFIGURED_KEYS)
+            assert keys["site_key"] == TURNSTILE_TEST_SITE_KEY
+            assert is_localhost(request)
+
+        assert get_host.call_count == 1
+
+    def test_client_address_is_resolved_once_per_request(self, rf: Any) -> None:
+        request = rf.post("/contact/", REMOTE_ADDR="198.51.100.7")
+        with patch("contact_form.security.resolve_client_ip", wraps=resolve_client_ip) as resolve:
+            assert get_client_ip(request) == "198.51.100.7"
+            fingerprint = get_client_fingerprint(request)
+            assert get_client_fingerprint(request) == fingerprint
+            assert get_client_ip(request) == "198.51.100.7"
+
+        assert resolve.call_count == 1
+
+    def test_hostnames_are_normalized_once_per_request(self, rf: Any) -> None:
+        request = rf.post("/contact/")
+        with patch("contact_form.utils.normalize_hostname", wraps=normalize_hostname) as normalize:
+            assert _normalize_hostname("Example.COM.", request) == "example.com"
+            assert _normalize_hostname("Example.COM.", request) == "example.com"
+            assert _normalize_hostname("bücher.example", request) == "xn--bcher-kva.example"
+
+        assert normalize.call_count == 2
+
+    def test_environment_is_shared_by_the_request(self, rf: Any) -> None:
+        request = rf.get("/")
+
+        assert get_request_environment(request) is get_request_environment(request)
+        assert get_request_environment(rf.get("/")) is not get_request_environment(request)
+
+    def test_test_doubles_are_memoized_until_cleared(self) -> None:
+        request = MagicMock()
+        request.get_host.return_value = "localhost"
+        assert get_request_environment(request).is_localhost
+
+        request.get_host.return_value = "example.com"
+        assert get_request_environment(request).is_localhost
+        delattr(request, REQUEST_ENVIRONMENT_ATTRIBUTE)
+        assert not get_request_environment(request).is_localhost
+
+
+class TestCaptchaProductionFlag:
+    def test_flag_is_read_once(self, rf: Any, monkeypatch: Any) -> None:
+        monkeypatch.setenv("CAPTCHA_FORCE_PRODUCTION", "true")
+        assert get_localhost_site_key(rf) == "configured-site-key"
+
+        monkeypatch.delenv("CAPTCHA_FORCE_PRODUCTION")
+        assert get_localhost_site_key(rf) == "configured-site-key"
+
+        clear_captcha_production_forced()
+        assert get_localhost_site_key(rf) == TURNSTILE_TEST_SITE_KEY
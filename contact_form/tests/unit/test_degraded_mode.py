@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterator
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.backends import LocalSecurityStateBackend
+from contact_form.backends import ResilientSecurityStateBackend
+from contact_form.backends import SecurityStateBackend
+from contact_form.backends import get_security_state_backend
+from contact_form.metrics import registry
+from contact_form.metrics import security_metric
+from contact_form.security import SecurityEventKind
+from contact_form.security import SecurityStateKey
+from contact_form.security import acquire_security_window
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import reserve_submission_nonce
+
+
+class _UnavailableBackend(SecurityStateBackend):
+    def __init__(self) -> None:
+        self.available = False
+        self.calls = 0
+
+    def _check(self) -> None:
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("cache is down")
+
+    def increment(self, key: SecurityStateKey, *, timeout: int) -> int:
+        self._check()
+        return 1
+
+    def reserve(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        self._check()
+        return True
+
+    def release(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        self._check()
+        return True
+
+    def exists(self, key: SecurityStateKey, *, timeout: int) -> bool:
+        self._check()
+        return False
+
+
+@pytest.fixture(autouse=True)
+def clear_state() -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+    registry.clear()
+
+
+@pytest.fixture
+def primary() -> _UnavailableBackend:
+    return _UnavailableBackend()
+
+
+@pytest.fixture
+def backend(primary: _UnavailableBackend) -> Iterator[ResilientSecurityStateBackend]:
+    with patch("contact_form.backends.threading.Thread"):
+        yield ResilientSecurityStateBackend(
+            primary,
+            fallback=LocalSecurityStateBackend(max_entries=100, rate_divisor=2),
+            probe_interval_seconds=60,
+        )
+
+
+@pytest.fixture
+def state_key() -> SecurityStateKey:
+    return SecurityStateKey(kind="post_rate_limit", scope_hash="a" * 64, fingerprint="client", bucket=1)
+
+
+class TestLocalSecurityStateBackend:
+    def test_counts_are_scaled_to_share_the_limit_between_workers(self, state_key: SecurityStateKey) -> None:
+        fallback = LocalSecurityStateBackend(max_entries=100, rate_divisor=3)
+
+        assert [fallback.increment(state_key, timeout=60) for _attempt in range(3)] == [1, 4, 7]
+
+    def test_reservations(self, state_key: SecurityStateKey) -> None:
+        fallback = LocalSecurityStateBackend(max_entries=100, rate_divisor=2)
+
+        assert fallback.reserve(state_key, timeout=60) is True
+        assert fallback.exists(state_key, timeout=60) is True
+        assert fallback.reserve(state_key, timeout=60) is False
+        assert fallback.release(state_key, timeout=60) is True
+        assert fallback.reserve(state_key, timeout=60) is True
+
+
+class TestResilientSecurityStateBackend:
+    def test_failure_switches_to_fallback_without_retrying_primary(
+        self,
+        backend: ResilientSecurityStateBackend,
+        primary: _UnavailableBackend,
+        state_key: SecurityStateKey,
+    ) -> None:
+        assert backend.reserve(state_key, timeout=60) is True
+        assert backend.is_degraded is True
+        assert backend.reserve(state_key, timeout=60) is False
+
+        assert primary.calls == 1
+        assert registry.get("contact_form.security_state.degraded") == 1
+        assert registry.get("contact_form.security_state.failures", exception_type="ConnectionError") == 1
+        assert registry.get("contact_form.security_state.degraded_operations", operation="reserve") == 2
+
+    def test_probe_restores_primary(
+        self,
+        backend: ResilientSecurityStateBackend,
+        primary: _UnavailableBackend,
+        state_key: SecurityStateKey,
+    ) -> None:
+        backend.increment(state_key, timeout=60)
+
+        assert backend.probe() is False
+        assert backend.is_degraded is True
+
+        primary.available = True
+        assert backend.probe() is True
+        assert backend.is_degraded is False
+        assert registry.get("contact_form.security_state.degraded") == 0
+        assert backend.increment(state_key, timeout=60) == 1
+
+    def test_probe_thread_starts_once(self, primary: _UnavailableBackend, state_key: SecurityStateKey) -> None:
+        with patch("contact_form.backends.threading.Thread") as thread_class:
+            thread_class.return_value.is_alive.return_value = True
+            backend = ResilientSecurityStateBackend(
+                primary,
+                fallback=LocalSecurityStateBackend(max_entries=100, rate_divisor=2),
+                probe_interval_seconds=60,
+            )
+            backend.increment(state_key, timeout=60)
+            backend.probe()
+            backend._enter_degraded_mode(ConnectionError())
+
+        thread_class.assert_called_once()
+        thread_class.return_value.start.assert_called_once()
+
+    def test_metrics_are_published_as_signals(
+        self,
+        backend: ResilientSecurityStateBackend,
+        state_key: SecurityStateKey,
+    ) -> None:
+        received: list[dict[str, Any]] = []
+
+        def receiver(**kwargs: Any) -> None:
+            received.append(kwargs)
+
+        security_metric.connect(receiver)
+        try:
+            backend.exists(state_key, timeout=60)
+        finally:
+            security_metric.disconnect(receiver)
+
+        assert {(metric["name"], metric["kind"]) for metric in received} == {
+            ("contact_form.security_state.failures", "counter"),
+            ("contact_form.security_state.degraded", "gauge"),
+            ("contact_form.security_state.degraded_operations", "counter"),
+        }
+
+
+@pytest.mark.django_db
+class TestDegradedModeSettings:
+    def test_disabled_by_default(self) -> None:
+        assert not isinstance(get_security_state_backend(), ResilientSecurityStateBackend)
+
+    def test_security_functions_stay_available_during_outage(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SECURITY_DEGRADED_MODE = True
+        settings.CONTACT_FORM_LOCAL_VERDICT_CACHE_SIZE = 0
+        page = MagicMock(translation_key=uuid.uuid4())
+
+        with (
+            patch("django.core.cache.cache.add", side_effect=ConnectionError),
+            patch("contact_form.backends.threading.Thread"),
+        ):
+            assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+            assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is False
+            decisions = [
+                acquire_security_window(
+                    kind=str(SecurityEventKind.POST_RATE_LIMIT),
+                    scope_hash="b" * 64,
+                    fingerprint="client",
+                    duration=timedelta(seconds=600),
+                    limit=4,
+                ).allowed
+                for _attempt in range(3)
+            ]
+
+        assert decisions == [True, True, False]
+        assert get_security_state_backend().is_degraded is True
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import ipaddress
+import random
+import threading
+from io import StringIO
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from wagtail.models import Site
+
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.ip_blocklist import IPBlocklist
+from contact_form.ip_blocklist import IPBlocklistError
+from contact_form.ip_blocklist import clear_ip_blocklist
+from contact_form.ip_blocklist import compile_ip_blocklist
+from contact_form.ip_blocklist import get_ip_blocklist
+from contact_form.ip_blocklist import parse_networks
+from contact_form.ip_blocklist import write_ip_blocklist
+from contact_form.metrics import registry
+from contact_form.models import ContactPage
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+from contact_form.tests.unit.test_contact_page import securely_post_form
+
+NETWORKS = [
+    "192.0.2.0/24",
+    "192.0.2.128/25",
+    "198.51.100.7",
+    "2001:db8:abcd::/48",
+]
+
+
+def open_blocklist(tmp_path: Path, networks: list[str]) -> IPBlocklist:
+    path = tmp_path / "blocklist.bin"
+    write_ip_blocklist(str(path), [ipaddress.ip_network(network) for network in networks])
+    return IPBlocklist.open(str(path))
+
+
+@pytest.fixture(autouse=True)
+def clear_blocklist() -> None:
+    clear_ip_blocklist()
+
+
+class TestIPBlocklist:
+    @pytest.mark.parametrize(
+        ("address", "is_blocked"),
+        [
+            ("192.0.2.1", True),
+            ("192.0.2.255", True),
+            ("192.0.3.0", False),
+            ("198.51.100.7", True),
+            ("198.51.100.8", False),
+            ("::ffff:192.0.2.9", True),
+            ("2001:db8:abcd:12::1", True),
+            ("2001:db8:abce::1", False),
+            ("not-an-address", False),
+        ],
+    )
+    def test_lookups_follow_the_prefix_trie(self, tmp_path: Path, address: str, is_blocked: bool) -> None:
+        blocklist = open_blocklist(tmp_path, NETWORKS)
+
+        assert blocklist.contains(address) is is_blocked
+        assert len(blocklist) == 3
+
+    def test_lookups_agree_with_ipaddress(self, tmp_path: Path) -> None:
+        generator = random.Random(3)
+        networks = [
+            ipaddress.ip_network((generator.getrandbits(32), generator.randint(8, 32)), strict=False)
+            for _index in range(200)
+        ]
+        blocklist = open_blocklist(tmp_path, [str(network) for network in networks])
+
+        for _attempt in range(2000):
+            address = ipaddress.ip_address(generator.getrandbits(32))
+            assert blocklist.contains(str(address)) is any(address in network for network in networks)
+
+    def test_generators_keep_both_address_families(self, tmp_path: Path) -> None:
+        path = tmp_path / "blocklist.bin"
+        write_ip_blocklist(str(path), (ipaddress.ip_network(network) for network in NETWORKS))
+        blocklist = IPBlocklist.open(str(path))
+
+        assert blocklist.contains("192.0.2.1")
+        assert blocklist.contains("2001:db8:abcd::1")
+
+    def test_corrupt_files_are_rejected(self, tmp_path: Path) -> None:
+        data = compile_ip_blocklist([ipaddress.ip_network("192.0.2.0/24")])
+        truncated, foreign = tmp_path / "truncated.bin", tmp_path / "foreign.bin"
+        truncated.write_bytes(data[:-1])
+        foreign.write_bytes(b"XXXX" + data[4:])
+
+        for path in (truncated, foreign):
+            with pytest.raises(IPBlocklistError):
+                IPBlocklist.open(str(path))
+
+    def test_parse_networks_reports_invalid_lines(self) -> None:
+        networks, invalid_lines = parse_networks(["# abusive hosts", "192.0.2.0/24  # spam", "", "999.1.1.1"])
+
+        assert networks == [ipaddress.ip_network("192.0.2.0/24")]
+        assert invalid_lines == [(4, "999.1.1.1")]
+
+
+class TestIPBlocklistRuntime:
+    def test_replaced_files_are_remapped(self, settings: Any, tmp_path: Path) -> None:
+        path = tmp_path / "blocklist.bin"
+        settings.CONTACT_FORM_IP_BLOCKLIST_PATH = str(path)
+        assert get_ip_blocklist() is None
+
+        write_ip_blocklist(str(path), [ipaddress.ip_network("192.0.2.0/24")])
+        first = get_ip_blocklist()
+        assert first is not None and get_ip_blocklist() is first
+
+        write_ip_blocklist(str(path), [ipaddress.ip_network("198.51.100.0/24")])
+        second = get_ip_blocklist()
+
+        assert second is not first
+        assert second.contains("198.51.100.1") and not second.contains("192.0.2.1")
+        assert first.contains("192.0.2.1")
+
+    def test_concurrent_reloads_map_the_file_once(self, settings: Any, tmp_path: Path) -> None:
+        path = tmp_path / "blocklist.bin"
+        settings.CONTACT_FORM_IP_BLOCKLIST_PATH = str(path)
+        write_ip_blocklist(str(path), [ipaddress.ip_network("192.0.2.0/24")])
+        barrier = threading.Barrier(4)
+        loaded: list[IPBlocklist | None] = []
+
+        def load() -> None:
+            barrier.wait(timeout=5)
+            loaded.append(get_ip_blocklist())
+
+        with patch("contact_form.ip_blocklist.IPBlocklist.open", wraps=IPBlocklist.open) as open_blocklist:
+            threads = [threading.Thread(target=load) for _index in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+
+        assert open_blocklist.call_count == 1
+        assert len({id(blocklist) for blocklist in loaded}) == 1
+
+    def test_compile_command_writes_the_configured_path(self, settings: Any, tmp_path: Path) -> None:
+        source = tmp_path / "networks.txt"
+        source.write_text("192.0.2.0/24\n192.0.2.0/25\nbogus\n", encoding="utf-8")
+        settings.CONTACT_FORM_IP_BLOCKLIST_PATH = str(tmp_path / "blocklist.bin")
+        stdout, stderr = StringIO(), StringIO()
+
+        call_command("compile_contact_form_ip_blocklist", str(source), stdout=stdout, stderr=stderr)
+
+        assert "Compiled 2 entries into 1 networks" in stdout.getvalue()
+        assert "networks.txt:3" in stderr.getvalue()
+        assert get_ip_blocklist().contains("192.0.2.200")
+
+    def test_compile_command_requires_an_output(self, tmp_path: Path) -> None:
+        with pytest.raises(CommandError):
+            call_command("compile_contact_form_ip_blocklist", str(tmp_path / "networks.txt"))
+
+    def test_invalid_compiled_file_is_reported(self, settings: Any, tmp_path: Path) -> None:
+        path = tmp_path / "blocklist.txt"
+        path.write_text("192.0.2.0/24\n", encoding="utf-8")
+        settings.CONTACT_FORM_IP_BLOCKLIST_PATH = str(path)
+
+        assert "contact_form.E021" in {message.id for message in check_contact_form_security_settings()}
+
+
+@pytest.mark.django_db
+class TestIPBlocklistStage:
+    def test_blocklisted_networks_are_rejected_first(self, client: Any, settings: Any, tmp_path: Path) -> None:
+        cache.clear()
+        registry.clear()
+        path = tmp_path / "blocklist.bin"
+        write_ip_blocklist(str(path), [ipaddress.ip_network("127.0.0.0/8")])
+        settings.CONTACT_FORM_IP_BLOCKLIST_PATH = str(path)
+        page = ContactPage(
+            title="Contact Us",
+            thank_you_text="Thank you for your submission!",
+            from_address="forms@example.com",
+            to_address="normal@example.com",
+            subject="Contact Form",
+        )
+        Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+        create_standard_fields(page)
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Hello"}
+
+        response, _post_data = securely_post_form(client=client, page=page, data=data)
+
+        assert response.status_code == 403
+        assert registry.get("contact_form.pipeline.rejections", stage="ip_blocklist", reason="ip-blocklisted") == 1
+        assert registry.get("contact_form.pipeline.stage_calls", stage="token") == 0
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.load_shedding import SubmissionOverloaded
+from contact_form.load_shedding import clear_submission_semaphores
+from contact_form.load_shedding import shed_submission_load
+from contact_form.metrics import registry
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import SecurityStateUnavailable
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_clearance import create_turnstile_page
+from contact_form.tests.unit.test_clearance import submit
+from contact_form.tests.unit.test_contact_page import securely_post_form
+from contact_form.turnstile import TurnstileField
+
+
+@pytest.fixture(autouse=True)
+def clear_state() -> None:
+    cache.clear()
+    registry.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+    clear_submission_semaphores()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    CaptchaSettings.objects.update_or_create(
+        defaults={
+            "turnstile_site_key": "configured-site-key",
+            "turnstile_secret_key": "configured-secret-key",
+        }
+    )
+    return create_turnstile_page("Contact Us")
+
+
+@pytest.fixture
+def verifier() -> Any:
+    with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+        yield verifier
+
+
+@pytest.mark.django_db
+class TestSubmissionBudget:
+    def test_load_shedding_is_disabled_by_default(self, contact_page: ContactPage) -> None:
+        assert contact_page.submission_budget == 0
+        assert contact_page.max_concurrent_submissions == 0
+
+    def test_exhausted_budget_returns_503_before_verification(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        contact_page.submission_budget = 2
+        contact_page.save()
+
+        responses = [submit(client, contact_page, f"Message {index}") for index in range(3)]
+
+        assert [response.status_code for response in responses] == [200, 200, 503]
+        assert 1 <= int(responses[2]["Retry-After"]) <= 60
+        assert verifier.call_count == 2
+        assert contact_page.get_submission_class().objects.filter(page=contact_page).count() == 2
+        assert registry.get("contact_form.load_shedding.rejections", reason="budget") == 1
+
+    def test_exhausted_budget_is_shed_before_verification(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        contact_page.submission_budget = 2
+        contact_page.save()
+        for index in range(3):
+            submit(client, contact_page, f"Message {index}")
+        verifier.reset_mock()
+
+        response = submit(client, contact_page, "Message 3")
+
+        assert response.status_code == 503
+        assert "Retry-After" in response
+        verifier.assert_not_called()
+
+    def test_replayed_tokens_do_not_consume_the_budget(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        contact_page.submission_budget = 2
+        contact_page.save()
+        now = time.time()
+        _response, post_data = securely_post_form(
+            client=client,
+            page=contact_page,
+            data={"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Message"},
+            issued_at=now - 10,
+            submitted_at=now,
+        )
+
+        replays = [client.post(contact_page.url, post_data) for _attempt in range(3)]
+
+        assert [response.status_code for response in replays] == [200, 200, 200]
+        assert registry.get("contact_form.load_shedding.rejections", reason="budget") == 0
+        assert submit(client, contact_page, "Fresh message").status_code == 200
+        assert contact_page.get_submission_class().objects.filter(page=contact_page).count() == 2
+
+    def test_budget_is_shared_by_all_clients(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        contact_page.submission_budget = 2
+        contact_page.save()
+
+        statuses = []
+        for index in range(3):
+            client.defaults["REMOTE_ADDR"] = f"198.51.100.{index + 1}"
+            statuses.append(submit(client, contact_page, f"Message {index}").status_code)
+
+        assert statuses == [200, 200, 503]
+
+    def test_zero_budget_disables_the_limit(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        contact_page.submission_budget = 0
+        contact_page.save()
+
+        assert all(submit(client, contact_page, f"Message {index}").status_code == 200 for index in range(3))
+
+    def test_unavailable_state_fails_open(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        contact_page.submission_budget = 2
+        contact_page.save()
+
+        with patch(
+            "contact_form.load_shedding.acquire_security_window",
+            side_effect=SecurityStateUnavailable("down"),
+        ):
+            response = submit(client, contact_page, "Message")
+
+        assert b"Thank you for your submission!" in response.content
+
+
+@pytest.mark.django_db
+class TestConcurrencyCap:
+    def test_saturated_process_returns_503(
+        self,
+        settings: Any,
+        client: Any,
+        contact_page: ContactPage,
+        verifier: Any,
+    ) -> None:
+        settings.CONTACT_FORM_OVERLOAD_RETRY_AFTER_SECONDS = 7
+        contact_page.max_concurrent_submissions = 1
+        contact_page.save()
+
+        with shed_submission_load(contact_page):
+            response = submit(client, contact_page, "Message")
+
+        assert response.status_code == 503
+        assert response["Retry-After"] == "7"
+        assert registry.get("contact_form.load_shedding.rejections", reason="concurrency") == 1
+        assert submit(client, contact_page, "Message").status_code == 200
+
+    def test_slot_is_released_when_processing_fails(self, contact_page: ContactPage) -> None:
+        contact_page.max_concurrent_submissions = 1
+
+        with pytest.raises(RuntimeError):
+            with shed_submission_load(contact_page):
+                raise RuntimeError
+
+        with shed_submission_load(contact_page):
+            pass
+
+    def test_capacity_changes_take_effect(self, contact_page: ContactPage) -> None:
+        contact_page.max_concurrent_submissions = 1
+        with shed_submission_load(contact_page):
+            with pytest.raises(SubmissionOverloaded):
+                with shed_submission_load(contact_page):
+                    pass
+
+            contact_page.max_concurrent_submissions = 2
+            with shed_submission_load(contact_page):
+                pass
+
+    def test_zero_capacity_disables_the_cap(self, contact_page: ContactPage) -> None:
+        contact_page.max_concurrent_submissions = 0
+
+        with shed_submission_load(contact_page), shed_submission_load(contact_page):
+            pass
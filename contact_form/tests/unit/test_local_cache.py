@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import uuid
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.local_cache import LocalTTLCache
+from contact_form.security import SecurityEventKind
+from contact_form.security import SecurityStateUnavailable
+from contact_form.security import _nonce_reservation_key
+from contact_form.security import acquire_security_window
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import is_submission_nonce_used
+from contact_form.security import release_submission_nonce
+from contact_form.security import reserve_submission_nonce
+
+
+class TestLocalTTLCache:
+    def test_evicts_least_recently_used_entry(self) -> None:
+        local_cache = LocalTTLCache(max_entries=2)
+        local_cache.set("a", 1, timeout=60)
+        local_cache.set("b", 2, timeout=60)
+        local_cache.get("a")
+        local_cache.set("c", 3, timeout=60)
+
+        assert local_cache.get("a") == 1
+        assert local_cache.get("b") is None
+        assert local_cache.get("c") == 3
+
+    def test_entries_expire_after_timeout(self) -> None:
+        local_cache = LocalTTLCache(max_entries=2)
+        with patch("contact_form.local_cache.time.monotonic", return_value=100.0):
+            local_cache.set("a", 1, timeout=5)
+        with patch("contact_form.local_cache.time.monotonic", return_value=104.0):
+            assert local_cache.get("a") == 1
+            assert local_cache.remaining_seconds("a") == 1.0
+        with patch("contact_form.local_cache.time.monotonic", return_value=105.0):
+            assert local_cache.get("a") is None
+        assert len(local_cache) == 0
+
+
+@pytest.mark.django_db
+class TestLocalVerdicts:
+    @pytest.fixture(autouse=True)
+    def clear_caches(self) -> None:
+        cache.clear()
+        get_local_verdict_cache().clear()
+
+    @pytest.fixture
+    def page(self) -> MagicMock:
+        return MagicMock(translation_key=uuid.uuid4())
+
+    def _acquire(self, scope_hash: str) -> Any:
+        return acquire_security_window(
+            kind=str(SecurityEventKind.POST_RATE_LIMIT),
+            scope_hash=scope_hash,
+            fingerprint="client",
+            duration=timedelta(seconds=600),
+            limit=2,
+        )
+
+    def test_limited_verdict_skips_shared_cache(self) -> None:
+        scope_hash = uuid.uuid4().hex
+        assert self._acquire(scope_hash).allowed is True
+        assert self._acquire(scope_hash).allowed is True
+        assert self._acquire(scope_hash).allowed is False
+
+        with patch("django.core.cache.cache.add", side_effect=AssertionError) as shared_add:
+            decision = self._acquire(scope_hash)
+
+        assert decision.allowed is False
+        assert decision.retry_after_seconds > 0
+        shared_add.assert_not_called()
+
+    def test_local_and_shared_verdicts_count_the_same_way(self) -> None:
+        scope_hash = uuid.uuid4().hex
+        shared_counts = [self._acquire(scope_hash).previous_count for _attempt in range(3)]
+
+        local_counts = [self._acquire(scope_hash).previous_count for _attempt in range(2)]
+
+        assert shared_counts + local_counts == [0, 1, 2, 3, 4]
+
+    def test_allowed_verdicts_are_not_cached(self) -> None:
+        scope_hash = uuid.uuid4().hex
+        self._acquire(scope_hash)
+
+        with patch("django.core.cache.cache.add", side_effect=RuntimeError):
+            with pytest.raises(SecurityStateUnavailable):
+                self._acquire(scope_hash)
+
+    def test_used_nonce_verdict_is_cached_until_released(self, page: MagicMock) -> None:
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+
+        with patch("django.core.cache.cache.get", side_effect=AssertionError):
+            assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+
+        release_submission_nonce(page=page, nonce_hash="nonce")
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is False
+
+    def test_used_nonce_verdict_expires_with_the_token(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_TOKEN_MAX_AGE_SECONDS = 600
+        with patch("contact_form.security.time.time", return_value=10_000):
+            reserve_submission_nonce(page=page, nonce_hash="nonce", issued_at=9_500)
+            assert reserve_submission_nonce(page=page, nonce_hash="nonce", issued_at=9_500).allowed is False
+
+        key = _nonce_reservation_key(page=page, nonce_hash="nonce")
+        assert 0 < get_local_verdict_cache().remaining_seconds(key) <= 100
+
+    def test_local_verdicts_can_be_disabled(self, settings: Any) -> None:
+        settings.CONTACT_FORM_LOCAL_VERDICT_CACHE_SIZE = 0
+
+        assert get_local_verdict_cache() is None
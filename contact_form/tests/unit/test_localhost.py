@@ -38,11 +38,8 @@ class TestLocalhostDetection:
         assert is_localhost(host="gphnetwork.org") is False
 
     def test_request_host_detection(self) -> None:
-        request = MagicMock()
-        request.get_host.return_value = "localhost:8000"
-        assert is_localhost(request=request) is True
-        request.get_host.return_value = "example.com"
-        assert is_localhost(request=request) is False
+        assert is_localhost(request=MagicMock(**{"get_host.return_value": "localhost:8000"})) is True
+        assert is_localhost(request=MagicMock(**{"get_host.return_value": "example.com"})) is False
 
     def test_empty_host_returns_false(self) -> None:
         assert is_localhost(host="") is False
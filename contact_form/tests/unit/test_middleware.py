@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from wagtail.models import Site
+
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.metrics import registry
+from contact_form.middleware import clear_contact_page_routes
+from contact_form.middleware import find_contact_page_route
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+from contact_form.tests.unit.test_contact_page import securely_post_form
+
+FAST_REJECT_MIDDLEWARE = "contact_form.middleware.ContactFormFastRejectMiddleware"
+
+
+@pytest.fixture(autouse=True)
+def fast_reject_settings(settings: Any) -> None:
+    settings.MIDDLEWARE = [FAST_REJECT_MIDDLEWARE, *settings.MIDDLEWARE]
+    cache.clear()
+    registry.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+    clear_contact_page_routes()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    page = ContactPage(
+        title="Contact Us",
+        thank_you_text="Thank you for your submission!",
+        from_address="forms@example.com",
+        to_address="normal@example.com",
+        subject="Contact Form",
+        max_submission_bytes=2048,
+    )
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    create_standard_fields(page)
+    return page
+
+
+@pytest.mark.django_db
+class TestFastRejectMiddleware:
+    def test_oversized_bodies_are_rejected_before_the_page_is_served(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+    ) -> None:
+        with patch.object(ContactPage, "serve") as serve:
+            response = client.post(contact_page.url, {"message": "x" * 4096})
+
+        assert response.status_code == 413
+        assert "no-store" in response["Cache-Control"]
+        serve.assert_not_called()
+        assert registry.get("contact_form.fast_reject.rejections", reason="body-too-large") == 1
+
+    def test_rate_limited_clients_are_rejected_before_the_page_is_served(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_POST_LIMIT = 1
+        client.post(contact_page.url, {"_contact_form_token": "invalid"})
+
+        with patch.object(ContactPage, "serve") as serve:
+            response = client.post(contact_page.url, {"_contact_form_token": "invalid"})
+
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+        serve.assert_not_called()
+
+    def test_rate_decision_is_reused_by_the_page(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_POST_LIMIT = 2
+        incomplete_data = {"full_name": "John Doe"}
+
+        responses = [
+            securely_post_form(client=client, page=contact_page, data=incomplete_data)[0] for _attempt in range(2)
+        ]
+
+        assert [response.status_code for response in responses] == [200, 200]
+
+    def test_other_requests_pass_through(self, client: Any, contact_page: ContactPage) -> None:
+        with patch("contact_form.security.consume_post_rate_limit") as consume:
+            assert client.get(contact_page.url).status_code == 200
+            assert client.post("/missing/", {"message": "x" * 4096}).status_code == 404
+
+        consume.assert_not_called()
+
+    def test_routes_follow_publishing(self, rf: Any, contact_page: ContactPage) -> None:
+        old_path = contact_page.url
+        assert find_contact_page_route(rf.post(old_path)).page_id == contact_page.pk
+
+        contact_page.slug = "write-to-us"
+        contact_page.save_revision().publish()
+
+        assert find_contact_page_route(rf.post(old_path)) is None
+        assert find_contact_page_route(rf.post("/write-to-us/")).page_id == contact_page.pk
+
+        contact_page.unpublish()
+
+        assert find_contact_page_route(rf.post("/write-to-us/")) is None
+
+    def test_middleware_order_is_checked(self, settings: Any) -> None:
+        assert "contact_form.W005" not in {message.id for message in check_contact_form_security_settings()}
+
+        settings.MIDDLEWARE = [*settings.MIDDLEWARE[1:], FAST_REJECT_MIDDLEWARE]
+
+        assert "contact_form.W005" in {message.id for message in check_contact_form_security_settings()}
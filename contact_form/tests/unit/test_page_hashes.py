@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterator
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.page_hashes import PageHashSecurityState
+from contact_form.page_hashes import get_page_hash_state
+from contact_form.security import SecurityStateKey
+from contact_form.security import acquire_security_window
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import is_submission_nonce_used
+from contact_form.security import release_submission_nonce
+from contact_form.security import reserve_submission_nonce
+
+
+class _FakeRedisPipeline:
+    def __init__(self, client: _FakeRedisClient) -> None:
+        self.client = client
+        self.commands: list[tuple[str, tuple[Any, ...]]] = []
+
+    def hincrby(self, key: str, field: bytes, amount: int) -> None:
+        self.commands.append(("hincrby", (key, field, amount)))
+
+    def hget(self, key: str, field: bytes) -> None:
+        self.commands.append(("hget", (key, field)))
+
+    def hdel(self, key: str, field: bytes) -> None:
+        self.commands.append(("hdel", (key, field)))
+
+    def expire(self, key: str, timeout: int) -> None:
+        self.commands.append(("expire", (key, timeout)))
+
+    def execute(self) -> list[Any]:
+        return [getattr(self.client, command)(*arguments) for command, arguments in self.commands]
+
+
+class _FakeRedisClient:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[bytes, Any]] = {}
+
+    def pipeline(self, transaction: bool = True) -> _FakeRedisPipeline:
+        return _FakeRedisPipeline(self)
+
+    def hincrby(self, key: str, field: bytes, amount: int) -> int:
+        values = self.hashes.setdefault(key, {})
+        values[field] = int(values.get(field, 0)) + amount
+        return values[field]
+
+    def hget(self, key: str, field: bytes) -> Any:
+        return self.hashes.get(key, {}).get(field)
+
+    def hdel(self, key: str, field: bytes) -> int:
+        return int(self.hashes.get(key, {}).pop(field, None) is not None)
+
+    def expire(self, key: str, timeout: int) -> bool:
+        return True
+
+    def register_script(self, script: str) -> Any:
+        def run(keys: list[str], args: list[Any], client: _FakeRedisClient) -> int:
+            field, now, expires_at, _timeout = args
+            if any(int(client.hget(key, field) or 0) > now for key in keys):
+                return 0
+            client.hashes.setdefault(keys[0], {})[field] = expires_at
+            return 1
+
+        return run
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+
+
+@pytest.fixture
+def redis_client() -> Iterator[_FakeRedisClient]:
+    client = _FakeRedisClient()
+    with (
+        patch("contact_form.page_hashes.get_redis_client", return_value=client),
+        patch("contact_form.replay.get_redis_client", return_value=None),
+    ):
+        yield client
+
+
+@pytest.fixture
+def page() -> MagicMock:
+    return MagicMock(translation_key=uuid.uuid4())
+
+
+class TestPageHashSecurityState:
+    def test_counters_share_sharded_page_hashes(self, redis_client: _FakeRedisClient) -> None:
+        state = PageHashSecurityState(shards=4)
+        scope_hash = "0123456789abcdef" + "0" * 48
+
+        for index in range(50):
+            assert state.increment(
+                kind="post_rate_limit",
+                scope_hash=scope_hash,
+                fingerprint=f"client-{index}",
+                bucket=1,
+                timeout=60,
+            ) == 1
+
+        assert len(redis_client.hashes) <= 4
+        assert sum(len(values) for values in redis_client.hashes.values()) == 50
+        assert all("{0123456789abcdef}" in key for key in redis_client.hashes)
+
+    def test_batched_increments_share_one_pipeline(self, redis_client: _FakeRedisClient) -> None:
+        state = PageHashSecurityState(shards=4)
+        keys = [
+            SecurityStateKey(kind="near_duplicate", scope_hash="a" * 64, fingerprint=f"band-{index}", bucket=1)
+            for index in range(3)
+        ]
+
+        with patch.object(redis_client, "pipeline", wraps=redis_client.pipeline) as pipeline:
+            assert state.increment_many([*keys, keys[0]], timeout=60) == [1, 1, 1, 2]
+
+        assert pipeline.call_count == 1
+
+    def test_reservations_survive_an_epoch_boundary(self, redis_client: _FakeRedisClient) -> None:
+        state = PageHashSecurityState(shards=4)
+        arguments = {"kind": "submission_nonce", "scope_hash": "a" * 64, "fingerprint": "nonce"}
+
+        with patch("contact_form.page_hashes.time.time", return_value=7_199):
+            assert state.reserve(duration_seconds=7200, **arguments) is True
+        with patch("contact_form.page_hashes.time.time", return_value=7_300):
+            assert state.exists(duration_seconds=7200, **arguments) is True
+            assert state.reserve(duration_seconds=7200, **arguments) is False
+        with patch("contact_form.page_hashes.time.time", return_value=14_400):
+            assert state.exists(duration_seconds=7200, **arguments) is False
+
+
+@pytest.mark.django_db
+class TestPageHashLayoutIntegration:
+    def test_falls_back_to_per_key_layout_without_redis(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_SECURITY_KEY_LAYOUT = "page-hashes"
+
+        assert get_page_hash_state() is None
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+
+    def test_security_functions_use_page_hashes(
+        self,
+        settings: Any,
+        page: MagicMock,
+        redis_client: _FakeRedisClient,
+    ) -> None:
+        settings.CONTACT_FORM_SECURITY_KEY_LAYOUT = "page-hashes"
+
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+        assert release_submission_nonce(page=page, nonce_hash="nonce") is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is False
+
+        decisions = [
+            acquire_security_window(
+                kind="post_rate_limit",
+                scope_hash="b" * 64,
+                fingerprint="client",
+                duration=timedelta(seconds=60),
+                limit=2,
+            )
+            for _attempt in range(3)
+        ]
+
+        assert [decision.allowed for decision in decisions] == [True, True, False]
+        assert len(redis_client.hashes) == 2
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from contact_form.middleware import clear_contact_page_routes
+from contact_form.middleware import find_contact_page_route
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import PageSecurityConfig
+from contact_form.security import SecurityWindowDecision
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import get_page_security_config
+from contact_form.security import reserve_duplicate_submission
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_clearance import create_turnstile_page
+from contact_form.tests.unit.test_clearance import submit
+from contact_form.turnstile import TurnstileField
+
+
+@pytest.fixture(autouse=True)
+def clear_state() -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+    clear_contact_page_routes()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    CaptchaSettings.objects.update_or_create(
+        defaults={
+            "turnstile_site_key": "configured-site-key",
+            "turnstile_secret_key": "configured-secret-key",
+        }
+    )
+    return create_turnstile_page("Contact Us")
+
+
+@pytest.fixture
+def verifier() -> Any:
+    with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+        yield verifier
+
+
+class TestPageSecurityConfig:
+    def test_blank_overrides_fall_back_to_settings(self, settings: Any) -> None:
+        settings.CONTACT_FORM_POST_LIMIT = 7
+        settings.CONTACT_FORM_MINIMUM_COMPLETION_SECONDS = 4
+        config = PageSecurityConfig(post_window_seconds=30)
+
+        assert config.get_post_limit() == 7
+        assert config.get_post_window_seconds() == 30
+        assert config.get_minimum_completion_seconds() == 4
+        assert config.get_duplicate_window_seconds() == 600
+
+    def test_pages_without_a_config_use_settings(self) -> None:
+        assert get_page_security_config(MagicMock()) == PageSecurityConfig()
+        assert get_page_security_config(object()) == PageSecurityConfig()
+
+    @pytest.mark.django_db
+    def test_config_is_resolved_once_per_page_instance(
+        self,
+        contact_page: ContactPage,
+        django_assert_num_queries: Any,
+    ) -> None:
+        contact_page.post_limit = 2
+        contact_page.minimum_completion_seconds = 0
+
+        with django_assert_num_queries(0):
+            config = get_page_security_config(contact_page)
+
+        assert config == PageSecurityConfig(post_limit=2)
+        assert get_page_security_config(contact_page) is config
+
+    @pytest.mark.django_db
+    def test_minimum_completion_must_be_shorter_than_the_token_lifetime(
+        self,
+        settings: Any,
+        contact_page: ContactPage,
+    ) -> None:
+        settings.CONTACT_FORM_TOKEN_MAX_AGE_SECONDS = 60
+        contact_page.minimum_completion_seconds = 60
+
+        with pytest.raises(ValidationError) as exc_info:
+            contact_page.clean()
+
+        assert "minimum_completion_seconds" in exc_info.value.message_dict
+
+
+@pytest.mark.django_db
+class TestPageOverrides:
+    def test_post_limit_override(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        contact_page.post_limit = 1
+        contact_page.post_window_seconds = 90
+        contact_page.save()
+
+        first = submit(client, contact_page, "First")
+        second = submit(client, contact_page, "Second")
+
+        assert first.status_code == 200
+        assert second.status_code == 429
+        assert 1 <= int(second["Retry-After"]) <= 90
+
+    def test_minimum_completion_override(self, client: Any, contact_page: ContactPage, verifier: Any) -> None:
+        contact_page.minimum_completion_seconds = 30
+        contact_page.save()
+
+        response = submit(client, contact_page, "Too quick")
+
+        assert response.status_code == 400
+        verifier.assert_not_called()
+
+    def test_duplicate_window_override(self, contact_page: ContactPage) -> None:
+        contact_page.duplicate_window_seconds = 45
+        decision = SecurityWindowDecision(allowed=True, retry_after_seconds=0, previous_count=0)
+
+        with patch("contact_form.security._reserve_once", return_value=decision) as reserve_once:
+            reserve_duplicate_submission(page=contact_page, submission_fingerprint="fingerprint")
+
+        assert reserve_once.call_args.kwargs["duration_seconds"] == 45
+
+    def test_fast_reject_routes_carry_the_overrides(self, rf: Any, contact_page: ContactPage) -> None:
+        contact_page.post_limit = 3
+        contact_page.save_revision().publish()
+
+        route = find_contact_page_route(rf.post(contact_page.url))
+
+        assert route is not None
+        assert route.security_config.get_post_limit() == 3
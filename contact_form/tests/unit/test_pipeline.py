@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import threading
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from wagtail.models import Site
+
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.metrics import registry
+from contact_form.models import CaptchaProvider
+from contact_form.models import ContactPage
+from contact_form.pipeline import STAGE_COST_CACHE
+from contact_form.pipeline import SecurityStage
+from contact_form.pipeline import StageRejection
+from contact_form.pipeline import SubmissionContext
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+from contact_form.tests.unit.test_contact_page import securely_post_form
+from contact_form.turnstile import TurnstileField
+
+DEFAULT_STAGES = [
+    "contact_form.pipeline.IPBlocklistStage",
+    "contact_form.pipeline.TokenStage",
+    "contact_form.pipeline.HoneypotStage",
+    "contact_form.pipeline.ScoringStage",
+    "contact_form.pipeline.CaptchaPostStage",
+    "contact_form.pipeline.AdaptiveStage",
+    "contact_form.pipeline.RateLimitStage",
+    "contact_form.pipeline.NonceStage",
+    "contact_form.pipeline.SubmissionBudgetStage",
+    "contact_form.pipeline.TurnstilePrefetchStage",
+]
+
+
+class BlockedWordStage(SecurityStage):
+    name = "blocked_word"
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        if "casino" in submission.request.POST.get("message", ""):
+            return StageRejection(reason="blocked-word", status=403, message="Blocked.")
+        return None
+
+
+class LookupStage(SecurityStage):
+    cost = STAGE_COST_CACHE
+
+    def check(self, submission: SubmissionContext) -> StageRejection | None:
+        return None
+
+
+@pytest.fixture(autouse=True)
+def clear_state() -> None:
+    cache.clear()
+    registry.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    page = ContactPage(
+        title="Contact Us",
+        thank_you_text="Thank you for your submission!",
+        from_address="forms@example.com",
+        to_address="normal@example.com",
+        subject="Contact Form",
+    )
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    create_standard_fields(page)
+    return page
+
+
+@pytest.fixture
+def turnstile_page(contact_page: ContactPage, settings: Any) -> ContactPage:
+    settings.CONTACT_FORM_TURNSTILE_PREFETCH = True
+    contact_page.captcha_provider = CaptchaProvider.TURNSTILE
+    contact_page.save(update_fields=("captcha_provider",))
+    CaptchaSettings.objects.update_or_create(
+        defaults={
+            "turnstile_site_key": "configured-site-key",
+            "turnstile_secret_key": "configured-secret-key",
+        }
+    )
+    return contact_page
+
+
+@pytest.mark.django_db
+class TestSecurityPipeline:
+    def test_cpu_checks_reject_before_any_state_io(self, client: Any, contact_page: ContactPage) -> None:
+        with patch("contact_form.backends.get_security_state_backend") as backend:
+            response = client.post(contact_page.url, {"_contact_form_token": "invalid"})
+
+        assert response.status_code == 400
+        backend.assert_not_called()
+        assert registry.get("contact_form.pipeline.rejections", stage="token", reason="invalid-token") == 1
+        assert registry.get("contact_form.pipeline.stage_calls", stage="rate_limit") == 0
+
+    def test_filled_honeypot_is_dropped_without_consuming_the_rate_limit(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_POST_LIMIT = 1
+        data = {"full_name": "Bot", "e_mail_address": "bot@example.com", "message": "Spam"}
+
+        for _attempt in range(3):
+            response, _post_data = securely_post_form(client=client, page=contact_page, data=data, honeypot_value="x")
+            assert response.status_code == 200
+
+        assert registry.get("contact_form.pipeline.rejections", stage="honeypot", reason="honeypot") == 3
+        assert registry.get("contact_form.pipeline.stage_calls", stage="rate_limit") == 0
+
+    def test_stage_timing_is_recorded(self, client: Any, contact_page: ContactPage) -> None:
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Hello"}
+
+        securely_post_form(client=client, page=contact_page, data=data, captcha_token=None)
+
+        for stage in ("token", "honeypot", "rate_limit", "nonce"):
+            assert registry.get("contact_form.pipeline.stage_calls", stage=stage) == 1
+            assert registry.get("contact_form.pipeline.stage_seconds", stage=stage) > 0
+
+    def test_sites_can_insert_their_own_stages(self, client: Any, contact_page: ContactPage, settings: Any) -> None:
+        settings.CONTACT_FORM_SECURITY_STAGES = [
+            *DEFAULT_STAGES[:3],
+            "contact_form.tests.unit.test_pipeline.BlockedWordStage",
+            *DEFAULT_STAGES[3:],
+        ]
+        data = {"full_name": "Bot", "e_mail_address": "bot@example.com", "message": "Visit our casino"}
+
+        response, _post_data = securely_post_form(client=client, page=contact_page, data=data)
+
+        assert response.status_code == 403
+        assert b"Blocked." in response.content
+        assert registry.get("contact_form.pipeline.rejections", stage="blocked_word", reason="blocked-word") == 1
+        assert registry.get("contact_form.pipeline.stage_calls", stage="rate_limit") == 0
+
+
+@pytest.mark.django_db
+class TestTurnstilePrefetch:
+    def test_siteverify_runs_off_the_request_thread(self, client: Any, turnstile_page: ContactPage) -> None:
+        verification_threads: list[bool] = []
+
+        def verify(field: TurnstileField, token: str, **kwargs: Any) -> tuple[bool, str]:
+            verification_threads.append(threading.current_thread() is threading.main_thread())
+            assert kwargs == {"remote_ip": "127.0.0.1", "request": None}
+            return True, ""
+
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Hello"}
+        with patch.object(TurnstileField, "_verify_turnstile", autospec=True, side_effect=verify):
+            response, _post_data = securely_post_form(client=client, page=turnstile_page, data=data)
+
+        assert response.status_code == 200
+        assert b"Thank you for your submission!" in response.content
+        assert verification_threads == [False]
+
+    def test_replayed_nonce_does_not_start_siteverify(self, client: Any, turnstile_page: ContactPage) -> None:
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Hello"}
+        with (
+            patch.object(TurnstileField, "prefetch") as prefetch,
+            patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier,
+            patch("contact_form.security.is_submission_nonce_used", return_value=True),
+        ):
+            response, _post_data = securely_post_form(client=client, page=turnstile_page, data=data)
+
+        assert response.status_code == 200
+        prefetch.assert_not_called()
+        verifier.assert_not_called()
+
+    def test_later_rejection_cancels_the_prefetch(
+        self,
+        client: Any,
+        turnstile_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_SECURITY_STAGES = [
+            *DEFAULT_STAGES,
+            "contact_form.tests.unit.test_pipeline.BlockedWordStage",
+        ]
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Online casino"}
+        with (
+            patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")),
+            patch.object(TurnstileField, "cancel_prefetch", autospec=True) as cancel_prefetch,
+        ):
+            response, _post_data = securely_post_form(client=client, page=turnstile_page, data=data)
+
+        assert response.status_code == 403
+        assert cancel_prefetch.call_count == 1
+
+    def test_prefetch_is_disabled_by_default(self, client: Any, turnstile_page: ContactPage, settings: Any) -> None:
+        settings.CONTACT_FORM_TURNSTILE_PREFETCH = False
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Hello"}
+
+        with patch.object(TurnstileField, "prefetch") as prefetch:
+            securely_post_form(client=client, page=turnstile_page, data=data)
+
+        prefetch.assert_not_called()
+
+
+class TestSecurityStageChecks:
+    def test_default_stages_are_valid(self) -> None:
+        message_ids = {message.id for message in check_contact_form_security_settings()}
+
+        assert not {"contact_form.E016", "contact_form.W004"} & message_ids
+
+    @pytest.mark.parametrize(
+        "stages",
+        [
+            ["contact_form.pipeline.HoneypotStage"],
+            ["contact_form.pipeline.TokenStage", "contact_form.missing.Stage"],
+            ["contact_form.pipeline.TokenStage", "contact_form.pipeline.SubmissionContext"],
+        ],
+    )
+    def test_invalid_stage_lists_are_rejected(self, settings: Any, stages: list[str]) -> None:
+        settings.CONTACT_FORM_SECURITY_STAGES = stages
+
+        assert "contact_form.E016" in {message.id for message in check_contact_form_security_settings()}
+
+    def test_cpu_stage_after_io_stage_is_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SECURITY_STAGES = [
+            "contact_form.tests.unit.test_pipeline.LookupStage",
+            *DEFAULT_STAGES,
+        ]
+
+        warnings = [
+            message for message in check_contact_form_security_settings() if message.id == "contact_form.W004"
+        ]
+
+        assert [warning.msg.split()[3] for warning in warnings] == [
+            "IPBlocklistStage",
+            "TokenStage",
+            "HoneypotStage",
+            "ScoringStage",
+        ]
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import html
+import json
+import re
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from wagtail.models import Site
+
+from contact_form.models import CaptchaProvider
+from contact_form.models import ContactPage
+from contact_form.proof_of_work import ProofOfWorkField
+from contact_form.proof_of_work import _solution_hash
+from contact_form.proof_of_work import clear_recent_posts
+from contact_form.proof_of_work import get_difficulty
+from contact_form.proof_of_work import get_recent_post_rate
+from contact_form.proof_of_work import issue_challenge
+from contact_form.proof_of_work import record_post
+from contact_form.proof_of_work import verify_solution
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+
+CHALLENGE_PATTERN = re.compile(r'data-proof-of-work="([^"]+)"')
+TOKEN_PATTERN = re.compile(r'name="_contact_form_token"\s+value="([^"]+)"')
+
+
+def solve(challenge: str) -> str:
+    parsed = json.loads(challenge)
+    number = next(
+        number
+        for number in range(parsed["max_number"] + 1)
+        if _solution_hash(parsed["salt"], number) == parsed["challenge"]
+    )
+    return json.dumps({"signature": parsed["signature"], "number": number})
+
+
+@pytest.fixture(autouse=True)
+def proof_of_work_settings(settings: Any) -> None:
+    settings.CONTACT_FORM_POW_MAX_NUMBER = 64
+    settings.CONTACT_FORM_POW_MAX_NUMBER_CEILING = 1024
+    cache.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+    clear_recent_posts()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    page = ContactPage(
+        title="Contact Us",
+        thank_you_text="Thank you for your submission!",
+        from_address="forms@example.com",
+        to_address="normal@example.com",
+        subject="Contact Form",
+        captcha_provider=CaptchaProvider.PROOF_OF_WORK,
+    )
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    create_standard_fields(page)
+    return page
+
+
+def post_with_solution(client: Any, page: ContactPage, *, solution: str | None = None) -> Any:
+    now = time.time()
+    with patch("contact_form.security.time.time", return_value=now - 10):
+        page_response = client.get(page.url)
+    post_data = {
+        "full_name": "John Doe",
+        "e_mail_address": "john@example.com",
+        "message": "Hello",
+        "_contact_form_token": page_response.context["form_security_token"],
+        page_response.context["form_honeypot_name"]: "",
+        "wagtailcaptcha": solve(page_response.context["proof_of_work_challenge"]) if solution is None else solution,
+    }
+    return client.post(page.url, post_data)
+
+
+@pytest.mark.django_db
+class TestProofOfWorkVerification:
+    def test_solution_verifies_for_its_own_form_token(self, contact_page: ContactPage) -> None:
+        solution = solve(issue_challenge(page=contact_page, form_token="form-token"))
+
+        assert verify_solution(form_token="form-token", response=solution) is None
+        assert verify_solution(form_token="other-token", response=solution) == "foreign-challenge"
+
+    def test_wrong_and_malformed_solutions_are_rejected(self, contact_page: ContactPage) -> None:
+        challenge = json.loads(issue_challenge(page=contact_page, form_token="form-token"))
+        number = json.loads(solve(json.dumps(challenge)))["number"]
+
+        wrong = json.dumps({"signature": challenge["signature"], "number": (number + 1) % 65})
+        out_of_range = json.dumps({"signature": challenge["signature"], "number": 65})
+        tampered = json.dumps({"signature": challenge["signature"].replace(":64:", ":1:"), "number": number})
+
+        assert verify_solution(form_token="form-token", response=wrong) == "wrong-solution"
+        assert verify_solution(form_token="form-token", response=out_of_range) == "out-of-range"
+        assert verify_solution(form_token="form-token", response=tampered) == "bad-signature"
+        assert verify_solution(form_token="form-token", response="not-json") == "malformed"
+        assert verify_solution(form_token="form-token", response="[]") == "malformed"
+
+    def test_expired_challenges_are_rejected(self, contact_page: ContactPage, settings: Any) -> None:
+        settings.CONTACT_FORM_TOKEN_MAX_AGE_SECONDS = 60
+        solution = solve(issue_challenge(page=contact_page, form_token="form-token"))
+
+        with patch("django.core.signing.time.time", return_value=time.time() + 120):
+            assert verify_solution(form_token="form-token", response=solution) == "expired"
+
+    def test_difficulty_rises_with_recent_posts(self, contact_page: ContactPage, settings: Any) -> None:
+        settings.CONTACT_FORM_POW_RATE_THRESHOLD = 2
+        assert get_difficulty(contact_page) == 64
+
+        for _post in range(5):
+            record_post(contact_page)
+
+        assert get_difficulty(contact_page) == 256
+        assert json.loads(issue_challenge(page=contact_page, form_token="form-token"))["max_number"] == 256
+
+        for _post in range(100):
+            record_post(contact_page)
+
+        assert get_difficulty(contact_page) == 1024
+
+
+@pytest.mark.django_db
+class TestProofOfWorkSubmission:
+    def test_form_renders_the_challenge_and_worker(self, client: Any, contact_page: ContactPage) -> None:
+        response = client.get(contact_page.url)
+
+        assert isinstance(response.context["form"].fields["wagtailcaptcha"], ProofOfWorkField)
+        assert b"data-proof-of-work=" in response.content
+        assert b"contact_form/js/proof_of_work.js" in response.content
+        assert b"contact_form/js/proof_of_work_worker.js" in response.content
+
+    def test_solved_challenge_submits_the_form(self, client: Any, contact_page: ContactPage) -> None:
+        response = post_with_solution(client, contact_page)
+
+        assert response.status_code == 200
+        assert b"Thank you for your submission!" in response.content
+
+    def test_missing_solution_is_rejected(self, client: Any, contact_page: ContactPage) -> None:
+        response = post_with_solution(client, contact_page, solution="")
+
+        assert response.status_code == 200
+        assert b"Thank you for your submission!" not in response.content
+        assert "wagtailcaptcha" in response.context["form"].errors
+
+    def test_posts_with_a_valid_token_count_towards_the_difficulty(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+    ) -> None:
+        client.post(contact_page.url, {"_contact_form_token": "invalid"})
+        with patch("contact_form.proof_of_work.verify_solution") as verify:
+            with patch("contact_form.security.time.time", return_value=time.time() - 10):
+                form_page = client.get(contact_page.url)
+            client.post(
+                contact_page.url,
+                {
+                    "full_name": "John Doe",
+                    "e_mail_address": "not-an-address",
+                    "message": "Hello",
+                    "_contact_form_token": form_page.context["form_security_token"],
+                    form_page.context["form_honeypot_name"]: "",
+                    "wagtailcaptcha": "{}",
+                },
+            )
+
+        verify.assert_not_called()
+        assert get_recent_post_rate(contact_page) == pytest.approx(1, abs=0.1)
+
+    def test_rejection_shell_carries_a_challenge_for_its_fresh_token(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+    ) -> None:
+        client.post(contact_page.url, {"_contact_form_token": "invalid"})
+        content = client.post(contact_page.url, {"_contact_form_token": "invalid"}).content.decode()
+
+        form_token = TOKEN_PATTERN.search(content).group(1)
+        solution = solve(html.unescape(CHALLENGE_PATTERN.search(content).group(1)))
+        assert verify_solution(form_token=form_token, response=solution) is None
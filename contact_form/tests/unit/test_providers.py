@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django import forms
+from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from wagtail.models import Site
+
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.forms import ContactFormBuilder
+from contact_form.models import ContactPage
+from contact_form.providers import CaptchaProviderBackend
+from contact_form.providers import CaptchaSettingsSnapshot
+from contact_form.providers import ProofOfWorkProvider
+from contact_form.providers import ReCaptchaProvider
+from contact_form.providers import TurnstileProvider
+from contact_form.providers import get_captcha_provider
+from contact_form.providers import get_captcha_provider_choices
+from contact_form.recaptcha import ReCaptchaField
+from contact_form.transport import TransportResponse
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+
+HCAPTCHA_PROVIDER = "contact_form.tests.unit.test_providers.HCaptchaProvider"
+
+
+class HCaptchaField(forms.CharField):
+    def __init__(self, *, site_key: str, secret_key: str) -> None:
+        super().__init__(label="", widget=forms.HiddenInput())
+        self.site_key = site_key
+        self.secret_key = secret_key
+
+
+class HCaptchaProvider(CaptchaProviderBackend):
+    slug = "hcaptcha"
+    label = "hCaptcha"
+    script_template = "contact_form/includes/hcaptcha_scripts.html"
+
+    def get_settings_snapshot(self, *, captcha_settings: Any | None, request: Any) -> CaptchaSettingsSnapshot:
+        return CaptchaSettingsSnapshot(site_key="hcaptcha-site-key", secret_key="hcaptcha-secret-key")
+
+    def build_field(self, *, snapshot: CaptchaSettingsSnapshot, page: Any, request: Any) -> forms.Field:
+        return HCaptchaField(site_key=snapshot.site_key, secret_key=snapshot.secret_key)
+
+    def get_context(self, *, page: Any, request: Any, form_token: str) -> dict[str, Any]:
+        return {"hcaptcha_form_token": form_token}
+
+
+@pytest.fixture
+def hcaptcha(settings: Any) -> None:
+    settings.CONTACT_FORM_CAPTCHA_PROVIDERS = {"hcaptcha": HCAPTCHA_PROVIDER}
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    cache.clear()
+    page = ContactPage(
+        title="Contact Us",
+        thank_you_text="Thank you for your submission!",
+        from_address="forms@example.com",
+        to_address="normal@example.com",
+        subject="Contact Form",
+    )
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    create_standard_fields(page)
+    return page
+
+
+class TestCaptchaProviderRegistry:
+    def test_builtin_providers_are_registered(self) -> None:
+        assert isinstance(get_captcha_provider("recaptcha"), ReCaptchaProvider)
+        assert isinstance(get_captcha_provider("turnstile"), TurnstileProvider)
+        assert isinstance(get_captcha_provider("proof_of_work"), ProofOfWorkProvider)
+        assert get_captcha_provider_choices() == [
+            ("recaptcha", "Google reCAPTCHA"),
+            ("turnstile", "Cloudflare Turnstile"),
+            ("proof_of_work", "Proof of Work (Self-Hosted)"),
+        ]
+
+    def test_unknown_providers_fall_back_to_recaptcha(self) -> None:
+        assert isinstance(get_captcha_provider("missing"), ReCaptchaProvider)
+        assert isinstance(get_captcha_provider(None), ReCaptchaProvider)
+
+    def test_settings_can_add_and_remove_providers(self, settings: Any) -> None:
+        settings.CONTACT_FORM_CAPTCHA_PROVIDERS = {"hcaptcha": HCAPTCHA_PROVIDER, "proof_of_work": None}
+
+        assert isinstance(get_captcha_provider("hcaptcha"), HCaptchaProvider)
+        assert [slug for slug, _label in get_captcha_provider_choices()] == ["recaptcha", "turnstile", "hcaptcha"]
+
+    def test_broken_provider_paths_are_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_CAPTCHA_PROVIDERS = {
+            "missing": "contact_form.tests.unit.test_providers.MissingProvider",
+            "not_a_provider": "contact_form.tests.unit.test_providers.HCaptchaField",
+            "a_very_long_provider_slug": HCAPTCHA_PROVIDER,
+        }
+
+        message_ids = [message.id for message in check_contact_form_security_settings()]
+
+        assert message_ids.count("contact_form.E025") == 2
+        assert message_ids.count("contact_form.E026") == 1
+        assert get_captcha_provider_choices()[0] == ("recaptcha", "Google reCAPTCHA")
+
+    def test_malformed_provider_mapping_is_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_CAPTCHA_PROVIDERS = ["hcaptcha"]
+
+        message_ids = [message.id for message in check_contact_form_security_settings()]
+
+        assert "contact_form.E017" in message_ids
+
+
+@pytest.mark.django_db
+class TestCustomCaptchaProvider:
+    def test_builder_uses_the_registered_provider(self, hcaptcha: None, contact_page: ContactPage) -> None:
+        contact_page.captcha_provider = "hcaptcha"
+
+        field = ContactFormBuilder(contact_page.form_fields.all(), page=contact_page).formfields["wagtailcaptcha"]
+
+        assert isinstance(field, HCaptchaField)
+        assert field.site_key == "hcaptcha-site-key"
+
+    def test_page_context_carries_provider_hooks(self, hcaptcha: None, contact_page: ContactPage, rf: Any) -> None:
+        contact_page.captcha_provider = "hcaptcha"
+        request = rf.get(contact_page.url)
+
+        context = contact_page.get_context(request)
+
+        assert context["captcha_script_template"] == "contact_form/includes/hcaptcha_scripts.html"
+        assert context["hcaptcha_form_token"] == context["form_security_token"]
+
+    def test_turnstile_snapshot_prefers_configured_keys(self, rf: Any, settings: Any) -> None:
+        settings.TURNSTILE_SITE_KEY = "settings-site-key"
+        settings.TURNSTILE_SECRET_KEY = "settings-secret-key"
+        settings.ALLOWED_HOSTS = ["example.com"]
+        request = rf.get("/", HTTP_HOST="example.com")
+
+        snapshot = TurnstileProvider().get_settings_snapshot(captcha_settings=None, request=request)
+
+        assert snapshot == CaptchaSettingsSnapshot(
+            site_key="settings-site-key",
+            secret_key="settings-secret-key",
+            options={"theme": "auto", "size": "normal"},
+        )
+
+
+class TestReCaptchaProvider:
+    @pytest.fixture
+    def captcha_settings(self) -> MagicMock:
+        captcha_settings = MagicMock()
+        captcha_settings.get_recaptcha_settings.return_value = {
+            "public_key": "configured-public-key",
+            "private_key": "configured-private-key",
+            "required_score": "0.5",
+            "domain": "www.recaptcha.net",
+        }
+        return captcha_settings
+
+    def test_field_is_built_from_the_snapshot(self, captcha_settings: MagicMock, settings: Any) -> None:
+        field = ReCaptchaProvider().get_field(captcha_settings=captcha_settings, page=None, request=None)
+
+        assert isinstance(field, ReCaptchaField)
+        assert field.public_key == "configured-public-key"
+        assert field.private_key == "configured-private-key"
+        assert field.widget.required_score == 0.5
+        assert field.widget.get_context("wagtailcaptcha", None, {})["recaptcha_domain"] == "www.recaptcha.net"
+        assert getattr(settings, "RECAPTCHA_PRIVATE_KEY", None) != "configured-private-key"
+
+    @pytest.mark.parametrize(
+        ("payload", "is_valid"),
+        [
+            ({"success": True, "score": 0.9, "action": None}, True),
+            ({"success": True, "score": 0.1, "action": None}, False),
+            ({"success": False, "error-codes": ["invalid-input-response"]}, False),
+        ],
+    )
+    def test_verification_uses_the_shared_transport(
+        self,
+        captcha_settings: MagicMock,
+        payload: dict[str, Any],
+        is_valid: bool,
+    ) -> None:
+        field = ReCaptchaProvider().get_field(captcha_settings=captcha_settings, page=None, request=None)
+        response = TransportResponse(status=200, body=json.dumps(payload).encode("utf-8"))
+
+        with patch("contact_form.transport.VerificationTransport.post_form", return_value=response) as post_form:
+            if is_valid:
+                field.validate("token")
+            else:
+                with pytest.raises(ValidationError):
+                    field.validate("token")
+
+        assert post_form.call_args.args[0] == "https://www.recaptcha.net/recaptcha/api/siteverify"
+        assert post_form.call_args.args[1] == {"secret": "configured-private-key", "response": "token"}
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import re
+import time
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from wagtail.models import Site
+
+from contact_form.models import ContactPage
+from contact_form.rejections import CSRF_PLACEHOLDER
+from contact_form.rejections import HONEYPOT_PLACEHOLDER
+from contact_form.rejections import TOKEN_PLACEHOLDER
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import HONEYPOT_NAME_PATTERN
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import validate_form_security_token
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_contact_page import create_standard_fields
+from contact_form.tests.unit.test_contact_page import securely_post_form
+
+TOKEN_PATTERN = re.compile(r'name="_contact_form_token"\s+value="([^"]+)"')
+HONEYPOT_PATTERN = re.compile(r'id="(_contact_[^"]+)"')
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+
+
+@pytest.fixture
+def contact_page(db: Any) -> ContactPage:
+    page = ContactPage(
+        title="Contact Us",
+        thank_you_text="Thank you for your submission!",
+        from_address="forms@example.com",
+        to_address="normal@example.com",
+        subject="Contact Form",
+    )
+    Site.objects.get(is_default_site=True).root_page.add_child(instance=page)
+    create_standard_fields(page)
+    return page
+
+
+def post_invalid_token(client: Any, page: ContactPage) -> Any:
+    return client.post(page.url, {"_contact_form_token": "invalid"})
+
+
+@pytest.mark.django_db
+class TestCachedRejections:
+    def test_rejection_shell_is_rendered_once(self, client: Any, contact_page: ContactPage) -> None:
+        with patch.object(ContactPage, "get_context", autospec=True, side_effect=ContactPage.get_context) as context:
+            responses = [post_invalid_token(client, contact_page) for _attempt in range(3)]
+
+        assert [response.status_code for response in responses] == [400, 400, 400]
+        assert context.call_count == 1
+        assert b"We could not verify this form." in responses[-1].content
+        assert "private" in responses[-1]["Cache-Control"]
+
+    def test_each_rejection_carries_a_fresh_usable_token(self, client: Any, contact_page: ContactPage) -> None:
+        first = post_invalid_token(client, contact_page).content.decode()
+        second = post_invalid_token(client, contact_page).content.decode()
+
+        for placeholder in (TOKEN_PLACEHOLDER, HONEYPOT_PLACEHOLDER, CSRF_PLACEHOLDER):
+            assert placeholder not in second
+        assert TOKEN_PATTERN.search(first).group(1) != TOKEN_PATTERN.search(second).group(1)
+        assert HONEYPOT_NAME_PATTERN.match(HONEYPOT_PATTERN.search(second).group(1))
+        assert 'name="csrfmiddlewaretoken"' in second
+        with patch("contact_form.security.time.time", return_value=time.time() + 10):
+            payload = validate_form_security_token(page=contact_page, token=TOKEN_PATTERN.search(second).group(1))
+        assert payload.page_id == contact_page.pk
+
+    def test_rate_limited_response_keeps_retry_after(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_POST_LIMIT = 1
+        incomplete_data = {"full_name": "John Doe"}
+        securely_post_form(client=client, page=contact_page, data=incomplete_data)
+
+        response, _post_data = securely_post_form(client=client, page=contact_page, data=incomplete_data)
+
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+        assert b"You submitted the form too frequently." in response.content
+
+    def test_republishing_invalidates_the_shell(self, client: Any, contact_page: ContactPage) -> None:
+        post_invalid_token(client, contact_page)
+        contact_page.title = "Write to Us"
+        contact_page.save_revision().publish()
+
+        response = post_invalid_token(client, contact_page)
+
+        assert b"Write to Us" in response.content
+
+    def test_saving_captcha_settings_invalidates_the_shell(self, client: Any, contact_page: ContactPage) -> None:
+        with patch.object(ContactPage, "get_context", autospec=True, side_effect=ContactPage.get_context) as context:
+            post_invalid_token(client, contact_page)
+            captcha_settings = CaptchaSettings.load()
+            captcha_settings.turnstile_theme = "dark"
+            captcha_settings.save()
+            post_invalid_token(client, contact_page)
+
+        assert context.call_count == 2
+
+    def test_authenticated_users_get_a_full_render(self, client: Any, contact_page: ContactPage) -> None:
+        client.force_login(get_user_model().objects.create_user(username="editor", password="password"))
+
+        with patch.object(ContactPage, "get_context", autospec=True, side_effect=ContactPage.get_context) as context:
+            post_invalid_token(client, contact_page)
+            post_invalid_token(client, contact_page)
+
+        assert context.call_count == 2
+
+    def test_cache_can_be_disabled(self, client: Any, contact_page: ContactPage, settings: Any) -> None:
+        settings.CONTACT_FORM_REJECTION_CACHE_SECONDS = 0
+
+        with patch.object(ContactPage, "get_context", autospec=True, side_effect=ContactPage.get_context) as context:
+            post_invalid_token(client, contact_page)
+            post_invalid_token(client, contact_page)
+
+        assert context.call_count == 2
+
+    def test_silent_drops_reuse_the_landing_page(self, client: Any, contact_page: ContactPage) -> None:
+        data = {"full_name": "Bot", "e_mail_address": "bot@example.com", "message": "Spam"}
+
+        with patch.object(
+            ContactPage,
+            "render_landing_page",
+            autospec=True,
+            side_effect=ContactPage.render_landing_page,
+        ) as landing:
+            responses = [
+                securely_post_form(client=client, page=contact_page, data=data, honeypot_value="filled")[0]
+                for _attempt in range(2)
+            ]
+
+        assert [response.status_code for response in responses] == [200, 200]
+        assert landing.call_count == 1
+        assert b"Thank you for your submission!" in responses[-1].content
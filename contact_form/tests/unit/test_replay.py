@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import threading
+import uuid
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.replay import BLOOM_BLOCK_BYTES
+from contact_form.replay import BloomFilterGeometry
+from contact_form.replay import BloomReplayStore
+from contact_form.replay import get_nonce_replay_store
+from contact_form.security import is_submission_nonce_used
+from contact_form.security import release_submission_nonce
+from contact_form.security import reserve_submission_nonce
+
+
+class _FakeRedisPipeline:
+    def __init__(self, client: _FakeRedisClient, *, transaction: bool) -> None:
+        self.client = client
+        self.bitmaps = client.bitmaps
+        self.transaction = transaction
+        self.commands: list[tuple[str, tuple[Any, ...]]] = []
+
+    def getbit(self, key: str, offset: int) -> None:
+        self.commands.append(("getbit", (key, offset)))
+
+    def setbit(self, key: str, offset: int, value: int) -> None:
+        self.commands.append(("setbit", (key, offset)))
+
+    def expire(self, key: str, timeout: int) -> None:
+        self.commands.append(("expire", (key, timeout)))
+
+    def execute(self) -> list[int | bool]:
+        if self.transaction:
+            with self.client.transaction_lock:
+                return self._run()
+        return self._run()
+
+    def _run(self) -> list[int | bool]:
+        results: list[int | bool] = []
+        for command, (key, argument) in self.commands:
+            if not self.transaction and self.client.step_barrier is not None:
+                self.client.step_barrier.wait(timeout=5)
+            bits = self.bitmaps.setdefault(key, set())
+            if command == "expire":
+                results.append(True)
+                continue
+            results.append(int(argument in bits))
+            if command == "setbit":
+                bits.add(argument)
+        return results
+
+
+class _FakeRedisClient:
+    def __init__(self, *, step_barrier: threading.Barrier | None = None) -> None:
+        self.bitmaps: dict[str, set[int]] = {}
+        self.transaction_lock = threading.Lock()
+        # Lets non-transactional pipelines of concurrent callers advance one
+        # command at a time, the worst interleaving a server can produce.
+        self.step_barrier = step_barrier
+
+    def pipeline(self, transaction: bool = True) -> _FakeRedisPipeline:
+        return _FakeRedisPipeline(self, transaction=transaction)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    cache.clear()
+
+
+@pytest.fixture
+def geometry() -> BloomFilterGeometry:
+    return BloomFilterGeometry.for_capacity(
+        capacity=1_000,
+        false_positive_rate=0.001,
+        partitions=4,
+        window_seconds=7200,
+    )
+
+
+class TestBloomFilterGeometry:
+    def test_partitions_cover_token_lifetime(self, geometry: BloomFilterGeometry) -> None:
+        assert geometry.partition_seconds == 2400
+        assert (geometry.partitions - 1) * geometry.partition_seconds >= 7200
+
+    def test_memory_is_bounded_by_capacity_not_volume(self, geometry: BloomFilterGeometry) -> None:
+        assert geometry.bytes_total == geometry.partitions * geometry.block_count * BLOOM_BLOCK_BYTES
+        assert geometry.bytes_total < 64 * 1024
+        assert 1 <= geometry.hash_count <= 32
+
+
+class TestBloomReplayStore:
+    def test_reserves_each_nonce_once(self, geometry: BloomFilterGeometry) -> None:
+        store = BloomReplayStore(geometry)
+
+        assert store.contains("nonce-a") is False
+        assert store.add("nonce-a") is True
+        assert store.contains("nonce-a") is True
+        assert store.add("nonce-a") is False
+        assert store.contains("nonce-b") is False
+
+    def test_release_allows_exactly_one_retry(self, geometry: BloomFilterGeometry) -> None:
+        store = BloomReplayStore(geometry)
+        store.add("nonce-a")
+
+        assert store.release("nonce-a") is True
+        assert store.contains("nonce-a") is False
+        assert store.add("nonce-a") is True
+        assert store.add("nonce-a") is False
+
+    def test_nonce_expires_with_its_partitions(self, geometry: BloomFilterGeometry) -> None:
+        store = BloomReplayStore(geometry)
+        with patch("contact_form.replay.time.time", return_value=10_000):
+            store.add("nonce-a")
+        with patch("contact_form.replay.time.time", return_value=10_000 + 7200):
+            assert store.contains("nonce-a") is True
+        with patch("contact_form.replay.time.time", return_value=10_000 + 4 * 2400):
+            assert store.contains("nonce-a") is False
+
+    def test_false_positive_rate_stays_near_target(self, geometry: BloomFilterGeometry) -> None:
+        store = BloomReplayStore(geometry)
+        for index in range(1_000):
+            store.add(f"stored-{index}")
+
+        false_positives = sum(store.contains(f"probe-{index}") for index in range(5_000))
+
+        assert false_positives / 5_000 < 0.005
+
+    def test_uses_native_redis_bitmaps_when_available(self, geometry: BloomFilterGeometry) -> None:
+        client = _FakeRedisClient()
+        store = BloomReplayStore(geometry)
+
+        with patch("contact_form.replay.get_redis_client", return_value=client):
+            assert store.add("nonce-a") is True
+            assert store.add("nonce-a") is False
+            assert store.contains("nonce-a") is True
+
+        assert len(client.bitmaps) == geometry.partitions
+
+    def test_concurrent_adds_of_one_nonce_accept_it_once(self, geometry: BloomFilterGeometry) -> None:
+        client = _FakeRedisClient(step_barrier=threading.Barrier(2))
+        store = BloomReplayStore(geometry)
+        results: list[bool] = []
+
+        def add() -> None:
+            results.append(store.add("nonce-a"))
+
+        with patch("contact_form.replay.get_redis_client", return_value=client):
+            threads = [threading.Thread(target=add) for _index in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+
+        assert sorted(results) == [False, True]
+
+
+@pytest.mark.django_db
+class TestBloomNonceIntegration:
+    @pytest.fixture
+    def page(self) -> MagicMock:
+        return MagicMock(translation_key=uuid.uuid4())
+
+    def test_store_is_disabled_by_default(self) -> None:
+        assert get_nonce_replay_store() is None
+
+    def test_security_functions_use_bloom_store(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_NONCE_REPLAY_STORE = "bloom"
+        settings.CONTACT_FORM_BLOOM_PARTITION_CAPACITY = 1_000
+
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce-hash").allowed is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce-hash") is True
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce-hash").allowed is False
+        assert release_submission_nonce(page=page, nonce_hash="nonce-hash") is True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce-hash") is False
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.clearance import DEFAULT_CLEARANCE_COOKIE_NAME
+from contact_form.metrics import registry
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.scoring import SPAM_VERDICT_CHALLENGE
+from contact_form.scoring import SPAM_VERDICT_DROP
+from contact_form.scoring import SPAM_VERDICT_PASS
+from contact_form.scoring import count_mixed_script_words
+from contact_form.scoring import get_spam_verdict
+from contact_form.scoring import score_submission
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_clearance import create_turnstile_page
+from contact_form.tests.unit.test_clearance import submit
+from contact_form.tests.unit.test_contact_page import securely_post_form
+from contact_form.turnstile import TurnstileField
+
+SPAM_CORPUS = Path(__file__).resolve().parents[1] / "fixtures" / "spam_corpus.jsonl"
+LINK_FARM = " ".join(f"http://spam.example/{index}" for index in range(5))
+
+
+def load_spam_corpus() -> list[dict[str, Any]]:
+    with SPAM_CORPUS.open(encoding="utf-8") as corpus:
+        return [json.loads(line) for line in corpus if line.strip()]
+
+
+@pytest.fixture(autouse=True)
+def clear_state() -> None:
+    cache.clear()
+    registry.clear()
+    get_local_verdict_cache().clear()
+    clear_rejection_cache()
+
+
+@pytest.fixture
+def contact_page(db: Any, settings: Any) -> ContactPage:
+    settings.CONTACT_FORM_TURNSTILE_PREFETCH = True
+    CaptchaSettings.objects.update_or_create(
+        defaults={
+            "turnstile_site_key": "configured-site-key",
+            "turnstile_secret_key": "configured-secret-key",
+        }
+    )
+    return create_turnstile_page("Contact Us")
+
+
+class TestSpamScore:
+    @pytest.mark.parametrize(
+        ("text", "mixed_words"),
+        [
+            ("Hello world", 0),
+            ("Здравствуйте мир", 0),
+            ("Zażółć gęślą jaźń", 0),
+            ("Frее mоnеy", 2),
+            ("Kупить now", 1),
+        ],
+    )
+    def test_mixed_scripts_are_counted_per_word(self, text: str, mixed_words: int) -> None:
+        assert count_mixed_script_words(text) == mixed_words
+
+    def test_signals_are_weighted(self) -> None:
+        result = score_submission(
+            fields={"full_name": "Bot", "message": f"{LINK_FARM} !!!!!!!!"},
+            completion_seconds=5,
+            weights={"links": 1.0, "fast_completion": 10.0, "repeated_characters": 0.5},
+        )
+
+        assert result.signals["links"] == 4
+        assert result.signals["fast_completion"] == 0.5
+        assert result.signals["repeated_characters"] == 1
+        assert result.score == 4 + 5 + 0.5
+
+    def test_secondary_fields_as_long_as_the_message_are_suspicious(self) -> None:
+        message = "Best prices on designer bags in our online store, visit today and save big"
+
+        result = score_submission(fields={"full_name": message, "message": message}, completion_seconds=None)
+
+        assert result.signals["length_ratio"] == 1
+
+    @pytest.mark.parametrize(
+        ("score", "verdict"),
+        [(0.0, SPAM_VERDICT_PASS), (2.9, SPAM_VERDICT_PASS), (3.0, SPAM_VERDICT_CHALLENGE), (6.0, SPAM_VERDICT_DROP)],
+    )
+    def test_thresholds_are_configurable(self, settings: Any, score: float, verdict: str) -> None:
+        settings.CONTACT_FORM_SPAM_CHALLENGE_SCORE = 3
+        settings.CONTACT_FORM_SPAM_DROP_SCORE = 6
+
+        assert get_spam_verdict(score) == verdict
+
+    def test_default_thresholds_never_drop(self) -> None:
+        assert get_spam_verdict(100.0) == SPAM_VERDICT_CHALLENGE
+
+    def test_default_thresholds_separate_the_labelled_corpus(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SPAM_DROP_SCORE = 8
+        verdicts: dict[str, list[str]] = {"ham": [], "spam": []}
+        for sample in load_spam_corpus():
+            result = score_submission(fields=sample["fields"], completion_seconds=sample["completion_seconds"])
+            verdicts[sample["label"]].append(get_spam_verdict(result.score))
+
+        assert set(verdicts["ham"]) == {SPAM_VERDICT_PASS}
+        assert SPAM_VERDICT_PASS not in verdicts["spam"]
+        assert verdicts["spam"].count(SPAM_VERDICT_DROP) > len(verdicts["spam"]) / 2
+
+    def test_invalid_configuration_is_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SPAM_WEIGHTS = {"links": -1, "emoji": 2}
+        settings.CONTACT_FORM_SPAM_CHALLENGE_SCORE = 9
+        settings.CONTACT_FORM_SPAM_DROP_SCORE = 8
+
+        message_ids = [message.id for message in check_contact_form_security_settings()]
+
+        assert "contact_form.E018" in message_ids
+        assert "contact_form.W006" in message_ids
+
+    def test_unknown_signals_are_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SPAM_WEIGHTS = {"links": 1, "emoji": 2}
+
+        message_ids = [message.id for message in check_contact_form_security_settings()]
+
+        assert "contact_form.E024" in message_ids
+        assert "contact_form.E018" not in message_ids
+
+    def test_invalid_drop_score_is_reported(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SPAM_DROP_SCORE = "never"
+
+        assert "contact_form.E023" in [message.id for message in check_contact_form_security_settings()]
+
+
+@pytest.mark.django_db
+class TestScoringStage:
+    def test_obvious_junk_is_challenged_by_default(self, client: Any, contact_page: ContactPage) -> None:
+        data = {"full_name": "Deals", "e_mail_address": "deals@example.net", "message": LINK_FARM}
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(False, "invalid-input-response")):
+            response, _post_data = securely_post_form(client=client, page=contact_page, data=data)
+
+        assert b"Thank you for your submission!" not in response.content
+        assert "wagtailcaptcha" in response.context["form"].errors
+        assert registry.get("contact_form.scoring.verdicts", verdict=SPAM_VERDICT_CHALLENGE) == 1
+        assert registry.get("contact_form.pipeline.rejections", stage="scoring", reason="spam-score") == 0
+
+    def test_obvious_junk_is_dropped_before_any_network_call(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_SPAM_DROP_SCORE = 8
+        data = {"full_name": "Deals", "e_mail_address": "deals@example.net", "message": LINK_FARM}
+
+        with patch("contact_form.transport.VerificationTransport.post_form") as post_form:
+            response, _post_data = securely_post_form(client=client, page=contact_page, data=data)
+
+        assert response.status_code == 200
+        assert b"Thank you for your submission!" in response.content
+        post_form.assert_not_called()
+        assert contact_page.get_submission_class().objects.count() == 0
+        assert registry.get("contact_form.pipeline.rejections", stage="scoring", reason="spam-score") == 1
+        assert registry.get("contact_form.pipeline.stage_calls", stage="rate_limit") == 0
+
+    def test_suspicious_submissions_are_challenged_despite_clearance(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        settings: Any,
+    ) -> None:
+        settings.CONTACT_FORM_CAPTCHA_CLEARANCE_SECONDS = 600
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")):
+            first = submit(client, contact_page, "First")
+        assert DEFAULT_CLEARANCE_COOKIE_NAME in first.cookies
+
+        response = submit(
+            client,
+            contact_page,
+            "Cheap offer http://pills.example and http://pills.example/more, сheap",
+            captcha_token=None,
+        )
+
+        assert b"Thank you for your submission!" not in response.content
+        assert "wagtailcaptcha" in response.context["form"].errors
+        assert registry.get("contact_form.scoring.verdicts", verdict=SPAM_VERDICT_CHALLENGE) == 1
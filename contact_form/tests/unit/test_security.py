@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+import uuid
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+
+from contact_form.security import SecurityEventKind
+from contact_form.security import _security_cache_key
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import get_page_scope_hash
+from contact_form.security import is_submission_nonce_used
+from contact_form.security import reserve_submission_nonce
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+
+
+@pytest.fixture
+def page() -> MagicMock:
+    return MagicMock(translation_key=uuid.uuid4())
+
+
+class TestSecurityKeyLayout:
+    def test_flat_layout_is_default(self) -> None:
+        key = _security_cache_key(kind="post_rate_limit", scope_hash="a" * 64, fingerprint="client", bucket=1)
+
+        assert re.fullmatch(r"contact-form-security:v1:[0-9a-f]{64}", key)
+
+    def test_page_tagged_layout_shares_one_hash_tag_per_page(self, settings: Any) -> None:
+        settings.CONTACT_FORM_SECURITY_KEY_LAYOUT = "page-tagged"
+        scope_hash = "0123456789abcdef" + "f" * 48
+
+        keys = [
+            _security_cache_key(kind=str(kind), scope_hash=scope_hash, fingerprint=f"value-{index}", bucket=index)
+            for index, kind in enumerate(SecurityEventKind)
+        ]
+
+        assert len(set(keys)) == len(keys)
+        assert all(key.startswith("contact-form-security:v2:{0123456789abcdef}:") for key in keys)
+
+    def test_legacy_nonce_keys_are_honoured_after_layout_switch(self, settings: Any, page: MagicMock) -> None:
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+        get_local_verdict_cache().clear()
+        settings.CONTACT_FORM_SECURITY_KEY_LAYOUT = "page-tagged"
+
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is False
+
+        settings.CONTACT_FORM_SECURITY_LEGACY_KEY_READS = True
+        assert is_submission_nonce_used(page=page, nonce_hash="nonce") is True
+        assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is False
+
+    def test_tag_is_derived_from_page_scope(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_SECURITY_KEY_LAYOUT = "page-tagged"
+
+        key = _security_cache_key(kind="submission_nonce", scope_hash=get_page_scope_hash(page), fingerprint="x")
+
+        assert f"{{{get_page_scope_hash(page)[:16]}}}" in key
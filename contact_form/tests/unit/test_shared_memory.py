@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import stat
+import sys
+import threading
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from contact_form.security import SecurityEventKind
+from contact_form.security import SecurityStateKey
+from contact_form.security import acquire_security_window
+from contact_form.security import get_local_verdict_cache
+from contact_form.security import reserve_submission_nonce
+from contact_form.shared_memory import SharedMemorySecurityStateBackend
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="shared-memory state requires a POSIX platform")
+
+
+@pytest.fixture
+def state_path(tmp_path: Path) -> str:
+    return str(tmp_path / "security.mmap")
+
+
+@pytest.fixture
+def state_key() -> SecurityStateKey:
+    return SecurityStateKey(kind="post_rate_limit", scope_hash="a" * 64, fingerprint="client", bucket=1)
+
+
+def _increment_many(path: str, key: SecurityStateKey, times: int) -> None:
+    backend = SharedMemorySecurityStateBackend(path=path, slots=1024)
+    for _attempt in range(times):
+        backend.increment(key, timeout=60)
+
+
+class TestSharedMemorySecurityStateBackend:
+    def test_counts_and_expiry(self, state_path: str, state_key: SecurityStateKey) -> None:
+        backend = SharedMemorySecurityStateBackend(path=state_path, slots=1024)
+        with patch("contact_form.shared_memory.time.time", return_value=1_000):
+            assert [backend.increment(state_key, timeout=60) for _attempt in range(3)] == [1, 2, 3]
+        with patch("contact_form.shared_memory.time.time", return_value=1_060):
+            assert backend.increment(state_key, timeout=60) == 1
+
+    def test_reservation_lifecycle(self, state_path: str, state_key: SecurityStateKey) -> None:
+        backend = SharedMemorySecurityStateBackend(path=state_path, slots=1024)
+
+        assert backend.reserve(state_key, timeout=60) is True
+        assert backend.exists(state_key, timeout=60) is True
+        assert backend.reserve(state_key, timeout=60) is False
+        assert backend.release(state_key, timeout=60) is True
+        assert backend.exists(state_key, timeout=60) is False
+        assert backend.reserve(state_key, timeout=60) is True
+
+    def test_instances_share_the_mapped_file(self, state_path: str, state_key: SecurityStateKey) -> None:
+        first = SharedMemorySecurityStateBackend(path=state_path, slots=1024)
+        second = SharedMemorySecurityStateBackend(path=state_path, slots=1024)
+
+        first.reserve(state_key, timeout=60)
+
+        assert second.reserve(state_key, timeout=60) is False
+
+    def test_concurrent_processes_do_not_lose_updates(self, state_path: str, state_key: SecurityStateKey) -> None:
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_increment_many, args=(state_path, state_key, 100)) for _index in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+
+        assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+        assert SharedMemorySecurityStateBackend(path=state_path, slots=1024).increment(state_key, timeout=60) == 401
+
+    def test_full_probe_window_evicts_the_entry_expiring_soonest(self, state_path: str) -> None:
+        backend = SharedMemorySecurityStateBackend(path=state_path, slots=32)
+        keys = [
+            SecurityStateKey(kind="submission_nonce", scope_hash="a", fingerprint=str(index)) for index in range(32)
+        ]
+        with patch("contact_form.shared_memory.time.time", return_value=1_000):
+            for index, key in enumerate(keys):
+                backend.reserve(key, timeout=60 if index == 7 else 600)
+
+            key = SecurityStateKey(kind="submission_nonce", scope_hash="a", fingerprint="x")
+            assert backend.reserve(key, timeout=60) is True
+            assert backend.exists(key, timeout=60) is True
+            assert backend.exists(keys[7], timeout=60) is False
+            assert all(backend.exists(other, timeout=60) for other in keys if other is not keys[7])
+
+    def test_threads_with_overlapping_windows_do_not_lose_updates(self, state_path: str) -> None:
+        backend = SharedMemorySecurityStateBackend(path=state_path, slots=64)
+        keys = [SecurityStateKey(kind="post_rate_limit", scope_hash="a", fingerprint=str(index)) for index in range(8)]
+
+        def increment_all() -> None:
+            for _attempt in range(50):
+                for key in keys:
+                    backend.increment(key, timeout=60)
+
+        threads = [threading.Thread(target=increment_all) for _index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        assert [backend.increment(key, timeout=60) for key in keys] == [201] * len(keys)
+
+    def test_expired_slots_are_reused(self, state_path: str) -> None:
+        backend = SharedMemorySecurityStateBackend(path=state_path, slots=32)
+        with patch("contact_form.shared_memory.time.time", return_value=1_000):
+            for index in range(32):
+                key = SecurityStateKey(kind="submission_nonce", scope_hash="a", fingerprint=str(index))
+                backend.reserve(key, timeout=60)
+        with patch("contact_form.shared_memory.time.time", return_value=1_060):
+            key = SecurityStateKey(kind="submission_nonce", scope_hash="a", fingerprint="x")
+            assert backend.reserve(key, timeout=60) is True
+
+    def test_slot_count_mismatch_is_rejected(self, state_path: str, state_key: SecurityStateKey) -> None:
+        SharedMemorySecurityStateBackend(path=state_path, slots=1024).reserve(state_key, timeout=60)
+
+        with pytest.raises(ImproperlyConfigured):
+            SharedMemorySecurityStateBackend(path=state_path, slots=2048).exists(state_key, timeout=60)
+
+    def test_symlinked_state_file_is_refused(self, tmp_path: Path, state_key: SecurityStateKey) -> None:
+        target = tmp_path / "elsewhere"
+        target.write_bytes(b"")
+        link = tmp_path / "security.mmap"
+        link.symlink_to(target)
+
+        with pytest.raises(OSError):
+            SharedMemorySecurityStateBackend(path=str(link), slots=1024).exists(state_key, timeout=60)
+        assert target.read_bytes() == b""
+
+    def test_state_file_readable_by_others_is_refused(self, state_path: str, state_key: SecurityStateKey) -> None:
+        Path(state_path).touch(mode=0o644)
+        os.chmod(state_path, 0o644)
+
+        with pytest.raises(ImproperlyConfigured):
+            SharedMemorySecurityStateBackend(path=state_path, slots=1024).exists(state_key, timeout=60)
+
+    def test_default_path_is_in_a_private_directory(self, tmp_path: Path) -> None:
+        with patch("contact_form.shared_memory.tempfile.gettempdir", return_value=str(tmp_path)):
+            path = Path(SharedMemorySecurityStateBackend(slots=1024).path)
+
+        assert path.parent.parent == tmp_path
+        assert stat.S_IMODE(path.parent.stat().st_mode) == 0o700
+
+    def test_shared_default_directory_is_refused(self, tmp_path: Path) -> None:
+        directory = tmp_path / f"contact-form-{os.geteuid()}"
+        directory.mkdir()
+        directory.chmod(0o777)
+
+        with patch("contact_form.shared_memory.tempfile.gettempdir", return_value=str(tmp_path)):
+            with pytest.raises(ImproperlyConfigured):
+                SharedMemorySecurityStateBackend(slots=1024)
+
+
+@pytest.mark.django_db
+def test_backend_can_be_selected_in_settings(settings: Any, state_path: str) -> None:
+    cache.clear()
+    get_local_verdict_cache().clear()
+    settings.CONTACT_FORM_SECURITY_BACKEND = "contact_form.shared_memory.SharedMemorySecurityStateBackend"
+    settings.CONTACT_FORM_SECURITY_MMAP_PATH = state_path
+    settings.CONTACT_FORM_SECURITY_MMAP_SLOTS = 1024
+    page = MagicMock(translation_key=uuid.uuid4())
+
+    assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is True
+    cache.clear()
+    assert reserve_submission_nonce(page=page, nonce_hash="nonce").allowed is False
+    decision = acquire_security_window(
+        kind=str(SecurityEventKind.POST_RATE_LIMIT),
+        scope_hash="b" * 64,
+        fingerprint="client",
+        duration=timedelta(seconds=600),
+        limit=2,
+    )
+    assert decision.allowed is True
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import uuid
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from django import forms
+from django.core.cache import cache
+
+from contact_form.backends import CacheSecurityStateBackend
+from contact_form.similarity import MINHASH_BANDS
+from contact_form.similarity import estimate_similarity
+from contact_form.similarity import get_submission_message_text
+from contact_form.similarity import minhash_signature
+from contact_form.similarity import normalize_message_text
+from contact_form.similarity import record_near_duplicate_submission
+
+CAMPAIGN_MESSAGE = (
+    "Hello! We noticed your website is missing out on organic traffic. Our SEO experts can get you "
+    "to the first page of Google within 30 days. Reply today for a free audit of your domain and "
+    "a custom backlink strategy tailored to your business."
+)
+
+
+class _MessageForm(forms.Form):
+    full_name = forms.CharField()
+    message = forms.CharField(widget=forms.Textarea)
+
+
+def _valid_form(full_name: str, message: str) -> _MessageForm:
+    form = _MessageForm({"full_name": full_name, "message": message})
+    assert form.is_valid()
+    return form
+
+
+class TestMinHash:
+    def test_normalization_ignores_case_punctuation_and_spacing(self) -> None:
+        assert normalize_message_text("  Hello,   WORLD!!\n") == "hello world"
+
+    def test_small_variations_remain_similar(self) -> None:
+        variant = CAMPAIGN_MESSAGE.replace("30 days", "4 weeks").replace("Hello!", "Hi there,")
+
+        similarity = estimate_similarity(minhash_signature(CAMPAIGN_MESSAGE), minhash_signature(variant))
+
+        assert similarity > 0.6
+
+    def test_unrelated_messages_are_dissimilar(self) -> None:
+        other = "Could you send me the opening hours of your Warsaw office and whether parking is available?"
+
+        similarity = estimate_similarity(minhash_signature(CAMPAIGN_MESSAGE), minhash_signature(other))
+
+        assert similarity < 0.1
+
+    def test_message_text_prefers_multiline_fields(self) -> None:
+        form = _valid_form("Rotating Name", CAMPAIGN_MESSAGE)
+
+        assert get_submission_message_text(form) == CAMPAIGN_MESSAGE
+
+
+@pytest.mark.django_db
+class TestNearDuplicateIndex:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        cache.clear()
+
+    @pytest.fixture
+    def page(self) -> MagicMock:
+        return MagicMock(translation_key=uuid.uuid4())
+
+    def test_rejects_campaign_after_threshold(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_NEAR_DUPLICATE_THRESHOLD = 2
+
+        decisions = [
+            record_near_duplicate_submission(
+                page=page,
+                form=_valid_form(f"Sender {index}", CAMPAIGN_MESSAGE.replace("30", str(20 + index))),
+            )
+            for index in range(4)
+        ]
+
+        assert [decision.allowed for decision in decisions] == [True, True, False, False]
+        assert decisions[-1].flagged is True
+        assert decisions[-1].hits == 3
+
+    def test_flag_action_lets_campaign_through(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_NEAR_DUPLICATE_THRESHOLD = 1
+        settings.CONTACT_FORM_NEAR_DUPLICATE_ACTION = "flag"
+
+        record_near_duplicate_submission(page=page, form=_valid_form("A", CAMPAIGN_MESSAGE))
+        decision = record_near_duplicate_submission(page=page, form=_valid_form("B", CAMPAIGN_MESSAGE))
+
+        assert decision.allowed is True
+        assert decision.flagged is True
+
+    def test_distinct_messages_are_not_counted_together(self, settings: Any, page: MagicMock) -> None:
+        settings.CONTACT_FORM_NEAR_DUPLICATE_THRESHOLD = 1
+
+        record_near_duplicate_submission(page=page, form=_valid_form("A", CAMPAIGN_MESSAGE))
+        decision = record_near_duplicate_submission(
+            page=page,
+            form=_valid_form("B", "Please call me back about the invoice for order 4471, it has the wrong address."),
+        )
+
+        assert decision.allowed is True
+        assert decision.hits == 0
+
+    def test_bands_are_counted_in_one_round_trip(self, settings: Any, page: MagicMock) -> None:
+        with patch.object(
+            CacheSecurityStateBackend,
+            "increment_many",
+            autospec=True,
+            side_effect=CacheSecurityStateBackend.increment_many,
+        ) as increment_many:
+            record_near_duplicate_submission(page=page, form=_valid_form("A", CAMPAIGN_MESSAGE))
+
+        assert increment_many.call_count == 1
+        assert len(increment_many.call_args.args[1]) == MINHASH_BANDS
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import threading
+import urllib.error
+import urllib.parse
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from contact_form.metrics import registry
+from contact_form.transport import VerificationTransport
+
+
+class KeepAliveStub(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), KeepAliveStubHandler)
+        self.statuses: list[int] = []
+        self.drop_idle_connections = False
+        self.requests: list[tuple[int, dict[str, list[str]]]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/siteverify"
+
+
+class KeepAliveStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: KeepAliveStub
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append((self.client_address[1], urllib.parse.parse_qs(body.decode("utf-8"))))
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        payload = json.dumps({"success": status == 200}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        # Closing without a "Connection: close" header leaves the client
+        # holding what looks like a reusable keep-alive connection.
+        self.close_connection = self.server.drop_idle_connections
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def stub() -> Iterator[KeepAliveStub]:
+    registry.clear()
+    server = KeepAliveStub()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestVerificationTransport:
+    def test_connections_are_pooled_per_origin(self, stub: KeepAliveStub) -> None:
+        transport = VerificationTransport()
+
+        responses = [transport.post_form(stub.url, {"response": str(attempt)}) for attempt in range(3)]
+        transport.close()
+
+        assert [response.status for response in responses] == [200, 200, 200]
+        assert json.loads(responses[0].body) == {"success": True}
+        assert [form["response"] for _port, form in stub.requests] == [["0"], ["1"], ["2"]]
+        assert len({port for port, _form in stub.requests}) == 1
+        metrics = registry.snapshot()
+        assert metrics["contact_form.transport.connections{host=127.0.0.1,state=new}"] == 1
+        assert metrics["contact_form.transport.connections{host=127.0.0.1,state=reused}"] == 2
+        assert metrics["contact_form.transport.requests{host=127.0.0.1,outcome=200}"] == 3
+
+    def test_error_statuses_raise_http_errors(self, stub: KeepAliveStub) -> None:
+        stub.statuses = [503]
+        transport = VerificationTransport()
+
+        with pytest.raises(urllib.error.HTTPError) as exc_info:
+            transport.post_form(stub.url, {"response": "token"})
+        assert transport.post_form(stub.url, {"response": "token"}).status == 200
+        transport.close()
+
+        assert exc_info.value.code == 503
+        assert registry.snapshot()["contact_form.transport.requests{host=127.0.0.1,outcome=503}"] == 1
+
+    def test_stale_pooled_connections_are_replaced(self, stub: KeepAliveStub) -> None:
+        stub.drop_idle_connections = True
+        transport = VerificationTransport()
+        transport.post_form(stub.url, {"response": "first"})
+
+        assert transport.post_form(stub.url, {"response": "second"}).status == 200
+        transport.close()
+
+        assert [form["response"] for _port, form in stub.requests] == [["first"], ["second"]]
+        assert registry.snapshot()["contact_form.transport.connections{host=127.0.0.1,state=new}"] == 2
+
+    def test_stale_connection_retries_stop_at_the_deadline(self, stub: KeepAliveStub) -> None:
+        stub.drop_idle_connections = True
+        transport = VerificationTransport()
+        transport.post_form(stub.url, {"response": "first"})
+        clock = [1_000.0]
+        acquire = transport._acquire
+
+        def slow_acquire(origin: tuple[str, str, int], timeout: float) -> tuple[Any, bool]:
+            connection, reused = acquire(origin, timeout)
+            clock[0] += 3
+            return connection, reused
+
+        with (
+            patch("contact_form.transport.time.monotonic", side_effect=lambda: clock[0]),
+            patch.object(transport, "_acquire", side_effect=slow_acquire),
+            pytest.raises(TimeoutError),
+        ):
+            transport.post_form(stub.url, {"response": "second"}, timeout=2)
+        transport.close()
+
+        assert [form["response"] for _port, form in stub.requests] == [["first"]]
+        assert registry.snapshot()["contact_form.transport.connections{host=127.0.0.1,state=new}"] == 1
+
+    def test_refused_connections_surface_as_connection_errors(self) -> None:
+        transport = VerificationTransport()
+
+        with pytest.raises(ConnectionRefusedError):
+            transport.post_form("http://127.0.0.1:9/siteverify", {"response": "token"}, timeout=1)
+
+    def test_pool_size_caps_idle_connections(self, stub: KeepAliveStub) -> None:
+        transport = VerificationTransport(pool_size=1)
+        origin = ("http", "127.0.0.1", stub.server_address[1])
+        first, _reused = transport._acquire(origin, 1)
+        second, _reused = transport._acquire(origin, 1)
+
+        transport._release(origin, first)
+        transport._release(origin, second)
+
+        assert transport._idle[origin] == [first]
+        transport.close()
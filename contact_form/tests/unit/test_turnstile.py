@@ -1,28 +1,95 @@
 from __future__ import annotations
 
 import json
+import threading
 import urllib.error
 import urllib.parse
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 from django.core.exceptions import ValidationError
 
+from contact_form.metrics import registry
+from contact_form.notifications import build_captcha_error_key
+from contact_form.transport import TransportResponse
 from contact_form.turnstile import TURNSTILE_ACTION
 from contact_form.turnstile import TURNSTILE_TEST_SECRET_KEY
 from contact_form.turnstile import TURNSTILE_TEST_SITE_KEY
 from contact_form.turnstile import TURNSTILE_TOKEN_MAX_LENGTH
 from contact_form.turnstile import TurnstileField
 from contact_form.turnstile import TurnstileWidget
-
-
-def _mock_response(payload: dict[str, object] | list[object] | bytes) -> MagicMock:
-    response = MagicMock()
-    response.read.return_value = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
-    response.__enter__.return_value = response
-    response.__exit__.return_value = False
-    return response
+from contact_form.turnstile import VerificationResult
+
+
+def _mock_response(payload: dict[str, object] | list[object] | bytes) -> TransportResponse:
+    return TransportResponse(
+        status=200,
+        body=payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8"),
+    )
+
+
+class SiteverifyStub(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), SiteverifyStubHandler)
+        self.faults: list[str | int] = []
+        self.requests: list[dict[str, list[str]]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/siteverify"
+
+
+class SiteverifyStubHandler(BaseHTTPRequestHandler):
+    server: SiteverifyStub
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(urllib.parse.parse_qs(body.decode("utf-8")))
+        fault = self.server.faults.pop(0) if self.server.faults else None
+        if fault == "drop":
+            self.close_connection = True
+            self.connection.close()
+            return
+        status = fault if isinstance(fault, int) else 200
+        payload = json.dumps({"success": status == 200, "error-codes": []}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def siteverify_stub(settings: Any) -> Iterator[SiteverifyStub]:
+    settings.CONTACT_FORM_TURNSTILE_RETRY_BACKOFF_SECONDS = 0.01
+    registry.clear()
+    server = SiteverifyStub()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+
+def _stub_field(stub: SiteverifyStub) -> TurnstileField:
+    field = TurnstileField(
+        site_key=TURNSTILE_TEST_SITE_KEY,
+        secret_key=TURNSTILE_TEST_SECRET_KEY,
+        request=MagicMock(META={"REMOTE_ADDR": "127.0.0.1"}, get_host=MagicMock(return_value="localhost")),
+    )
+    field.VERIFY_URL = stub.url
+    return field
 
 
 class TestTurnstileWidget:
@@ -107,9 +174,9 @@ class TestTurnstileField:
         assert exc_info.value.code == "required"
         assert "complete the CAPTCHA" in str(exc_info.value)
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
-    def test_verify_turnstile_success(self, mock_urlopen: MagicMock) -> None:
-        mock_urlopen.return_value = _mock_response(
+    @patch("contact_form.transport.VerificationTransport.post_form")
+    def test_verify_turnstile_success(self, mock_post_form: MagicMock) -> None:
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "gsthr.org",
@@ -128,12 +195,12 @@ class TestTurnstileField:
         assert success is True
         assert error == ""
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_fails_closed_without_expected_action(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "gsthr.org",
@@ -151,12 +218,12 @@ class TestTurnstileField:
         assert success is False
         assert error == "Verification Failed: ['action-not-configured']"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_fails_closed_without_expected_hostname(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "gsthr.org",
@@ -174,9 +241,9 @@ class TestTurnstileField:
         assert success is False
         assert error == "Verification Failed: ['hostname-not-configured']"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
-    def test_verify_turnstile_posts_remote_ip(self, mock_urlopen: MagicMock) -> None:
-        mock_urlopen.return_value = _mock_response({"success": True})
+    @patch("contact_form.transport.VerificationTransport.post_form")
+    def test_verify_turnstile_posts_remote_ip(self, mock_post_form: MagicMock) -> None:
+        mock_post_form.return_value = _mock_response({"success": True})
         field = TurnstileField(
             site_key="test-site-key",
             secret_key="test-secret-key",
@@ -185,13 +252,12 @@ class TestTurnstileField:
 
         field._verify_turnstile("test-token")
 
-        request = mock_urlopen.call_args.args[0]
-        posted_data = urllib.parse.parse_qs(request.data.decode("utf-8"))
-        assert posted_data["remoteip"] == ["203.0.113.10"]
+        posted_data = mock_post_form.call_args.args[1]
+        assert posted_data["remoteip"] == "203.0.113.10"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
-    def test_verify_turnstile_failure(self, mock_urlopen: MagicMock) -> None:
-        mock_urlopen.return_value = _mock_response(
+    @patch("contact_form.transport.VerificationTransport.post_form")
+    def test_verify_turnstile_failure(self, mock_post_form: MagicMock) -> None:
+        mock_post_form.return_value = _mock_response(
             {
                 "success": False,
                 "error-codes": ["invalid-input-response"],
@@ -204,12 +270,12 @@ class TestTurnstileField:
         assert success is False
         assert error == "Verification Failed: ['invalid-input-response']"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_rejects_action_mismatch(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "gsthr.org",
@@ -228,12 +294,12 @@ class TestTurnstileField:
         assert success is False
         assert error == "Verification Failed: ['action-mismatch']"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_rejects_hostname_mismatch(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "attacker.example",
@@ -252,12 +318,12 @@ class TestTurnstileField:
         assert success is False
         assert error == "Verification Failed: ['hostname-mismatch']"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_normalizes_expected_hostname(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "gsthr.org",
@@ -276,12 +342,12 @@ class TestTurnstileField:
         assert success is True
         assert error == ""
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_documented_test_keys_bypass_context_checks(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "example.com",
@@ -301,12 +367,12 @@ class TestTurnstileField:
         assert success is True
         assert error == ""
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_documented_test_keys_do_not_bypass_checks_on_production_host(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "example.com",
@@ -325,12 +391,12 @@ class TestTurnstileField:
         assert success is False
         assert error == "Verification Failed: ['action-mismatch']"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_partial_test_key_pair_does_not_bypass_context_checks(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": True,
                 "hostname": "example.com",
@@ -359,13 +425,13 @@ class TestTurnstileField:
         assert field.expected_hostnames == frozenset()
 
     @patch("contact_form.notifications.notify_captcha_error")
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_validation_passes_page_to_error_notification(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
         mock_notify: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response(
+        mock_post_form.return_value = _mock_response(
             {
                 "success": False,
                 "error-codes": ["invalid-input-response"],
@@ -394,10 +460,10 @@ class TestTurnstileField:
         assert success is False
         assert "not configured" in error.lower()
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_rejects_oversized_token_without_api_request(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
         field = TurnstileField(site_key="test-site-key", secret_key="test-secret-key")
 
@@ -405,14 +471,14 @@ class TestTurnstileField:
 
         assert success is False
         assert error == "Verification Failed: ['invalid-input-response']"
-        mock_urlopen.assert_not_called()
+        mock_post_form.assert_not_called()
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
+    @patch("contact_form.transport.VerificationTransport.post_form")
     def test_verify_turnstile_rejects_invalid_response_shape(
         self,
-        mock_urlopen: MagicMock,
+        mock_post_form: MagicMock,
     ) -> None:
-        mock_urlopen.return_value = _mock_response([{"success": True}])
+        mock_post_form.return_value = _mock_response([{"success": True}])
         field = TurnstileField(site_key="test-site-key", secret_key="test-secret-key")
 
         success, error = field._verify_turnstile("test-token")
@@ -420,12 +486,197 @@ class TestTurnstileField:
         assert success is False
         assert error == "API Response Parsing Failed: invalid-response-shape"
 
-    @patch("contact_form.turnstile.urllib.request.urlopen")
-    def test_verify_turnstile_network_error(self, mock_urlopen: MagicMock) -> None:
-        mock_urlopen.side_effect = urllib.error.URLError("Network error")
+    @patch("contact_form.transport.VerificationTransport.post_form")
+    def test_verify_turnstile_network_error(self, mock_post_form: MagicMock) -> None:
+        mock_post_form.side_effect = urllib.error.URLError("Network error")
         field = TurnstileField(site_key="test-site-key", secret_key="test-secret-key")
 
         success, error = field._verify_turnstile("test-token")
 
         assert success is False
         assert error == "API Request Failed: Network error"
+
+
+class TestTurnstilePrefetch:
+    def test_prefetched_verification_is_used_by_validation(self) -> None:
+        field = TurnstileField(secret_key="secret-key")
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+            future = field.prefetch("token")
+            field.validate("token")
+
+        assert future is not None and future.done()
+        verifier.assert_called_once_with("token", remote_ip=None, request=None)
+
+    def test_prefetch_for_another_token_is_ignored(self) -> None:
+        field = TurnstileField(secret_key="secret-key")
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+            field.prefetch("first-token").result(timeout=5)
+            field.validate("second-token")
+
+        assert [call.args for call in verifier.call_args_list] == [("first-token",), ("second-token",)]
+
+    def test_saturated_pool_falls_back_to_inline_verification(self, settings: Any) -> None:
+        settings.CONTACT_FORM_TURNSTILE_PREFETCH_WORKERS = 1
+        release = threading.Event()
+        blocker = TurnstileField(secret_key="secret-key")
+        field = TurnstileField(secret_key="secret-key")
+
+        def verify(token: str, **kwargs: Any) -> tuple[bool, str]:
+            return release.wait(5), ""
+
+        with patch.object(TurnstileField, "_verify_turnstile", side_effect=verify):
+            blocker.prefetch("blocking-token")
+            assert field.prefetch("token") is None
+            release.set()
+            blocker.cancel_prefetch()
+            field.validate("token")
+
+    def test_prefetch_skips_tokens_that_cannot_be_valid(self) -> None:
+        field = TurnstileField(secret_key="secret-key")
+
+        with patch.object(TurnstileField, "_verify_turnstile") as verifier:
+            assert field.prefetch(None) is None
+            assert field.prefetch("") is None
+            assert field.prefetch("x" * (TURNSTILE_TOKEN_MAX_LENGTH + 1)) is None
+
+        verifier.assert_not_called()
+
+    def test_worker_gets_the_remote_ip_instead_of_the_request(self, rf: Any) -> None:
+        request = rf.post("/contact/", REMOTE_ADDR="198.51.100.7")
+        field = TurnstileField(secret_key="secret-key", request=request)
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+            field.prefetch("token").result(timeout=5)
+
+        verifier.assert_called_once_with("token", remote_ip="198.51.100.7", request=None)
+
+
+class TestTurnstileRetries:
+    @pytest.mark.parametrize("fault", [503, 502, "drop"])
+    def test_transient_failures_are_retried_with_the_same_idempotency_key(
+        self,
+        siteverify_stub: SiteverifyStub,
+        fault: str | int,
+    ) -> None:
+        siteverify_stub.faults = [fault]
+
+        assert _stub_field(siteverify_stub)._verify_turnstile("token") == (True, "")
+        idempotency_keys = [request["idempotency_key"] for request in siteverify_stub.requests]
+        assert len(idempotency_keys) == 2
+        assert idempotency_keys[0] == idempotency_keys[1]
+        metrics = registry.snapshot()
+        assert sum(value for name, value in metrics.items() if name.startswith("contact_form.turnstile")) == 1
+
+    def test_each_verification_uses_a_new_idempotency_key(self, siteverify_stub: SiteverifyStub) -> None:
+        field = _stub_field(siteverify_stub)
+
+        field._verify_turnstile("first-token")
+        field._verify_turnstile("second-token")
+
+        first, second = (request["idempotency_key"] for request in siteverify_stub.requests)
+        assert first != second
+
+    def test_client_errors_are_not_retried(self, siteverify_stub: SiteverifyStub) -> None:
+        siteverify_stub.faults = [400]
+
+        assert _stub_field(siteverify_stub)._verify_turnstile("token") == (False, "API Request Failed: HTTP 400")
+        assert len(siteverify_stub.requests) == 1
+
+    def test_attempts_are_bounded(self, siteverify_stub: SiteverifyStub, settings: Any) -> None:
+        settings.CONTACT_FORM_TURNSTILE_MAX_ATTEMPTS = 2
+        siteverify_stub.faults = [503, 503, 503]
+
+        with patch("contact_form.notifications.notify_captcha_error") as notify:
+            with pytest.raises(ValidationError):
+                _stub_field(siteverify_stub).validate("token")
+
+        assert len(siteverify_stub.requests) == 2
+        notify.assert_called_once()
+        assert notify.call_args.kwargs["error_message"] == "API Request Failed: HTTP 503"
+
+    def test_backoff_stops_at_the_deadline(self, siteverify_stub: SiteverifyStub, settings: Any) -> None:
+        settings.CONTACT_FORM_TURNSTILE_MAX_ATTEMPTS = 10
+        settings.CONTACT_FORM_TURNSTILE_DEADLINE_SECONDS = 1
+        settings.CONTACT_FORM_TURNSTILE_RETRY_BACKOFF_SECONDS = 5
+        siteverify_stub.faults = [503] * 10
+
+        with patch("contact_form.turnstile.time.sleep") as sleep:
+            success, _error = _stub_field(siteverify_stub)._verify_turnstile("token")
+
+        assert success is False
+        assert len(siteverify_stub.requests) == sleep.call_count + 1
+        assert all(call.args[0] < 1 for call in sleep.call_args_list)
+
+
+class TestVerificationResult:
+    @patch("contact_form.transport.VerificationTransport.post_form")
+    def test_failures_carry_structured_context(self, mock_post_form: MagicMock) -> None:
+        mock_post_form.return_value = _mock_response(
+            {"success": True, "action": "signup", "hostname": "example.com"},
+        )
+        field = TurnstileField(
+            secret_key="test-secret-key",
+            expected_action=TURNSTILE_ACTION,
+            expected_hostnames=["example.com"],
+        )
+
+        result = field._verify_turnstile("test-token")
+
+        assert isinstance(result, VerificationResult)
+        assert result.category == "verification"
+        assert result.error_codes == ("action-mismatch",)
+        assert (result.hostname, result.action) == ("example.com", "signup")
+        assert result.elapsed_seconds >= 0
+        success, message = result
+        assert (success, message) == (False, "Verification Failed: ['action-mismatch']")
+        assert result == (False, "Verification Failed: ['action-mismatch']")
+
+    @pytest.mark.parametrize(
+        "result",
+        [
+            VerificationResult(
+                success=False,
+                message="Verification Failed: ['timeout-or-duplicate', 'bad-request']",
+                category="verification",
+                error_codes=("timeout-or-duplicate", "bad-request"),
+            ),
+            VerificationResult(
+                success=False,
+                message="Verification Failed: []",
+                category="verification",
+            ),
+            VerificationResult(
+                success=False,
+                message="Turnstile Secret Key is Not Configured",
+                category="configuration",
+                error_codes=("missing-secret",),
+            ),
+            VerificationResult(success=False, message="API Request Failed: HTTP 503", category="transport"),
+            VerificationResult(success=False, message="API Response Parsing Failed: x", category="response"),
+            VerificationResult(success=False, message="Unexpected Error: boom", category="unexpected"),
+        ],
+    )
+    def test_error_key_matches_the_legacy_message_parser(self, result: VerificationResult) -> None:
+        legacy_key = build_captcha_error_key("Cloudflare Turnstile", result.message)
+
+        with patch("contact_form.notifications.ast.literal_eval") as literal_eval:
+            structured_key = build_captcha_error_key("Cloudflare Turnstile", result.message, result=result)
+
+        assert structured_key == legacy_key
+        literal_eval.assert_not_called()
+
+    @patch("contact_form.transport.VerificationTransport.post_form")
+    def test_notification_receives_the_structured_result(self, mock_post_form: MagicMock) -> None:
+        mock_post_form.return_value = _mock_response({"success": False, "error-codes": ["invalid-input-response"]})
+        field = TurnstileField(secret_key="test-secret-key")
+
+        with patch("contact_form.notifications.notify_captcha_error") as notify:
+            with pytest.raises(ValidationError):
+                field.validate("test-token")
+
+        result = notify.call_args.kwargs["result"]
+        assert result.error_codes == ("invalid-input-response",)
+        assert notify.call_args.kwargs["error_message"] == "Verification Failed: ['invalid-input-response']"
+        assert "verification_seconds" in notify.call_args.kwargs["extra_data"]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from contact_form.checks import check_contact_form_security_settings
+from contact_form.forms import ContactFormBuilder
+from contact_form.metrics import registry
+from contact_form.models import ContactPage
+from contact_form.rejections import clear_rejection_cache
+from contact_form.security import get_local_verdict_cache
+from contact_form.settings import CaptchaSettings
+from contact_form.tests.unit.test_clearance import create_turnstile_page
+from contact_form.tests.unit.test_contact_page import securely_post_form
+from contact_form.turnstile import TurnstileField
+from contact_form.validators import DisposableDomainIndex
+from contact_form.validators import clear_disposable_domain_index
+from contact_form.validators import get_disposable_domain_index
+from contact_form.validators import is_disposable_email
+from contact_form.validators import validate_non_disposable_email
+
+
+@pytest.fixture(autouse=True)
+def clear_index() -> None:
+    clear_disposable_domain_index()
+
+
+class TestDisposableDomainIndex:
+    @pytest.mark.parametrize(
+        ("domain", "is_disposable"),
+        [
+            ("mailinator.com", True),
+            ("MAILINATOR.COM.", True),
+            ("inbox.mailinator.com", True),
+            ("notmailinator.com", False),
+            ("mailinator.com.example.org", False),
+            ("com", False),
+            ("exämple.test", True),
+        ],
+    )
+    def test_suffixes_match_on_label_boundaries(self, domain: str, is_disposable: bool) -> None:
+        index = DisposableDomainIndex(["mailinator.com", "xn--exmple-cua.test", " "])
+
+        assert index.matches(domain) is is_disposable
+        assert len(index) == 2
+
+    def test_bundled_list_is_loaded_lazily(self) -> None:
+        assert is_disposable_email("someone@yopmail.com")
+        assert not is_disposable_email("someone@example.com")
+        assert not is_disposable_email("not-an-address")
+
+        with pytest.raises(ValidationError) as exc_info:
+            validate_non_disposable_email("someone@guerrillamail.com")
+        assert exc_info.value.code == "disposable_email"
+
+    @pytest.mark.parametrize("domain", ["gmail.com", "outlook.com", "yahoo.com", "proton.me", "icloud.com"])
+    def test_bundled_list_spares_permanent_providers(self, domain: str) -> None:
+        assert len(get_disposable_domain_index()) > 5_000
+        assert not is_disposable_email(f"someone@{domain}")
+
+    def test_configured_file_is_reloaded_when_it_changes(self, settings: Any, tmp_path: Path) -> None:
+        domains_file = tmp_path / "domains.txt"
+        domains_file.write_text("# local list\nthrowaway.test\n", encoding="utf-8")
+        settings.CONTACT_FORM_DISPOSABLE_EMAIL_DOMAINS_FILE = str(domains_file)
+        index = get_disposable_domain_index()
+
+        assert get_disposable_domain_index() is index
+        assert not is_disposable_email("someone@yopmail.com")
+
+        domains_file.write_text("throwaway.test\nburner.test\n", encoding="utf-8")
+
+        assert is_disposable_email("someone@burner.test")
+
+    def test_unreadable_file_is_reported(self, settings: Any, tmp_path: Path) -> None:
+        settings.CONTACT_FORM_DISPOSABLE_EMAIL_DOMAINS_FILE = str(tmp_path / "missing.txt")
+
+        assert "contact_form.E020" in {message.id for message in check_contact_form_security_settings()}
+        assert not is_disposable_email("someone@yopmail.com")
+
+
+@pytest.mark.django_db
+class TestDisposableEmailField:
+    @pytest.fixture
+    def contact_page(self, db: Any) -> ContactPage:
+        cache.clear()
+        registry.clear()
+        get_local_verdict_cache().clear()
+        clear_rejection_cache()
+        CaptchaSettings.objects.update_or_create(
+            defaults={
+                "turnstile_site_key": "configured-site-key",
+                "turnstile_secret_key": "configured-secret-key",
+            }
+        )
+        page = create_turnstile_page("Contact Us")
+        page.reject_disposable_emails = True
+        page.save(update_fields=("reject_disposable_emails",))
+        return page
+
+    def test_validator_is_only_added_when_enabled(self, contact_page: ContactPage) -> None:
+        def email_validators(page: ContactPage) -> list[Any]:
+            return ContactFormBuilder(page.form_fields.all(), page=page).formfields["e_mail_address"].validators
+
+        assert validate_non_disposable_email in email_validators(contact_page)
+
+        contact_page.reject_disposable_emails = False
+
+        assert validate_non_disposable_email not in email_validators(contact_page)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"full_name": "John Doe", "e_mail_address": "john@yopmail.com", "message": "Hello"},
+            {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": ""},
+        ],
+    )
+    def test_invalid_fields_skip_captcha_verification(
+        self,
+        client: Any,
+        contact_page: ContactPage,
+        data: dict[str, str],
+    ) -> None:
+        now = time.time()
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+            response, _post_data = securely_post_form(
+                client=client,
+                page=contact_page,
+                data=data,
+                issued_at=now - 10,
+                submitted_at=now,
+            )
+
+        assert response.context["form"].errors
+        assert "wagtailcaptcha" not in response.context["form"].errors
+        verifier.assert_not_called()
+        assert registry.get("contact_form.captcha.skipped_verifications") == 1
+
+    def test_valid_fields_verify_the_captcha_last(self, client: Any, contact_page: ContactPage) -> None:
+        now = time.time()
+        data = {"full_name": "John Doe", "e_mail_address": "john@example.com", "message": "Hello"}
+
+        with patch.object(TurnstileField, "_verify_turnstile", return_value=(True, "")) as verifier:
+            response, _post_data = securely_post_form(
+                client=client,
+                page=contact_page,
+                data=data,
+                issued_at=now - 10,
+                submitted_at=now,
+            )
+
+        assert b"Thank you for your submission!" in response.content
+        verifier.assert_called_once()
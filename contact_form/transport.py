@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import http.client
+import threading
+import time
+import urllib.error
+import urllib.parse
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from contact_form.metrics import increment_counter
+from contact_form.security import get_positive_int_setting
+
+DEFAULT_VERIFY_TIMEOUT_SECONDS = 10
+DEFAULT_VERIFY_POOL_SIZE = 8
+DEFAULT_VERIFY_RESPONSE_MAX_BYTES = 65_536
+
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+@dataclass(frozen=True, slots=True)
+class TransportResponse:
+    status: int
+    body: bytes
+
+
+def get_verify_timeout_seconds() -> int:
+    return get_positive_int_setting("CONTACT_FORM_VERIFY_TIMEOUT_SECONDS", DEFAULT_VERIFY_TIMEOUT_SECONDS)
+
+
+def _remaining_seconds(deadline: float) -> float:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Verification request deadline exceeded.")
+    return remaining
+
+
+def _set_timeout(connection: http.client.HTTPConnection, timeout: float) -> None:
+    connection.timeout = timeout
+    if connection.sock is not None:
+        connection.sock.settimeout(timeout)
+
+
+class VerificationTransport:
+    def __init__(self, *, pool_size: int = DEFAULT_VERIFY_POOL_SIZE) -> None:
+        self.pool_size = pool_size
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def post_form(
+        self,
+        url: str,
+        data: Mapping[str, str],
+        *,
+        timeout: float | None = None,
+        max_bytes: int = DEFAULT_VERIFY_RESPONSE_MAX_BYTES,
+    ) -> TransportResponse:
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https") or not parsed.hostname:
+            raise ValueError(f"Unsupported verification URL: {url!r}")
+        origin = (parsed.scheme, parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80))
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        body = urllib.parse.urlencode(data).encode("utf-8")
+        timeout = min(get_verify_timeout_seconds(), timeout if timeout is not None else float("inf"))
+        deadline = time.monotonic() + timeout
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self._send(origin, path, body, deadline=deadline, max_bytes=max_bytes)
+            outcome = str(response.status)
+        except (TimeoutError, OSError, http.client.HTTPException) as exc:
+            outcome = type(exc).__name__
+            if isinstance(exc, (TimeoutError, ConnectionError, http.client.HTTPException)):
+                raise
+            raise urllib.error.URLError(exc) from exc
+        finally:
+            increment_counter("contact_form.transport.requests", host=origin[1], outcome=outcome)
+            increment_counter("contact_form.transport.seconds", time.perf_counter() - started, host=origin[1])
+
+        if response.status >= 400:
+            reason = http.client.responses.get(response.status, "")
+            raise urllib.error.HTTPError(url, response.status, reason, None, None)
+        return response
+
+    def _send(
+        self,
+        origin: tuple[str, str, int],
+        path: str,
+        body: bytes,
+        *,
+        deadline: float,
+        max_bytes: int,
+    ) -> TransportResponse:
+        # Socket timeouts bound each operation, not the request, so every
+        # step (and any stale-connection retry) gets only what is left.
+        while True:
+            connection, reused = self._acquire(origin, _remaining_seconds(deadline))
+            try:
+                connection.request(
+                    "POST",
+                    path,
+                    body=body,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                )
+                _set_timeout(connection, _remaining_seconds(deadline))
+                response = connection.getresponse()
+                _set_timeout(connection, _remaining_seconds(deadline))
+                payload = response.read(max_bytes + 1)
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                # A pooled connection the server already closed fails before
+                # anything is processed, so one fresh attempt is safe.
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+
+            if response.will_close or not response.isclosed():
+                connection.close()
+            else:
+                self._release(origin, connection)
+            return TransportResponse(status=response.status, body=payload)
+
+    def _acquire(self, origin: tuple[str, str, int], timeout: float) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(origin)
+            connection = idle.pop() if idle else None
+        if connection is not None:
+            _set_timeout(connection, timeout)
+            increment_counter("contact_form.transport.connections", host=origin[1], state="reused")
+            return connection, True
+
+        scheme, host, port = origin
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        increment_counter("contact_form.transport.connections", host=host, state="new")
+        return connection_class(host, port, timeout=timeout), False
+
+    def _release(self, origin: tuple[str, str, int], connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.pool_size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+
+_transport: VerificationTransport | None = None
+_transport_lock = threading.Lock()
+
+
+def get_verification_transport() -> VerificationTransport:
+    global _transport
+
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = VerificationTransport(
+                    pool_size=get_positive_int_setting("CONTACT_FORM_VERIFY_POOL_SIZE", DEFAULT_VERIFY_POOL_SIZE),
+                )
+    return _transport
+
+
+def close_verification_transport() -> None:
+    global _transport
+
+    with _transport_lock:
+        transport, _transport = _transport, None
+    if transport is not None:
+        transport.close()
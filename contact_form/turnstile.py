@@ -1,22 +1,36 @@
 from __future__ import annotations
 
+import http.client
 import json
 import logging
+import random
+import threading
+import time
 import urllib.error
-import urllib.parse
-import urllib.request
+import uuid
 from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Mapping
+from concurrent.futures import CancelledError
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 from typing import Any
 
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from contact_form.context import get_request_environment
+from contact_form.metrics import increment_counter
+from contact_form.security import get_client_ip
+from contact_form.security import get_positive_int_setting
 from contact_form.utils import TURNSTILE_TEST_SECRET_KEY
 from contact_form.utils import TURNSTILE_TEST_SITE_KEY
-from contact_form.utils import is_localhost
+from contact_form.utils import normalize_hostname
 
 if TYPE_CHECKING:
     from django.http import HttpRequest
@@ -30,19 +44,104 @@ TURNSTILE_RESPONSE_FIELD_NAME = "cf-turnstile-response"
 TURNSTILE_TOKEN_MAX_LENGTH = 2048
 TURNSTILE_VERIFY_TIMEOUT_SECONDS = 10
 TURNSTILE_VERIFY_RESPONSE_MAX_BYTES = 65_536
+DEFAULT_TURNSTILE_PREFETCH_WORKERS = 8
+DEFAULT_TURNSTILE_MAX_ATTEMPTS = 3
+DEFAULT_TURNSTILE_DEADLINE_SECONDS = TURNSTILE_VERIFY_TIMEOUT_SECONDS
+DEFAULT_TURNSTILE_RETRY_BACKOFF_SECONDS = 0.25
 
+VERIFICATION_CATEGORY_SUCCESS = "success"
+VERIFICATION_CATEGORY_VERIFICATION = "verification"
+VERIFICATION_CATEGORY_CONFIGURATION = "configuration"
+VERIFICATION_CATEGORY_TRANSPORT = "transport"
+VERIFICATION_CATEGORY_RESPONSE = "response"
+VERIFICATION_CATEGORY_UNEXPECTED = "unexpected"
 
-def _normalize_hostname(hostname: str) -> str:
-    candidate = hostname.strip()
-    if not candidate:
-        return ""
+_TRANSIENT_TRANSPORT_ERRORS = (urllib.error.URLError, TimeoutError, ConnectionError, http.client.HTTPException)
 
+_UNSET: Any = object()
+
+_prefetch_executor: tuple[int, ThreadPoolExecutor, threading.BoundedSemaphore] | None = None
+_prefetch_executor_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class VerificationResult:
+    success: bool
+    message: str = ""
+    category: str = VERIFICATION_CATEGORY_SUCCESS
+    error_codes: tuple[str, ...] = ()
+    hostname: str | None = None
+    action: str | None = None
+    elapsed_seconds: float = 0.0
+
+    def __iter__(self) -> Iterator[Any]:
+        # Unpacks like the legacy ``(success, message)`` tuple.
+        yield self.success
+        yield self.message
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, tuple):
+            return (self.success, self.message) == other
+        if isinstance(other, VerificationResult):
+            return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+
+def _verification_failure(*error_codes: str, **kwargs: Any) -> VerificationResult:
+    return VerificationResult(
+        success=False,
+        message=f"Verification Failed: {list(error_codes)}",
+        category=VERIFICATION_CATEGORY_VERIFICATION,
+        error_codes=error_codes,
+        **kwargs,
+    )
+
+
+def is_turnstile_prefetch_enabled() -> bool:
+    return bool(getattr(settings, "CONTACT_FORM_TURNSTILE_PREFETCH", False))
+
+
+def get_turnstile_deadline_seconds() -> int:
+    return get_positive_int_setting("CONTACT_FORM_TURNSTILE_DEADLINE_SECONDS", DEFAULT_TURNSTILE_DEADLINE_SECONDS)
+
+
+def get_turnstile_retry_backoff_seconds() -> float:
+    raw_value = getattr(
+        settings,
+        "CONTACT_FORM_TURNSTILE_RETRY_BACKOFF_SECONDS",
+        DEFAULT_TURNSTILE_RETRY_BACKOFF_SECONDS,
+    )
     try:
-        parsed = urllib.parse.urlsplit(candidate if "://" in candidate else f"//{candidate}")
-        normalized = (parsed.hostname or candidate).rstrip(".").lower()
-        return normalized.encode("idna").decode("ascii")
-    except (UnicodeError, ValueError):
-        return ""
+        value = float(raw_value)
+    except (TypeError, ValueError):
+        return DEFAULT_TURNSTILE_RETRY_BACKOFF_SECONDS
+    return value if value > 0 else DEFAULT_TURNSTILE_RETRY_BACKOFF_SECONDS
+
+
+def _get_prefetch_executor() -> tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    global _prefetch_executor
+
+    workers = get_positive_int_setting("CONTACT_FORM_TURNSTILE_PREFETCH_WORKERS", DEFAULT_TURNSTILE_PREFETCH_WORKERS)
+    with _prefetch_executor_lock:
+        if _prefetch_executor is None or _prefetch_executor[0] != workers:
+            if _prefetch_executor is not None:
+                _prefetch_executor[1].shutdown(wait=False)
+            # The semaphore bounds queued work as well as running work, so a
+            # burst falls back to inline verification instead of piling up.
+            _prefetch_executor = (
+                workers,
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="contact-form-turnstile"),
+                threading.BoundedSemaphore(workers),
+            )
+        return _prefetch_executor[1], _prefetch_executor[2]
+
+
+def _normalize_hostname(hostname: str, request: HttpRequest | None = None) -> str:
+    if request is not None:
+        return get_request_environment(request).normalize_hostname(hostname)
+    return normalize_hostname(hostname)
 
 
 class TurnstileWidget(forms.Widget):
@@ -129,15 +228,17 @@ class TurnstileField(forms.Field):
         self.expected_action = expected_action
         hostname_values = (expected_hostnames,) if isinstance(expected_hostnames, str) else expected_hostnames or ()
         self.expected_hostnames = frozenset(
-            normalized for hostname in hostname_values if (normalized := _normalize_hostname(hostname))
+            normalized for hostname in hostname_values if (normalized := _normalize_hostname(hostname, request))
         )
         self._uses_test_keys = (
             site_key == TURNSTILE_TEST_SITE_KEY
             and secret_key == TURNSTILE_TEST_SECRET_KEY
             and request is not None
-            and is_localhost(request)
+            and get_request_environment(request).is_localhost
         )
 
+        self._prefetched: tuple[str, Future[VerificationResult]] | None = None
+
         kwargs["widget"] = TurnstileWidget(
             site_key=site_key,
             theme=theme,
@@ -157,15 +258,56 @@ class TurnstileField(forms.Field):
                 code="missing_turnstile",
             )
 
-        success, error_info = self._verify_turnstile(value)
+        result = self._verification_result(value)
+        success, error_info = result
         if not success:
-            self._notify_error(error_info)
+            self._notify_error(error_info, result if isinstance(result, VerificationResult) else None)
             raise ValidationError(
                 self.error_messages["invalid"],
                 code="invalid_turnstile",
             )
 
-    def _notify_error(self, error_info: str) -> None:
+    def prefetch(self, token: Any) -> Future[VerificationResult] | None:
+        if not isinstance(token, str) or not token or len(token) > TURNSTILE_TOKEN_MAX_LENGTH:
+            return None
+
+        remote_ip = self.remote_ip
+        if remote_ip is None and self.request is not None:
+            remote_ip = get_client_ip(self.request)
+
+        executor, slots = _get_prefetch_executor()
+        if not slots.acquire(blocking=False):
+            return None
+        try:
+            future = executor.submit(self._verify_turnstile, token, remote_ip=remote_ip, request=None)
+        except RuntimeError:
+            slots.release()
+            return None
+        future.add_done_callback(lambda _future: slots.release())
+        self._prefetched = (token, future)
+        return future
+
+    def cancel_prefetch(self) -> None:
+        if self._prefetched is not None:
+            self._prefetched[1].cancel()
+            self._prefetched = None
+
+    def _verification_result(self, token: str) -> VerificationResult:
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[0] == token:
+            try:
+                return prefetched[1].result(timeout=get_turnstile_deadline_seconds() + 1)
+            except CancelledError:
+                pass
+            except FutureTimeoutError:
+                return VerificationResult(
+                    success=False,
+                    message="API Request Failed: prefetched verification timed out",
+                    category=VERIFICATION_CATEGORY_TRANSPORT,
+                )
+        return self._verify_turnstile(token)
+
+    def _notify_error(self, error_info: str, result: VerificationResult | None = None) -> None:
         try:
             from contact_form.notifications import notify_captcha_error
 
@@ -176,6 +318,12 @@ class TurnstileField(forms.Field):
                 extra_data["expected_action"] = self.expected_action
             if self.expected_hostnames:
                 extra_data["expected_hostnames"] = ", ".join(sorted(self.expected_hostnames))
+            if result is not None:
+                if result.hostname:
+                    extra_data["response_hostname"] = result.hostname
+                if result.action:
+                    extra_data["response_action"] = result.action
+                extra_data["verification_seconds"] = f"{result.elapsed_seconds:.3f}"
 
             notify_captcha_error(
                 error_message=error_info,
@@ -183,6 +331,7 @@ class TurnstileField(forms.Field):
                 page=self.page,
                 provider="Cloudflare Turnstile",
                 extra_data=extra_data,
+                result=result,
             )
         except Exception as exc:
             logger.debug(
@@ -190,15 +339,40 @@ class TurnstileField(forms.Field):
                 str(exc),
             )
 
-    def _verify_turnstile(self, token: str) -> tuple[bool, str]:
+    def _verify_turnstile(
+        self,
+        token: str,
+        *,
+        remote_ip: Any = _UNSET,
+        request: Any = _UNSET,
+    ) -> VerificationResult:
+        started = time.monotonic()
+        if remote_ip is _UNSET:
+            remote_ip = self.remote_ip
+        if request is _UNSET:
+            request = self.request
+
+        def failure(message: str, category: str) -> VerificationResult:
+            return VerificationResult(
+                success=False,
+                message=message,
+                category=category,
+                elapsed_seconds=time.monotonic() - started,
+            )
+
         if not self.secret_key:
-            return False, "Turnstile Secret Key is Not Configured"
+            return VerificationResult(
+                success=False,
+                message="Turnstile Secret Key is Not Configured",
+                category=VERIFICATION_CATEGORY_CONFIGURATION,
+                error_codes=("missing-secret",),
+            )
 
         if not isinstance(token, str) or not token:
-            return False, "Verification Failed: ['missing-input-response']"
+            return _verification_failure("missing-input-response")
 
         if len(token) > TURNSTILE_TOKEN_MAX_LENGTH:
-            return False, "Verification Failed: ['invalid-input-response']"
+            return _verification_failure("invalid-input-response")
 
         try:
             verify_data: dict[str, str] = {
@@ -206,61 +380,99 @@ class TurnstileField(forms.Field):
                 "response": token,
             }
 
-            if self.remote_ip:
-                verify_data["remoteip"] = self.remote_ip
-
-            data = urllib.parse.urlencode(verify_data).encode("utf-8")
-            request = urllib.request.Request(
-                self.VERIFY_URL,
-                data=data,
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-                method="POST",
-            )
+            if remote_ip:
+                verify_data["remoteip"] = remote_ip
 
-            with urllib.request.urlopen(
-                request,
-                timeout=TURNSTILE_VERIFY_TIMEOUT_SECONDS,
-            ) as response:
-                raw_response = response.read(TURNSTILE_VERIFY_RESPONSE_MAX_BYTES + 1)
+            # Retries share one key so Cloudflare returns the original outcome
+            # instead of rejecting the token as already spent.
+            verify_data["idempotency_key"] = str(uuid.uuid4())
+            raw_response = self._post_siteverify(verify_data)
 
             if len(raw_response) > TURNSTILE_VERIFY_RESPONSE_MAX_BYTES:
-                return False, "API Response Parsing Failed: response-too-large"
+                return failure("API Response Parsing Failed: response-too-large", VERIFICATION_CATEGORY_RESPONSE)
 
             result = json.loads(raw_response.decode("utf-8"))
             if not isinstance(result, dict):
-                return False, "API Response Parsing Failed: invalid-response-shape"
+                return failure("API Response Parsing Failed: invalid-response-shape", VERIFICATION_CATEGORY_RESPONSE)
+
+            response_hostname = result.get("hostname")
+            response_hostname = response_hostname if isinstance(response_hostname, str) else None
+            response_action = result.get("action")
+            response_action = response_action if isinstance(response_action, str) else None
+            context = {
+                "hostname": response_hostname,
+                "action": response_action,
+                "elapsed_seconds": time.monotonic() - started,
+            }
 
             if result.get("success") is not True:
                 error_codes = result.get("error-codes", [])
                 if not isinstance(error_codes, list):
                     error_codes = [str(error_codes)] if error_codes else []
-                normalized_error_codes = [str(code) for code in error_codes]
-                return False, f"Verification Failed: {normalized_error_codes}"
+                return _verification_failure(*(str(code) for code in error_codes), **context)
 
             if self._uses_test_keys:
-                return True, ""
+                return VerificationResult(success=True, **context)
 
             if not self.expected_action:
-                return False, "Verification Failed: ['action-not-configured']"
+                return _verification_failure("action-not-configured", **context)
 
-            if result.get("action") != self.expected_action:
-                return False, "Verification Failed: ['action-mismatch']"
+            if response_action != self.expected_action:
+                return _verification_failure("action-mismatch", **context)
 
             if not self.expected_hostnames:
-                return False, "Verification Failed: ['hostname-not-configured']"
+                return _verification_failure("hostname-not-configured", **context)
 
-            response_hostname = result.get("hostname")
-            normalized_hostname = _normalize_hostname(response_hostname) if isinstance(response_hostname, str) else ""
+            normalized_hostname = (
+                _normalize_hostname(response_hostname, request) if response_hostname is not None else ""
+            )
             if normalized_hostname not in self.expected_hostnames:
-                return False, "Verification Failed: ['hostname-mismatch']"
+                return _verification_failure("hostname-mismatch", **context)
 
-            return True, ""
+            return VerificationResult(success=True, **context)
 
         except urllib.error.HTTPError as exc:
-            return False, f"API Request Failed: HTTP {exc.code}"
+            return failure(f"API Request Failed: HTTP {exc.code}", VERIFICATION_CATEGORY_TRANSPORT)
         except urllib.error.URLError as exc:
-            return False, f"API Request Failed: {str(exc.reason)}"
+            return failure(f"API Request Failed: {str(exc.reason)}", VERIFICATION_CATEGORY_TRANSPORT)
+        except (TimeoutError, ConnectionError, http.client.HTTPException) as exc:
+            return failure(f"API Request Failed: {type(exc).__name__}", VERIFICATION_CATEGORY_TRANSPORT)
         except (UnicodeDecodeError, json.JSONDecodeError, TypeError, ValueError) as exc:
-            return False, f"API Response Parsing Failed: {str(exc)}"
+            return failure(f"API Response Parsing Failed: {str(exc)}", VERIFICATION_CATEGORY_RESPONSE)
         except Exception as exc:
-            return False, f"Unexpected Error: {str(exc)}"
+            return failure(f"Unexpected Error: {str(exc)}", VERIFICATION_CATEGORY_UNEXPECTED)
+
+    def _post_siteverify(self, verify_data: dict[str, str]) -> bytes:
+        from contact_form.transport import get_verification_transport
+
+        max_attempts = get_positive_int_setting("CONTACT_FORM_TURNSTILE_MAX_ATTEMPTS", DEFAULT_TURNSTILE_MAX_ATTEMPTS)
+        backoff_seconds = get_turnstile_retry_backoff_seconds()
+        deadline = time.monotonic() + get_turnstile_deadline_seconds()
+
+        attempt = 0
+        while True:
+            timeout = min(TURNSTILE_VERIFY_TIMEOUT_SECONDS, max(0.001, deadline - time.monotonic()))
+            try:
+                return (
+                    get_verification_transport()
+                    .post_form(
+                        self.VERIFY_URL,
+                        verify_data,
+                        timeout=timeout,
+                        max_bytes=TURNSTILE_VERIFY_RESPONSE_MAX_BYTES,
+                    )
+                    .body
+                )
+            except urllib.error.HTTPError as exc:
+                if exc.code < 500:
+                    raise
+                failure: Exception = exc
+            except _TRANSIENT_TRANSPORT_ERRORS as exc:
+                failure = exc
+
+            delay = random.uniform(0, backoff_seconds * 2**attempt)
+            attempt += 1
+            if attempt >= max_attempts or time.monotonic() + delay >= deadline:
+                raise failure
+            increment_counter("contact_form.turnstile.retries", exception_type=type(failure).__name__)
+            time.sleep(delay)
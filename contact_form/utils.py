@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import logging
+import os
 import re
+import urllib.parse
 from typing import TYPE_CHECKING
 
+from contact_form.context import get_request_environment
+
 if TYPE_CHECKING:
     from django.http import HttpRequest
 
@@ -28,7 +32,7 @@ TURNSTILE_TEST_SECRET_KEY = "1x0000000000000000000000000000000AA"
 
 def is_localhost(request: HttpRequest | None = None, host: str | None = None) -> bool:
     if request is not None:
-        host = request.get_host()
+        return get_request_environment(request).is_localhost
 
     if not host:
         return False
@@ -42,6 +46,36 @@ def is_localhost(request: HttpRequest | None = None, host: str | None = None) ->
     return False
 
 
+def normalize_hostname(hostname: str) -> str:
+    candidate = hostname.strip()
+    if not candidate:
+        return ""
+
+    try:
+        parsed = urllib.parse.urlsplit(candidate if "://" in candidate else f"//{candidate}")
+        normalized = (parsed.hostname or candidate).rstrip(".").lower()
+        return normalized.encode("idna").decode("ascii")
+    except (UnicodeError, ValueError):
+        return ""
+
+
+_captcha_production_forced: bool | None = None
+
+
+def is_captcha_production_forced() -> bool:
+    global _captcha_production_forced
+
+    if _captcha_production_forced is None:
+        _captcha_production_forced = os.getenv("CAPTCHA_FORCE_PRODUCTION", "").lower() in ("1", "true", "yes")
+    return _captcha_production_forced
+
+
+def clear_captcha_production_forced() -> None:
+    global _captcha_production_forced
+
+    _captcha_production_forced = None
+
+
 def get_recaptcha_test_keys() -> dict[str, str]:
     logger.info("Using Development Keys for CAPTCHA (reCAPTCHA)")
     return {
@@ -63,11 +97,7 @@ def get_captcha_keys_for_environment(
     request: HttpRequest | None = None,
     configured_keys: dict[str, str] | None = None,
 ) -> dict[str, str]:
-    import os
-
-    force_production = os.getenv("CAPTCHA_FORCE_PRODUCTION", "").lower() in ("1", "true", "yes")
-
-    if is_localhost(request) and not force_production:
+    if request is not None and get_request_environment(request).is_localhost and not is_captcha_production_forced():
         if provider == "turnstile":
             return get_turnstile_test_keys()
         else:
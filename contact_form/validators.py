@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import os
+from bisect import bisect_left
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISPOSABLE_EMAIL_DOMAINS_FILE = Path(__file__).resolve().parent / "data" / "disposable_email_domains.txt"
+
+
+def _reverse_labels(domain: str) -> str:
+    return ".".join(reversed(domain.split(".")))
+
+
+def normalize_email_domain(domain: str) -> str:
+    domain = domain.strip().rstrip(".").casefold()
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return domain
+
+
+class DisposableDomainIndex:
+    __slots__ = ("_reversed_domains",)
+
+    def __init__(self, domains: Iterable[str]) -> None:
+        self._reversed_domains = sorted(
+            {_reverse_labels(normalize_email_domain(domain)) for domain in domains if domain.strip()}
+        )
+
+    def __len__(self) -> int:
+        return len(self._reversed_domains)
+
+    def _contains(self, reversed_domain: str) -> bool:
+        position = bisect_left(self._reversed_domains, reversed_domain)
+        return position < len(self._reversed_domains) and self._reversed_domains[position] == reversed_domain
+
+    def matches(self, domain: str) -> bool:
+        labels = _reverse_labels(normalize_email_domain(domain)).split(".")
+        return any(self._contains(".".join(labels[:length])) for length in range(len(labels), 0, -1))
+
+
+def read_domain_file(path: str | os.PathLike[str]) -> list[str]:
+    with open(path, encoding="utf-8") as domain_file:
+        return [line.strip() for line in domain_file if line.strip() and not line.lstrip().startswith("#")]
+
+
+def get_disposable_email_domains_file() -> str:
+    configured_path = getattr(settings, "CONTACT_FORM_DISPOSABLE_EMAIL_DOMAINS_FILE", "")
+    return str(configured_path or DEFAULT_DISPOSABLE_EMAIL_DOMAINS_FILE)
+
+
+_disposable_domain_index: tuple[tuple[Any, ...], DisposableDomainIndex] | None = None
+
+
+def get_disposable_domain_index() -> DisposableDomainIndex:
+    global _disposable_domain_index
+
+    path = get_disposable_email_domains_file()
+    try:
+        stat_result = os.stat(path)
+        key: tuple[Any, ...] = (path, stat_result.st_mtime_ns, stat_result.st_size)
+    except OSError:
+        key = (path, None, None)
+    if _disposable_domain_index is None or _disposable_domain_index[0] != key:
+        try:
+            domains = read_domain_file(path)
+        except (OSError, UnicodeDecodeError) as exc:
+            logger.warning("Couldn't read disposable email domains: exception_type=%s", type(exc).__name__)
+            domains = []
+        _disposable_domain_index = (key, DisposableDomainIndex(domains))
+    return _disposable_domain_index[1]
+
+
+def clear_disposable_domain_index() -> None:
+    global _disposable_domain_index
+
+    _disposable_domain_index = None
+
+
+def is_disposable_email(value: str) -> bool:
+    _local_part, separator, domain = str(value).rpartition("@")
+    return bool(separator and domain) and get_disposable_domain_index().matches(domain)
+
+
+def validate_non_disposable_email(value: str) -> None:
+    if is_disposable_email(value):
+        raise ValidationError(
+            _("Please use a permanent email address; disposable addresses are not accepted."),
+            code="disposable_email",
+        )